@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+End-to-end apply latency benchmark.
+
+Puts the scripted fake swww/swww-daemon (fake_swww.py) on PATH inside a
+throw-away HOME and runtime directory, then drives SwwwManager, the
+headless apply path and optionally the GUI apply path. For each operation
+it reports p50/p95 latency and the number of swww processes spawned.
+
+Latencies include the start-up time of the fake tools (a Python process
+each), so compare runs with each other rather than with real swww timings;
+spawn counts are exact.
+
+    python benchmarks/bench_apply.py
+    python benchmarks/bench_apply.py --outputs DP-1:2560x1440,HDMI-A-1:1920x1080 --no-ipc
+    python benchmarks/bench_apply.py --gui   # needs GTK and a Wayland/X display
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import shutil
+import argparse
+import tempfile
+import logging
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+FAKE_SWWW = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_swww.py')
+
+logger = logging.getLogger(__name__)
+
+
+def write_png(path, width, height, color):
+    """Write a solid-color RGB PNG without any imaging library."""
+    row = b'\x00' + bytes(color) * width
+    raw = row * height
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw)))
+        f.write(chunk(b'IEND', b''))
+
+
+def setup_environment(workdir, args):
+    """Create the fake tools and an isolated environment.
+
+    Must run before swww_gui is imported: its paths are derived from HOME
+    at import time.
+
+    Returns:
+        list: Paths of the test images.
+    """
+    bin_dir = os.path.join(workdir, 'bin')
+    run_dir = os.path.join(workdir, 'run')
+    home_dir = os.path.join(workdir, 'home')
+    image_dir = os.path.join(home_dir, 'Pictures')
+    for directory in (bin_dir, run_dir, home_dir, image_dir):
+        os.makedirs(directory, exist_ok=True)
+    os.chmod(run_dir, 0o700)
+
+    for name, role in (('swww', 'swww'), ('swww-daemon', 'daemon')):
+        path = os.path.join(bin_dir, name)
+        with open(path, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_SWWW}" {role} "$@"\n')
+        os.chmod(path, 0o755)
+
+    os.environ.update({
+        'PATH': bin_dir + os.pathsep + os.environ.get('PATH', ''),
+        'HOME': home_dir,
+        'XDG_RUNTIME_DIR': run_dir,
+        'WAYLAND_DISPLAY': 'bench-0',
+        'FAKE_SWWW_LOG': os.path.join(workdir, 'spawns.log'),
+        'FAKE_SWWW_STATE': os.path.join(workdir, 'state.json'),
+        'FAKE_SWWW_OUTPUTS': args.outputs,
+        'FAKE_SWWW_STARTUP_DELAY': str(args.startup_delay),
+        'FAKE_SWWW_IMG_DELAY': str(args.img_delay),
+    })
+
+    width, height = (int(value) for value in args.image_size.split('x'))
+    images = []
+    for i, color in enumerate(((200, 40, 40), (40, 40, 200))):
+        path = os.path.join(image_dir, f'bench-{i}.png')
+        write_png(path, width, height, color)
+        images.append(path)
+    return images
+
+
+class SpawnCounter:
+    """Counts fake swww processes through the invocation log."""
+
+    def __init__(self):
+        self.log_file = os.environ['FAKE_SWWW_LOG']
+
+    def count(self):
+        try:
+            with open(self.log_file) as f:
+                return sum(1 for _ in f)
+        except OSError:
+            return 0
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(name, samples, spawns):
+    """Build one result row."""
+    return {
+        'operation': name,
+        'runs': len(samples),
+        'p50_ms': percentile(samples, 0.50) * 1000,
+        'p95_ms': percentile(samples, 0.95) * 1000,
+        'spawns_per_op': sum(spawns) / len(spawns) if spawns else 0.0,
+    }
+
+
+def measure(name, func, iterations, counter, setup=None):
+    """Time func over several iterations, running setup untimed before each."""
+    samples, spawns = [], []
+    for i in range(iterations):
+        if setup:
+            setup(i)
+        before = counter.count()
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+        spawns.append(counter.count() - before)
+    return summarize(name, samples, spawns)
+
+
+def wait_for_socket_gone(timeout=5.0):
+    """Wait until the fake daemon removed its socket."""
+    from swww_gui.swww_ipc import SwwwSocketClient
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and SwwwSocketClient().socket_exists():
+        time.sleep(0.01)
+
+
+def bench_headless(args, images):
+    """Benchmark SwwwManager and the headless apply path."""
+    from swww_gui.swww_manager import SwwwManager
+    from swww_gui.probe import EnvironmentProbe
+    from swww_gui.prescale import PrescaleCache
+    from swww_gui.config import SwwwGuiConfig
+    from swww_gui.cli import apply_image
+
+    probe = EnvironmentProbe()
+    probe.probe()
+    manager = SwwwManager(
+        use_ipc=not args.no_ipc,
+        prescale_cache=PrescaleCache() if args.prescale else None,
+        probe=probe
+    )
+    config = SwwwGuiConfig()
+    options = config.get_wallpaper_options()
+    counter = SpawnCounter()
+    n = args.iterations
+    results = []
+
+    def stop_daemon(i):
+        if manager.is_daemon_running():
+            manager.kill_daemon()
+        wait_for_socket_gone()
+        manager.invalidate_daemon_state()
+
+    results.append(measure("start_daemon", lambda i: manager.start_daemon(), max(1, n // 5),
+                           counter, setup=stop_daemon))
+    if not manager.is_daemon_running() and not manager.start_daemon():
+        raise RuntimeError("fake swww-daemon did not start")
+
+    results.append(measure("query (cold)", lambda i: manager.query(), n, counter,
+                           setup=lambda i: manager.invalidate_daemon_state()))
+    results.append(measure("query (cached)", lambda i: manager.query(), n, counter))
+    results.append(measure("get_monitor_info", lambda i: manager.get_monitor_info(), n, counter))
+    results.append(measure("set_wallpaper",
+                           lambda i: manager.set_wallpaper(images[i % 2], options), n, counter))
+
+    names = manager.get_monitors()
+    if len(names) > 1:
+        results.append(measure(
+            "set_wallpapers",
+            lambda i: manager.set_wallpapers(
+                {name: images[(i + k) % 2] for k, name in enumerate(names)}, options),
+            n, counter))
+
+    results.append(measure("clear", lambda i: manager.clear_wallpaper(), n, counter))
+    results.append(measure("headless apply",
+                           lambda i: apply_image(manager, config, images[i % 2]), n, counter))
+
+    stop_daemon(0)
+    return results
+
+
+def bench_gui(args, images):
+    """Benchmark the window's apply path, from click to result callback."""
+    import gi
+    gi.require_version('Gtk', '4.0')
+    gi.require_version('Adw', '1')
+    from gi.repository import GLib
+    from swww_gui.application import SwwwGuiApplication
+    from swww_gui.swww_manager import SwwwManager
+
+    # Running daemon up front, so the window doesn't ask to start one
+    manager = SwwwManager(use_ipc=not args.no_ipc)
+    if not manager.start_daemon():
+        raise RuntimeError("fake swww-daemon did not start")
+
+    app = SwwwGuiApplication()
+    counter = SpawnCounter()
+    samples, spawns = [], []
+    current = {}
+
+    def run_once():
+        window = app.props.active_window
+        if len(samples) >= args.iterations:
+            app.quit()
+            return False
+        window.image_view.load_image(images[len(samples) % 2])
+        current['spawns'] = counter.count()
+        current['start'] = time.perf_counter()
+        window.on_apply_clicked(None)
+        return False
+
+    def start():
+        window = app.props.active_window
+        if window is None:
+            return True  # Not activated yet
+        original_finished = window._on_apply_finished
+
+        def on_finished(result):
+            samples.append(time.perf_counter() - current['start'])
+            spawns.append(counter.count() - current['spawns'])
+            original_finished(result)
+            GLib.idle_add(run_once)
+            return False
+
+        window._on_apply_finished = on_finished
+        GLib.idle_add(run_once)
+        return False
+
+    GLib.timeout_add(500, start)
+    app.run([sys.argv[0]])
+    manager.kill_daemon()
+    return [summarize("gui apply", samples, spawns)] if samples else []
+
+
+def print_results(results):
+    """Print a result table."""
+    print(f"{'operation':<20} {'runs':>5} {'p50 ms':>9} {'p95 ms':>9} {'spawns/op':>10}")
+    for row in results:
+        print(f"{row['operation']:<20} {row['runs']:>5} {row['p50_ms']:>9.2f} "
+              f"{row['p95_ms']:>9.2f} {row['spawns_per_op']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure wallpaper apply latency against a fake swww.')
+    parser.add_argument('-n', '--iterations', type=int, default=30, help='Runs per operation')
+    parser.add_argument('--outputs', default='DP-1:2560x1440',
+                        help='Fake outputs as NAME:WxH,... (default: %(default)s)')
+    parser.add_argument('--image-size', default='1920x1080', help='Test image size (default: %(default)s)')
+    parser.add_argument('--no-ipc', action='store_true', help='Use the swww CLI instead of the daemon socket')
+    parser.add_argument('--prescale', action='store_true', help='Pre-scale images (needs GdkPixbuf)')
+    parser.add_argument('--startup-delay', type=float, default=0.0, help='Fake daemon start-up time in seconds')
+    parser.add_argument('--img-delay', type=float, default=0.0, help='Fake `swww img` duration in seconds')
+    parser.add_argument('--gui', action='store_true', help='Also benchmark the GUI apply path')
+    parser.add_argument('--json', metavar='FILE', help='Also write results as JSON')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary directory')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='swwwgui-bench-')
+    try:
+        images = setup_environment(workdir, args)
+        sys.path.insert(0, SRC_DIR)
+        logging.getLogger().setLevel(logging.WARNING)
+        import swww_gui  # noqa: F401  (configures logging)
+        logging.getLogger().setLevel(logging.WARNING)
+
+        results = bench_headless(args, images)
+        if args.gui:
+            results.extend(bench_gui(args, images))
+
+        print_results(results)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+    finally:
+        if args.keep:
+            print(f"Kept {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Thumbnail decode backend benchmark.
+
+Thumbnails a synthetic folder with the threaded backend (ThumbnailStore on
+the scheduler's worker threads) and with the process backend
+(ProcessThumbnailDecoder), each against its own empty thumbnail directory,
+then once more with the thumbnails already on disk. Reports wall time and
+thumbnails per second.
+
+    python benchmarks/bench_thumbnail_backends.py
+    python benchmarks/bench_thumbnail_backends.py --count 2000 --image-size 3840x2160
+
+Needs GdkPixbuf; no display is required.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+
+from bench_apply import write_png
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Distinct source images; the rest of the folder links to them
+DISTINCT_IMAGES = 8
+
+
+def create_corpus(image_dir, count, image_size):
+    """Create `count` PNG wallpapers, hard-linked where possible."""
+    width, height = (int(value) for value in image_size.split('x'))
+    sources = []
+    for i in range(min(count, DISTINCT_IMAGES)):
+        path = os.path.join(image_dir, f'source-{i}.png')
+        write_png(path, width, height, ((i * 37) % 256, (i * 91) % 256, 128))
+        sources.append(path)
+    images = list(sources)
+    for i in range(len(sources), count):
+        path = os.path.join(image_dir, f'wallpaper-{i:05d}.png')
+        try:
+            os.link(sources[i % len(sources)], path)
+        except OSError:
+            shutil.copyfile(sources[i % len(sources)], path)
+        images.append(path)
+    return images
+
+
+def run_backend(name, load, workers, images):
+    """Thumbnail every image through a ThumbnailScheduler and time it."""
+    from swww_gui.thumbnail_scheduler import ThumbnailScheduler
+
+    done = threading.Event()
+    results = []
+    lock = threading.Lock()
+
+    def on_loaded(file_path, thumbnail):
+        with lock:
+            results.append(thumbnail is not None)
+            if len(results) == len(images):
+                done.set()
+
+    scheduler = ThumbnailScheduler(load, workers=workers)
+    start = time.perf_counter()
+    for path in images:
+        scheduler.request(path, on_loaded)
+    done.wait()
+    elapsed = time.perf_counter() - start
+    scheduler.stop()
+    return {
+        'backend': name,
+        'workers': workers,
+        'images': len(images),
+        'failed': results.count(False),
+        'seconds': elapsed,
+        'per_second': len(images) / elapsed if elapsed else 0.0,
+    }
+
+
+def bench(args, workdir, images):
+    """Run every backend cold, then warm."""
+    from swww_gui.thumbnails import ThumbnailStore
+    from swww_gui.thumbnail_pool import ProcessThumbnailDecoder
+    from swww_gui.thumbnail_scheduler import default_worker_count
+
+    rows = []
+    thread_store = ThumbnailStore(os.path.join(workdir, 'thumbnails-thread'))
+    decoder = ProcessThumbnailDecoder(workers=args.processes,
+                                      cache_dir=os.path.join(workdir, 'thumbnails-process'))
+    try:
+        # Start the worker processes outside the timed runs
+        warmup = os.path.join(workdir, 'warmup.png')
+        write_png(warmup, 16, 16, (0, 0, 0))
+        decoder.load(warmup)
+        for state in ('cold', 'warm'):
+            rows.append(dict(run_backend('thread', thread_store.load, args.threads or default_worker_count(),
+                                         images), cache=state))
+            rows.append(dict(run_backend('process', decoder.load, decoder.workers, images),
+                             cache=state))
+    finally:
+        decoder.shutdown()
+    return rows
+
+
+def print_results(rows):
+    """Print a result table."""
+    print(f"{'backend':<8} {'cache':<5} {'workers':>7} {'images':>7} {'failed':>6} "
+          f"{'seconds':>8} {'thumbs/s':>9}")
+    for row in rows:
+        print(f"{row['backend']:<8} {row['cache']:<5} {row['workers']:>7} {row['images']:>7} "
+              f"{row['failed']:>6} {row['seconds']:>8.2f} {row['per_second']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare threaded and multi-process thumbnail decoding.')
+    parser.add_argument('-c', '--count', type=int, default=500, help='Images in the folder (default: %(default)s)')
+    parser.add_argument('--image-size', default='3840x2160', help='Image size (default: %(default)s)')
+    parser.add_argument('--threads', type=int, help='Threads of the threaded backend (default: min(cores, 4))')
+    parser.add_argument('--processes', type=int, help='Worker processes (default: number of cores)')
+    parser.add_argument('--json', metavar='FILE', help='Also write results as JSON')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary directory')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='swwwgui-thumbs-')
+    try:
+        image_dir = os.path.join(workdir, 'images')
+        os.makedirs(image_dir)
+        images = create_corpus(image_dir, args.count, args.image_size)
+        sys.path.insert(0, SRC_DIR)
+
+        rows = bench(args, workdir, images)
+        print_results(rows)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(rows, f, indent=2)
+    finally:
+        if args.keep:
+            print(f"Kept {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""
+Thumbnail pipeline benchmark over synthetic image folders.
+
+Generates folders of 100, 1,000 (and optionally 10,000) wallpapers in mixed
+JPEG/PNG/WebP from 1080p to 8K, then opens each folder the way the grid
+does and reports:
+
+    first_ms    time to the first thumbnail
+    screen_ms   time until the first screen (--visible thumbnails) is done
+    full_s      time until every image of the folder has its thumbnail
+    rss_mb      peak RSS of the scenario (worker processes listed separately)
+    decodes     thumbnails created from source images (0 means all cached)
+
+Every scenario runs twice in a fresh process: cold, against an empty
+thumbnail cache, then warm, with the thumbnails already on disk.
+
+Two modes:
+
+    pipeline    directory scan, ThumbnailScheduler and the configured
+                loader (thread, process or pack backend) with grid-like
+                priorities; no GTK widgets, only GdkPixbuf is needed
+    widget      the real FileChooser in a window, scrolled a page at a
+                time once the cells on screen have their thumbnails; needs
+                a display, and runs under xvfb-run when there is none
+
+    python benchmarks/bench_thumbnail_pipeline.py
+    python benchmarks/bench_thumbnail_pipeline.py --counts 100,1000,10000 --backends thread,process,pack
+    python benchmarks/bench_thumbnail_pipeline.py --mode widget --scale 2
+
+Source images are few and the folders hard-link to them, so a 10,000-image
+folder of 8K files takes little disk space; the page cache is not dropped
+between runs (that needs root), so cold means a cold thumbnail cache only.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Same formats the file chooser shows
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff', '.tga')
+
+# GdkPixbuf saver -> file extension
+FORMATS = {'jpeg': 'jpg', 'png': 'png', 'webp': 'webp'}
+
+# Encoder options keeping generation fast and files realistic
+SAVE_OPTIONS = {'jpeg': {'quality': '90'}, 'png': {'compression': '1'}, 'webp': {'quality': '90'}}
+
+logger = logging.getLogger(__name__)
+
+
+# -- Corpus -------------------------------------------------------------------
+
+def writable_formats(requested):
+    """Formats from `requested` that GdkPixbuf can save."""
+    import gi
+    gi.require_version('GdkPixbuf', '2.0')
+    from gi.repository import GdkPixbuf
+
+    writable = {fmt.get_name() for fmt in GdkPixbuf.Pixbuf.get_formats() if fmt.is_writable()}
+    available = [name for name in requested if name in writable]
+    for name in requested:
+        if name not in writable:
+            print(f"Skipping {name}: no GdkPixbuf saver installed", file=sys.stderr)
+    return available
+
+
+def write_source(path, fmt, width, height, seed):
+    """Write a smooth random image: a small noise tile scaled up."""
+    from gi.repository import GdkPixbuf, GLib
+
+    tile_width, tile_height = 32, 18
+    rnd = random.Random(seed)
+    data = bytes(rnd.randrange(256) for _ in range(tile_width * tile_height * 3))
+    tile = GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(data), GdkPixbuf.Colorspace.RGB,
+                                           False, 8, tile_width, tile_height, tile_width * 3)
+    pixbuf = tile.scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
+    options = SAVE_OPTIONS.get(fmt, {})
+    pixbuf.savev(path, fmt, list(options), list(options.values()))
+
+
+def create_sources(source_dir, formats, resolutions, variants):
+    """Create the distinct images every folder links to."""
+    sources = []
+    for variant in range(variants):
+        for resolution in resolutions:
+            width, height = (int(value) for value in resolution.split('x'))
+            for fmt in formats:
+                path = os.path.join(source_dir, f'{resolution}-{variant}.{FORMATS[fmt]}')
+                write_source(path, fmt, width, height, seed=len(sources))
+                sources.append(path)
+    return sources
+
+
+def create_folder(folder, count, sources):
+    """Fill a folder with `count` images, hard-linked to the sources where possible."""
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        source = sources[i % len(sources)]
+        path = os.path.join(folder, f'wallpaper-{i:05d}{os.path.splitext(source)[1]}')
+        try:
+            os.link(source, path)
+        except OSError:
+            shutil.copyfile(source, path)
+
+
+# -- Measurements (scenario process) -------------------------------------------
+
+def scan_folder(folder):
+    """List a folder's images as the grid does."""
+    images = [entry.path for entry in os.scandir(folder)
+              if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS]
+    images.sort()
+    return images
+
+
+class DecodeCounter:
+    """Counts thumbnails created from source images in this process."""
+
+    def __init__(self):
+        from swww_gui import thumbnails, thumbnail_pack
+
+        self.count = 0
+        self._lock = threading.Lock()
+        original = thumbnails.create_thumbnail
+
+        def counting(*args, **kwargs):
+            with self._lock:
+                self.count += 1
+            return original(*args, **kwargs)
+
+        # Both stores call the module-level function
+        thumbnails.create_thumbnail = counting
+        thumbnail_pack.create_thumbnail = counting
+
+
+def count_thumbnail_files(cache_dir):
+    """Number of thumbnail PNGs on disk, for decodes done in worker processes."""
+    total = 0
+    for _, _, files in os.walk(cache_dir):
+        total += sum(1 for name in files if name.endswith('.png'))
+    return total
+
+
+def decode_count(backend, counter, files_before):
+    """Thumbnails created during the run."""
+    from swww_gui.constants import THUMBNAIL_CACHE_DIR
+
+    if backend == 'process':
+        # Decoded in worker processes, which store every thumbnail they make
+        return count_thumbnail_files(THUMBNAIL_CACHE_DIR) - files_before
+    return counter.count
+
+
+class Progress:
+    """Records when thumbnails of the first screen and of the folder arrive."""
+
+    def __init__(self, start, images, visible):
+        self.start = start
+        self.total = len(images)
+        self.first_screen = set(images[:visible])
+        self.loaded = 0
+        self.first = None
+        self.screen = None if self.first_screen else 0.0
+        self.full = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        if not images:
+            self.full = 0.0
+            self.done.set()
+
+    def loaded_one(self, path):
+        """Record one finished thumbnail (or failure)."""
+        with self._lock:
+            now = time.perf_counter() - self.start
+            self.loaded += 1
+            if self.first is None:
+                self.first = now
+            self.first_screen.discard(path)
+            if self.screen is None and not self.first_screen:
+                self.screen = now
+            if self.loaded >= self.total:
+                self.full = now
+                self.done.set()
+
+    def result(self):
+        return {
+            'images': self.total,
+            'loaded': self.loaded,
+            'first_ms': self.first * 1000 if self.first is not None else None,
+            'screen_ms': self.screen * 1000 if self.screen is not None else None,
+            'full_s': self.full,
+        }
+
+
+def peak_rss():
+    """Peak RSS in MiB of this process and of its largest reaped child."""
+    import multiprocessing
+
+    # Reap finished worker processes so their usage is counted
+    deadline = time.monotonic() + 5
+    while multiprocessing.active_children() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def make_loader(backend, size):
+    """Create the loader the grid would use for a backend.
+
+    Returns:
+        tuple: (load, workers, store, cleanup)
+    """
+    from swww_gui.thumbnails import ThumbnailStore
+    from swww_gui.thumbnail_pool import ProcessThumbnailDecoder
+    from swww_gui.thumbnail_pack import PackedThumbnailStore
+
+    if backend == 'pack':
+        store = PackedThumbnailStore(size=size)
+        return (lambda path: store.load(path, size)), None, store, store.close
+    if backend == 'process':
+        decoder = ProcessThumbnailDecoder(size=size)
+        return (lambda path: decoder.load(path, size)), decoder.workers, None, decoder.shutdown
+    store = ThumbnailStore()
+    return (lambda path: store.load(path, size)), None, None, lambda: None
+
+
+def run_pipeline(args):
+    """Open a folder through the scheduler and loaders, without widgets."""
+    from swww_gui.constants import THUMBNAIL_CACHE_DIR
+    from swww_gui.thumbnails import size_for_scale
+    from swww_gui.thumbnail_scheduler import (
+        ThumbnailScheduler, PRIORITY_VISIBLE, PRIORITY_NEAR, PRIORITY_BACKGROUND
+    )
+
+    size = size_for_scale(args.scale)
+    counter = DecodeCounter()
+    load, workers, packs, cleanup = make_loader(args.backend, size)
+    if args.backend == 'process':
+        # Start the worker processes outside the timed run
+        load(os.path.join(args.folder, '..', 'warmup.png'))
+    files_before = count_thumbnail_files(THUMBNAIL_CACHE_DIR)
+
+    start = time.perf_counter()
+    images = scan_folder(args.folder)
+    if packs:
+        packs.open_folder(args.folder, [os.path.basename(path) for path in images], size=size)
+    progress = Progress(start, images, args.visible)
+    scheduler = ThumbnailScheduler(load, workers=workers)
+    for i, path in enumerate(images):
+        # The first screen, the page below it, then the rest as it is scrolled to
+        if i < args.visible:
+            priority = PRIORITY_VISIBLE
+        elif i < args.visible * 2:
+            priority = PRIORITY_NEAR
+        else:
+            priority = PRIORITY_BACKGROUND
+        scheduler.request(path, lambda path, result: progress.loaded_one(path), priority)
+    progress.done.wait(args.timeout)
+    scheduler.stop()
+    cleanup()
+
+    result = progress.result()
+    result['decodes'] = decode_count(args.backend, counter, files_before)
+    result['rss_mb'], result['workers_rss_mb'] = peak_rss()
+    return result
+
+
+def run_widget(args):
+    """Open a folder in the real FileChooser and scroll through it."""
+    import gi
+    gi.require_version('Gtk', '4.0')
+    gi.require_version('Adw', '1')
+    from gi.repository import Gtk, Adw, GLib
+    from swww_gui.config import SwwwGuiConfig
+    from swww_gui.constants import THUMBNAIL_CACHE_DIR
+    from swww_gui.indexer import ThumbnailIndexer
+    from swww_gui.previews import PreviewStore
+    from swww_gui.ui.file_chooser import FileChooser
+
+    Adw.init()
+    counter = DecodeCounter()
+    files_before = count_thumbnail_files(THUMBNAIL_CACHE_DIR)
+    config = SwwwGuiConfig()
+    config.set('last_folder', args.folder)
+    if args.backend == 'pack':
+        config.set('thumbnail_store', 'pack')
+    elif args.backend == 'process':
+        config.set('thumbnail_backend', 'process')
+
+    class BenchWindow(Gtk.Window):
+        """The parts of the main window the file chooser uses."""
+
+        def __init__(self):
+            super().__init__(default_width=1000, default_height=680)
+            self.config = config
+            self.preview_store = PreviewStore()
+            # Never started; the chooser only reports activity to it
+            self.indexer = ThumbnailIndexer(config, previews=self.preview_store)
+
+        def add_toast(self, toast):
+            logger.warning(toast.get_title())
+
+    images = scan_folder(args.folder)
+    window = BenchWindow()
+    loop = GLib.MainLoop()
+
+    start = time.perf_counter()
+    chooser = FileChooser(window)
+    window.set_child(chooser)
+    window.present()
+    progress = Progress(start, images, args.visible)
+    seen = set()
+
+    def poll():
+        entries = [entry for entry in chooser.store if not entry.is_dir]
+        for entry in entries:
+            if entry.loaded and entry.path not in seen:
+                seen.add(entry.path)
+                progress.loaded_one(entry.path)
+        if progress.done.is_set() or time.perf_counter() - start > args.timeout:
+            loop.quit()
+            return False
+        on_screen = [entry for entry in entries if entry.cell is not None]
+        if on_screen and all(entry.loaded for entry in on_screen):
+            # Every cell on screen has its thumbnail: scroll a page on like a user
+            adjustment = chooser.scrolled.get_vadjustment()
+            adjustment.set_value(adjustment.get_value() + adjustment.get_page_size())
+        return True
+
+    GLib.timeout_add(10, poll)
+    loop.run()
+    chooser.shutdown()
+    window.preview_store.flush()
+    window.destroy()
+
+    result = progress.result()
+    result['decodes'] = decode_count(args.backend, counter, files_before)
+    result['rss_mb'], result['workers_rss_mb'] = peak_rss()
+    return result
+
+
+def run_scenario(args):
+    """Entry point of a scenario process: print one JSON result line."""
+    sys.path.insert(0, SRC_DIR)
+    import swww_gui  # noqa: F401  (configures logging)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    result = run_pipeline(args) if args.mode == 'pipeline' else run_widget(args)
+    print('RESULT ' + json.dumps(result), flush=True)
+
+
+# -- Driver ------------------------------------------------------------------
+
+def has_display():
+    return bool(os.environ.get('WAYLAND_DISPLAY') or os.environ.get('DISPLAY'))
+
+
+def spawn_scenario(args, mode, backend, folder, home):
+    """Run one scenario in a fresh process with its own HOME and caches."""
+    command = [sys.executable, os.path.abspath(__file__), '--scenario',
+               '--mode', mode, '--backend', backend, '--folder', folder,
+               '--visible', str(args.visible), '--scale', str(args.scale),
+               '--timeout', str(args.timeout)]
+    env = dict(os.environ, HOME=home, XDG_CACHE_HOME=os.path.join(home, '.cache'))
+    if mode == 'widget':
+        env['GDK_SCALE'] = str(args.scale)
+        if not has_display():
+            if not shutil.which('xvfb-run'):
+                raise RuntimeError("widget mode needs a display or xvfb-run")
+            env['GDK_BACKEND'] = 'x11'
+            command = ['xvfb-run', '-a', '-s', '-screen 0 1920x1080x24'] + command
+
+    completed = subprocess.run(command, env=env, stdout=subprocess.PIPE, text=True)
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith('RESULT '):
+            return json.loads(line[len('RESULT '):])
+    raise RuntimeError(f"{mode}/{backend} scenario failed (exit code {completed.returncode})")
+
+
+def format_value(value, pattern):
+    return pattern.format(value) if value is not None else '-'
+
+
+def print_results(rows):
+    """Print a result table."""
+    print(f"{'mode':<8} {'backend':<7} {'images':>6} {'cache':<5} {'first_ms':>9} {'screen_ms':>10} "
+          f"{'full_s':>8} {'rss_mb':>7} {'workers_mb':>10} {'decodes':>7}")
+    for row in rows:
+        print(f"{row['mode']:<8} {row['backend']:<7} {row['images']:>6} {row['cache']:<5} "
+              f"{format_value(row['first_ms'], '{:9.1f}'):>9} {format_value(row['screen_ms'], '{:10.1f}'):>10} "
+              f"{format_value(row['full_s'], '{:8.2f}'):>8} {row['rss_mb']:>7.1f} "
+              f"{row['workers_rss_mb']:>10.1f} {row['decodes']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the thumbnail pipeline over synthetic folders.')
+    parser.add_argument('--counts', default='100,1000', help='Folder sizes (default: %(default)s)')
+    parser.add_argument('--resolutions', default='1920x1080,3840x2160,7680x4320',
+                        help='Source image sizes (default: %(default)s)')
+    parser.add_argument('--formats', default='jpeg,png,webp', help='Source formats (default: %(default)s)')
+    parser.add_argument('--variants', type=int, default=2, help='Distinct images per format and size')
+    parser.add_argument('--backends', default='thread,pack', help='thread, process and/or pack (default: %(default)s)')
+    parser.add_argument('--mode', choices=('pipeline', 'widget', 'both'), default='pipeline')
+    parser.add_argument('--visible', type=int, default=20, help='Thumbnails on the first screen')
+    parser.add_argument('--scale', type=int, default=1, help='Display scale factor (selects the size bucket)')
+    parser.add_argument('--timeout', type=float, default=600, help='Seconds before a scenario gives up')
+    parser.add_argument('--json', metavar='FILE', help='Also write results as JSON')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary directory')
+    # Internal: run a single scenario in this process
+    parser.add_argument('--scenario', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--backend', help=argparse.SUPPRESS)
+    parser.add_argument('--folder', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        run_scenario(args)
+        return
+
+    modes = ('pipeline', 'widget') if args.mode == 'both' else (args.mode,)
+    workdir = tempfile.mkdtemp(prefix='swwwgui-pipeline-')
+    try:
+        source_dir = os.path.join(workdir, 'sources')
+        os.makedirs(source_dir)
+        formats = writable_formats(args.formats.split(','))
+        if not formats:
+            raise SystemExit("No source format can be written")
+        print(f"Generating {args.variants * len(formats) * len(args.resolutions.split(','))} source images...")
+        sources = create_sources(source_dir, formats, args.resolutions.split(','), args.variants)
+        write_source(os.path.join(workdir, 'warmup.png'), 'png', 16, 16, seed=0)
+
+        rows = []
+        for count in (int(value) for value in args.counts.split(',')):
+            folder = os.path.join(workdir, f'images-{count}')
+            create_folder(folder, count, sources)
+            for mode in modes:
+                for backend in args.backends.split(','):
+                    home = os.path.join(workdir, f'home-{mode}-{backend}-{count}')
+                    os.makedirs(home)
+                    for cache in ('cold', 'warm'):
+                        row = spawn_scenario(args, mode, backend, folder, home)
+                        rows.append(dict(row, mode=mode, backend=backend, cache=cache))
+                        print(f"  {mode} {backend} {count} {cache}: done", file=sys.stderr)
+
+        print_results(rows)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(rows, f, indent=2)
+    finally:
+        if args.keep:
+            print(f"Kept {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
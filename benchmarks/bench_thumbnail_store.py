@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Thumbnail store layout benchmark.
+
+Fills the per-file freedesktop store (ThumbnailStore) and the packed store
+(PackedThumbnailStore) with the same synthetic thumbnails for one large
+folder, then measures reading all of them back as the grid does when the
+folder is opened with a warm cache: lookup and read for the per-file
+layout, index load and mmap slices for the pack. Reports time and the
+number of files opened. A last run deletes part of the folder and times
+pruning plus compaction of the pack.
+
+    python benchmarks/bench_thumbnail_store.py
+    python benchmarks/bench_thumbnail_store.py --count 5000 --decode   # --decode needs GdkPixbuf
+
+Thumbnails are written in pure Python, so no imaging library is needed
+unless --decode is given.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import struct
+import argparse
+import tempfile
+import logging
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+THUMB_WIDTH, THUMB_HEIGHT = 128, 96
+
+
+class OpenCounter:
+    """Counts files opened by Python code through an audit hook."""
+
+    def __init__(self):
+        self.count = 0
+        self.enabled = False
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event, args):
+        if self.enabled and event == 'open':
+            self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        self.enabled = True
+        return self
+
+    def __exit__(self, *exc):
+        self.enabled = False
+
+
+def thumbnail_pixels(i):
+    """RGBA pixels of a synthetic thumbnail."""
+    row = bytes(((x + i) % 256, (x * 3) % 256, i % 256, 255)[c]
+                for x in range(THUMB_WIDTH) for c in range(4))
+    return row * THUMB_HEIGHT
+
+
+def write_thumbnail_png(path, pixels, texts):
+    """Write an RGBA PNG with tEXt chunks."""
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    stride = THUMB_WIDTH * 4
+    raw = b''.join(b'\x00' + pixels[y * stride:(y + 1) * stride] for y in range(THUMB_HEIGHT))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', THUMB_WIDTH, THUMB_HEIGHT, 8, 6, 0, 0, 0)))
+        for key, value in texts.items():
+            f.write(chunk(b'tEXt', key.encode('latin-1') + b'\0' + value.encode('latin-1')))
+        f.write(chunk(b'IDAT', zlib.compress(raw)))
+        f.write(chunk(b'IEND', b''))
+
+
+def populate(folder, count, thumb_store, pack_store):
+    """Create source files and a thumbnail of each in both stores."""
+    from swww_gui.thumbnails import file_uri
+    from swww_gui.thumbnail_pool import DecodedThumbnail
+
+    images = []
+    pack = pack_store.open_folder(folder)
+    for i in range(count):
+        path = os.path.join(folder, f'wallpaper-{i:05d}.jpg')
+        with open(path, 'wb') as f:
+            f.write(b'\xff\xd8' + i.to_bytes(4, 'big'))
+        st = os.stat(path)
+        pixels = thumbnail_pixels(i)
+        uri = file_uri(path)
+        write_thumbnail_png(str(thumb_store.thumbnail_path(uri)), pixels, {
+            'Thumb::URI': uri,
+            'Thumb::MTime': str(int(st.st_mtime)),
+            'Thumb::Size': str(st.st_size),
+        })
+        pack.put(os.path.basename(path), st,
+                 DecodedThumbnail(pixels, THUMB_WIDTH, THUMB_HEIGHT, THUMB_WIDTH * 4, True))
+        images.append(path)
+    pack_store.close()
+    return images
+
+
+def read_per_file(thumb_store, images, decode):
+    """Read every thumbnail from the per-file layout."""
+    loaded = 0
+    for path in images:
+        thumb_path = thumb_store.lookup(path)
+        if not thumb_path:
+            continue
+        if decode:
+            from gi.repository import GdkPixbuf
+            GdkPixbuf.Pixbuf.new_from_file(thumb_path)
+        else:
+            with open(thumb_path, 'rb') as f:
+                f.read()
+        loaded += 1
+    return loaded
+
+
+def read_packed(pack_dir, folder, images, decode):
+    """Read every thumbnail from a freshly opened pack."""
+    from swww_gui.thumbnail_pack import PackedThumbnailStore
+
+    store = PackedThumbnailStore(pack_dir)
+    pack = store.open_folder(folder)
+    loaded = 0
+    for path in images:
+        found, thumbnail = pack.get(os.path.basename(path), os.stat(path))
+        if found and thumbnail is not None:
+            if decode:
+                thumbnail.to_pixbuf()
+            loaded += 1
+    store.close()
+    return loaded
+
+
+def timed(name, func, counter, repeat):
+    """Best-of-`repeat` timing with the number of files opened."""
+    best, loaded, opened = None, 0, 0
+    for _ in range(repeat):
+        with counter:
+            start = time.perf_counter()
+            loaded = func()
+            elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best, opened = elapsed, counter.count
+    return {'operation': name, 'thumbnails': loaded, 'ms': best * 1000, 'files_opened': opened}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-file and packed thumbnail stores.')
+    parser.add_argument('-c', '--count', type=int, default=2000, help='Images in the folder (default: %(default)s)')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Runs per operation, best is reported')
+    parser.add_argument('--delete', type=float, default=0.3, help='Share of files deleted before compaction')
+    parser.add_argument('--decode', action='store_true', help='Also turn thumbnails into pixbufs (needs GdkPixbuf)')
+    parser.add_argument('--json', metavar='FILE', help='Also write results as JSON')
+    parser.add_argument('--keep', action='store_true', help='Keep the temporary directory')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='swwwgui-store-')
+    try:
+        sys.path.insert(0, SRC_DIR)
+        import swww_gui  # noqa: F401  (configures logging)
+        logging.getLogger().setLevel(logging.WARNING)
+        from swww_gui.thumbnails import ThumbnailStore
+        from swww_gui.thumbnail_pack import PackedThumbnailStore
+
+        folder = os.path.join(workdir, 'images')
+        os.makedirs(folder)
+        thumb_store = ThumbnailStore(os.path.join(workdir, 'thumbnails'))
+        pack_dir = os.path.join(workdir, 'packs')
+        images = populate(folder, args.count, thumb_store, PackedThumbnailStore(pack_dir))
+        counter = OpenCounter()
+
+        rows = [
+            timed('per-file', lambda: read_per_file(thumb_store, images, args.decode), counter, args.repeat),
+            timed('packed', lambda: read_packed(pack_dir, folder, images, args.decode), counter, args.repeat),
+        ]
+
+        # Delete part of the folder, then prune and compact the pack
+        deleted = images[:int(len(images) * args.delete)]
+        for path in deleted:
+            os.remove(path)
+        remaining = [os.path.basename(path) for path in images[len(deleted):]]
+
+        def compact():
+            store = PackedThumbnailStore(pack_dir)
+            store.open_folder(folder, remaining)
+            store.close()
+            return len(remaining)
+
+        rows.append(timed('prune + compact', compact, counter, 1))
+        pack_file = PackedThumbnailStore(pack_dir).pack_path(folder)
+
+        print(f"{'operation':<16} {'thumbnails':>10} {'ms':>9} {'files opened':>13}")
+        for row in rows:
+            print(f"{row['operation']:<16} {row['thumbnails']:>10} {row['ms']:>9.1f} {row['files_opened']:>13}")
+        print(f"pack size after compaction: {os.path.getsize(pack_file) / 1024 / 1024:.1f} MiB")
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(rows, f, indent=2)
+    finally:
+        if args.keep:
+            print(f"Kept {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
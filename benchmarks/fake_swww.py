@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Scripted stand-in for `swww` and `swww-daemon`, used by the benchmarks.
+
+Installed under both names; the first argument selects the role:
+
+    fake_swww.py daemon             behaves like swww-daemon
+    fake_swww.py swww img|query|... behaves like the swww client
+
+The daemon listens on the same socket path as the real one and accepts
+connections (SwwwManager only connects to check liveness); client commands
+read and write the displayed state directly. Every invocation is appended to
+$FAKE_SWWW_LOG so a benchmark can count spawned processes. Behaviour is
+controlled through environment variables:
+
+    FAKE_SWWW_OUTPUTS        "NAME:WxH,..." (default "DP-1:2560x1440")
+    FAKE_SWWW_STATE          JSON file with the displayed image per output
+    FAKE_SWWW_STARTUP_DELAY  seconds the daemon waits before listening
+    FAKE_SWWW_IMG_DELAY      seconds `swww img` takes
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from swww_gui.swww_ipc import SwwwSocketClient
+
+
+def log_invocation(role, args):
+    """Record one process start."""
+    log_file = os.environ.get('FAKE_SWWW_LOG')
+    if log_file:
+        with open(log_file, 'a') as f:
+            f.write(json.dumps([role] + args) + "\n")
+
+
+def outputs():
+    """Parse FAKE_SWWW_OUTPUTS into (name, width, height) tuples."""
+    spec = os.environ.get('FAKE_SWWW_OUTPUTS', 'DP-1:2560x1440')
+    result = []
+    for item in spec.split(','):
+        name, size = item.split(':')
+        width, height = size.split('x')
+        result.append((name, int(width), int(height)))
+    return result
+
+
+def load_state():
+    """Read what each output displays."""
+    try:
+        with open(os.environ['FAKE_SWWW_STATE']) as f:
+            return json.load(f)
+    except (KeyError, OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    """Write what each output displays."""
+    path = os.environ.get('FAKE_SWWW_STATE')
+    if path:
+        with open(path + '.tmp', 'w') as f:
+            json.dump(state, f)
+        os.replace(path + '.tmp', path)
+
+
+def query_text():
+    """Build `swww query` output in the current swww format."""
+    state = load_state()
+    lines = []
+    for name, width, height in outputs():
+        shown = state.get(name, 'color: 000000')
+        lines.append(f": {name}: {width}x{height}, scale: 1, currently displaying: {shown}")
+    return "\n".join(lines) + "\n"
+
+
+def pid_file():
+    """Where the fake daemon records its PID, so `swww kill` can stop it."""
+    return str(SwwwSocketClient.candidate_socket_paths()[0]) + '.pid'
+
+
+def run_daemon():
+    """Accept connections on the daemon socket until terminated."""
+    time.sleep(float(os.environ.get('FAKE_SWWW_STARTUP_DELAY', '0')))
+    path = str(SwwwSocketClient.candidate_socket_paths()[0])
+    if os.path.exists(path):
+        os.remove(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(16)
+    with open(pid_file(), 'w') as f:
+        f.write(str(os.getpid()))
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        while True:
+            # Clients only connect to check liveness
+            conn, _ = server.accept()
+            conn.close()
+    finally:
+        server.close()
+        for leftover in (path, pid_file()):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def run_client(args):
+    """Handle a `swww` client command."""
+    if not SwwwSocketClient().is_alive():
+        print("Error: swww-daemon is not running", file=sys.stderr)
+        return 1
+    command = args[0] if args else ''
+    if command == 'query':
+        sys.stdout.write(query_text())
+    elif command == 'img':
+        time.sleep(float(os.environ.get('FAKE_SWWW_IMG_DELAY', '0')))
+        image_path = args[1]
+        targets = [name for name, _, _ in outputs()]
+        if '--outputs' in args:
+            wanted = args[args.index('--outputs') + 1].split(',')
+            targets = [name for name in targets if name in wanted]
+        state = load_state()
+        state.update({name: f"image: {image_path}" for name in targets})
+        save_state(state)
+    elif command == 'clear':
+        color = (args[1] if len(args) > 1 else '000000').lstrip('#')
+        save_state({name: f"color: {color}" for name, _, _ in outputs()})
+    elif command == 'kill':
+        with open(pid_file()) as f:
+            daemon_pid = int(f.read())
+        os.kill(daemon_pid, signal.SIGTERM)
+        # Like the real client, return once the socket is gone
+        while SwwwSocketClient().socket_exists():
+            time.sleep(0.01)
+    else:
+        print(f"Error: unsupported command {command!r}", file=sys.stderr)
+        return 2
+    return 0
+
+
+def main():
+    role, args = sys.argv[1], sys.argv[2:]
+    if '--version' in args:
+        print("swww 0.9.5 (fake)")
+        return 0
+    log_invocation(role, args)
+    if role == 'daemon':
+        return run_daemon()
+    return run_client(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,7 +27,7 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'swwwgui=swww_gui.application:main',
+            'swwwgui=swww_gui.cli:main',
         ],
     },
     classifiers=[
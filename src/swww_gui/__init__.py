@@ -13,30 +13,31 @@
 
 __version__ = "1.0.0"
 
-import os
 import logging
-import gi
-from gi.repository import Gio
+import importlib
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Register resources
-resource_path = os.path.join(os.path.dirname(__file__), 'resources.gresource')
-try:
-    resource = Gio.Resource.load(resource_path)
-    Gio.resources_register(resource)
-    logger.debug("Resources loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load resources: {e}")
-
-# Импортируем после настройки ресурсов
-from .application import SwwwGuiApplication, main
-from .window import SwwwGuiWindow
-from .config import SwwwGuiConfig
-from .swww_manager import SwwwManager
-from .translator import Translator
+# Public names are imported on first access, so headless commands
+# (see cli.py) can use the package without loading GTK
+_LAZY_IMPORTS = {
+    'SwwwGuiApplication': '.application',
+    'SwwwGuiWindow': '.window',
+    'SwwwGuiConfig': '.config',
+    'SwwwManager': '.swww_manager',
+    'Translator': '.translator',
+    'main': '.cli',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     'SwwwGuiApplication', 
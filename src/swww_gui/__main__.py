@@ -1,6 +1,8 @@
 """Entry point for running SwwwGUI directly as a module."""
 
-from .application import main
+import sys
+
+from .cli import main
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
@@ -1,13 +1,28 @@
+import os
 import sys
+import logging
 import gi
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib
 
+logger = logging.getLogger(__name__)
+
+# Register resources
+resource_path = os.path.join(os.path.dirname(__file__), 'resources.gresource')
+try:
+    resource = Gio.Resource.load(resource_path)
+    Gio.resources_register(resource)
+    logger.debug("Resources loaded successfully")
+except Exception as e:
+    logger.error(f"Failed to load resources: {e}")
+
+# Импортируем после настройки ресурсов
 from .window import SwwwGuiWindow
 from .config import SwwwGuiConfig
 from .translator import Translator
+from .probe import EnvironmentProbe
 
 
 class SwwwGuiApplication(Adw.Application):
@@ -18,6 +33,9 @@ class SwwwGuiApplication(Adw.Application):
                         flags=Gio.ApplicationFlags.FLAGS_NONE)
         self.config = SwwwGuiConfig()
         self.translator = Translator()
+        # Resolve external programs once; warm starts read the cached result
+        self.probe = EnvironmentProbe()
+        self.probe.probe()
         self.create_action("quit", self.on_quit_action)
         self.create_action("about", self.on_about_action)
         
@@ -55,11 +73,11 @@ class SwwwGuiApplication(Adw.Application):
         about.present()
 
 
-def main():
+def main(argv=None):
     """Run the application."""
     app = SwwwGuiApplication()
     try:
-        return app.run(sys.argv)
+        return app.run(sys.argv if argv is None else argv)
     except KeyboardInterrupt:
         # Корректно обрабатываем Ctrl+C
         print("Shutting down gracefully...")
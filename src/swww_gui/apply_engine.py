@@ -0,0 +1,102 @@
+import logging
+import threading
+from typing import Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ApplyEngine:
+    """Runs wallpaper apply jobs on a background worker thread.
+
+    Only one job runs at a time. A job submitted while another is running
+    replaces any job still waiting, so rapid repeated applies are superseded
+    instead of stacking up. Callbacks are delivered through `dispatch`, which
+    is GLib.idle_add in the GUI so they run on the main loop.
+    """
+
+    def __init__(self, dispatch: Optional[Callable[..., Any]] = None,
+                 on_busy_changed: Optional[Callable[[bool], Any]] = None) -> None:
+        """Initialize the apply engine.
+
+        Args:
+            dispatch: Function used to deliver callbacks, called as
+                      dispatch(callback, *args). Defaults to a direct call.
+            on_busy_changed: Called with True when the engine starts working
+                             and with False when it has nothing left to do.
+        """
+        self._dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self._on_busy_changed = on_busy_changed
+        self._cond = threading.Condition()
+        self._pending: Optional[Tuple[Callable[[], Any], Optional[Callable[[Any], Any]]]] = None
+        self._busy = False
+        self._stopped = False
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def busy(self) -> bool:
+        """Whether a job is running or waiting."""
+        with self._cond:
+            return self._busy
+
+    def submit(self, job: Callable[[], Any],
+               callback: Optional[Callable[[Any], Any]] = None) -> None:
+        """Queue a job, replacing any job that has not started yet.
+
+        Args:
+            job: Function to run on the worker thread. Its return value is
+                 passed to the callback; exceptions are logged and reported
+                 as False.
+            callback: Called with the job result once it finishes. Not called
+                      if the job is superseded before it starts.
+        """
+        with self._cond:
+            if self._stopped:
+                logger.warning("Apply engine is stopped, ignoring job")
+                return
+            if self._pending is not None:
+                logger.debug("Superseding pending apply job")
+            self._pending = (job, callback)
+            if not self._busy:
+                self._busy = True
+                self._notify_busy(True)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="apply-engine", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def stop(self) -> None:
+        """Drop any waiting job and stop the worker after the current one."""
+        with self._cond:
+            self._stopped = True
+            self._pending = None
+            self._cond.notify()
+
+    def _notify_busy(self, busy: bool) -> None:
+        """Report a busy state change; must be called with the lock held."""
+        if self._on_busy_changed:
+            self._dispatch(self._on_busy_changed, busy)
+
+    def _run(self) -> None:
+        """Worker thread loop."""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                job, callback = self._pending
+                self._pending = None
+
+            try:
+                result = job()
+            except Exception as e:
+                logger.error(f"Apply job failed: {e}")
+                result = False
+
+            if callback:
+                self._dispatch(callback, result)
+
+            with self._cond:
+                if self._pending is None and self._busy:
+                    self._busy = False
+                    self._notify_busy(False)
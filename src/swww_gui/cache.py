@@ -0,0 +1,184 @@
+import sys
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Gio.MemoryMonitorWarningLevel values -> share of the budget to keep
+_LOW_MEMORY_KEEP = (
+    (255, 0.0),   # Critical: drop everything
+    (100, 0.25),  # Medium
+    (50, 0.5),    # Low
+)
+
+
+class CacheStats(NamedTuple):
+    """Counters of an LRUCache."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+
+def image_size(value: Any) -> int:
+    """Estimate the memory used by a decoded image.
+
+    Understands GdkPixbuf.Pixbuf, Gdk.Texture and objects holding raw
+    pixels in a `data` bytes attribute; anything else is measured with
+    sys.getsizeof().
+    """
+    if hasattr(value, 'get_byte_length'):  # GdkPixbuf.Pixbuf
+        return value.get_byte_length()
+    data = getattr(value, 'data', None)
+    if isinstance(data, (bytes, bytearray)):
+        return len(data)
+    if hasattr(value, 'get_width') and hasattr(value, 'get_height'):  # Gdk.Texture
+        return value.get_width() * value.get_height() * 4
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with a byte budget.
+
+    Entries live in an OrderedDict in use order, so lookups, insertions
+    and evictions are O(1). The budget counts bytes rather than entries:
+    a handful of 8K images must not be able to take gigabytes.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = image_size,
+                 name: str = "cache") -> None:
+        """Initialize the cache.
+
+        Args:
+            max_bytes: Size budget in bytes.
+            sizeof: Function returning the size of a value in bytes.
+            name: Name used in log messages.
+        """
+        self.max_bytes = max_bytes
+        self.name = name
+        self._sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value and mark it as recently used.
+
+        Returns:
+            Optional[Any]: The value, or None if it is not cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """Add or replace a value, evicting the least recently used ones.
+
+        Returns:
+            bool: False if the value alone exceeds the budget and was not cached.
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            if size > self.max_bytes:
+                return False
+            self._entries[key] = (value, size)
+            self._size += size
+            self._evict(self.max_bytes)
+            return True
+
+    def remove(self, key: Hashable) -> None:
+        """Remove a value if present."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry[1]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def set_budget(self, max_bytes: int) -> None:
+        """Change the budget, evicting entries beyond it."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict(max_bytes)
+
+    def shrink(self, keep: float = 0.5) -> int:
+        """Evict entries until at most a share of the budget is used.
+
+        Args:
+            keep: Share of the budget to keep, 0 to empty the cache.
+
+        Returns:
+            int: Number of bytes freed.
+        """
+        with self._lock:
+            before = self._size
+            self._evict(int(self.max_bytes * keep))
+            return before - self._size
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self.shrink(0)
+
+    def stats(self) -> CacheStats:
+        """Get the hit, miss and eviction counters and the current size."""
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              len(self._entries), self._size, self.max_bytes)
+
+    def _evict(self, limit: int) -> None:
+        """Drop least recently used entries until the size fits the limit."""
+        while self._size > limit and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._size -= size
+            self._evictions += 1
+
+
+def watch_memory_pressure(*caches: LRUCache):
+    """Shrink caches when the system reports low memory.
+
+    Connects to Gio.MemoryMonitor; the deeper the warning level, the more
+    of each cache is dropped.
+
+    Args:
+        caches: Caches to shrink.
+
+    Returns:
+        Optional[Gio.MemoryMonitor]: The monitor (keep a reference to it),
+                                     or None if GIO has none.
+    """
+    from gi.repository import Gio
+
+    if not hasattr(Gio, 'MemoryMonitor'):
+        return None  # GLib < 2.64
+
+    def on_low_memory(monitor, level):
+        keep = next((share for threshold, share in _LOW_MEMORY_KEEP if int(level) >= threshold), 1.0)
+        for cache in caches:
+            freed = cache.shrink(keep)
+            logger.info(f"Low memory: freed {freed // 1024} KiB from the {cache.name} cache")
+
+    monitor = Gio.MemoryMonitor.dup_default()
+    monitor.connect('low-memory-warning', on_low_memory)
+    return monitor
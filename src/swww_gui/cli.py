@@ -0,0 +1,266 @@
+"""
+Консольный режим SwwwGUI.
+Применяет обои без загрузки GTK, для скриптов входа и горячих клавиш:
+
+    swwwgui apply IMAGE [--outputs NAMES]
+    swwwgui restore
+    swwwgui next [--previous]
+    swwwgui random [DIR]
+    swwwgui slideshow [DIR] [--interval SECONDS] [--shuffle] [--per-monitor]
+
+Без подкоманды запускается графический интерфейс; `swwwgui --help` выводит справку.
+"""
+
+import os
+import sys
+import random
+import logging
+import argparse
+from typing import List, Optional
+
+from .config import SwwwGuiConfig
+from .swww_manager import SwwwManager
+from .prescale import PrescaleCache
+from .probe import EnvironmentProbe
+from .matugen import apply_with_matugen
+from .slideshow import Slideshow
+from .utils import get_image_files_in_directory
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = ('apply', 'restore', 'next', 'random', 'slideshow')
+
+def create_manager(config: SwwwGuiConfig) -> SwwwManager:
+    """Create a SwwwManager configured like the GUI one.
+
+    Args:
+        config: Application configuration.
+
+    Returns:
+        SwwwManager: Ready to use manager.
+    """
+    probe = EnvironmentProbe()
+    probe.probe()
+    return SwwwManager(
+        use_ipc=config.get('use_ipc', True),
+        prescale_cache=(PrescaleCache(lossy=config.get('prescale_lossy', False))
+                        if config.get('prescale_images', True) else None),
+        probe=probe
+    )
+
+
+def apply_image(manager: SwwwManager, config: SwwwGuiConfig, image_path: str,
+                outputs: str = '') -> bool:
+    """Apply an image with saved settings and remember it as the last image.
+
+    Args:
+        manager: SwwwManager to use.
+        config: Application configuration.
+        image_path: Image to apply.
+        outputs: Comma-separated output names, empty for all outputs.
+
+    Returns:
+        bool: True if successful, False otherwise.
+    """
+    image_path = os.path.abspath(image_path)
+    options = config.get_wallpaper_options()
+    options['monitor'] = outputs
+
+    if config.get('use_matugen', False) and not outputs:
+        matugen_binary = (manager.probe and manager.probe.path("matugen")) or "matugen"
+        success = apply_with_matugen(manager, image_path, options, matugen_binary)
+    else:
+        success = manager.set_wallpaper(image_path, options)
+
+    if success:
+        config.set('last_image', image_path)
+        config.save()
+    return success
+
+
+def _current_folder(config: SwwwGuiConfig) -> str:
+    """Get the folder of the last applied image, or the startup folder."""
+    last_image = config.get('last_image', '')
+    if last_image:
+        return os.path.dirname(last_image)
+    return config.get('startup_folder', '')
+
+
+def cmd_apply(manager: SwwwManager, config: SwwwGuiConfig, args: argparse.Namespace) -> bool:
+    """Apply a given image."""
+    if not os.path.isfile(args.image):
+        logger.error(f"Image not found: {args.image}")
+        return False
+    return apply_image(manager, config, args.image, args.outputs)
+
+
+def cmd_restore(manager: SwwwManager, config: SwwwGuiConfig, args: argparse.Namespace) -> bool:
+    """Apply the last saved wallpaper(s) again."""
+    last_image = config.get('last_image', '')
+    assignments = dict(config.get('output_images', {}) or {})
+    if assignments:
+        names = manager.get_monitors()
+        assignments = {name: path for name, path in assignments.items() if name in names}
+        for name in names:
+            if name not in assignments and last_image:
+                assignments[name] = last_image
+    if assignments:
+        options = config.get_wallpaper_options()
+        return all(manager.set_wallpapers(assignments, options).values())
+
+    if not last_image:
+        logger.error("No saved wallpaper to restore")
+        return False
+    return apply_image(manager, config, last_image, config.get('monitor', ''))
+
+
+def cmd_next(manager: SwwwManager, config: SwwwGuiConfig, args: argparse.Namespace) -> bool:
+    """Apply the next (or previous) image in the current folder."""
+    files = get_image_files_in_directory(_current_folder(config))
+    if not files:
+        logger.error("No images found in the current folder")
+        return False
+
+    last_image = config.get('last_image', '')
+    step = -1 if args.previous else 1
+    if last_image in files:
+        image_path = files[(files.index(last_image) + step) % len(files)]
+    else:
+        image_path = files[0] if step > 0 else files[-1]
+    return apply_image(manager, config, image_path, args.outputs)
+
+
+def cmd_random(manager: SwwwManager, config: SwwwGuiConfig, args: argparse.Namespace) -> bool:
+    """Apply a random image from a folder."""
+    folder = args.directory or _current_folder(config)
+    files = get_image_files_in_directory(folder)
+    # Avoid picking the image that is already shown
+    candidates = [path for path in files if path != config.get('last_image', '')] or files
+    if not candidates:
+        logger.error(f"No images found in {folder}")
+        return False
+    return apply_image(manager, config, random.choice(candidates), args.outputs)
+
+
+def cmd_slideshow(manager: SwwwManager, config: SwwwGuiConfig, args: argparse.Namespace) -> bool:
+    """Run a slideshow in the foreground, resuming the saved one if no folder is given."""
+    slideshow = Slideshow(manager, config)
+    # Refuse before touching the saved state another process is running
+    if not slideshow.claim():
+        logger.error(f"A slideshow is already running in process {slideshow.ownership.owner()}")
+        return False
+    slideshow.configure(interval=args.interval, shuffle=args.shuffle, per_monitor=args.per_monitor)
+    options = config.get_wallpaper_options()
+
+    if args.directory:
+        if not slideshow.start(folder=os.path.abspath(args.directory), options=options):
+            logger.error(f"No images found in {args.directory}")
+            return False
+    elif not slideshow.enabled:
+        logger.error("No saved slideshow to resume, give a folder")
+        return False
+
+    # Blocks until interrupted; the position is saved after every switch
+    slideshow.run(options)
+    return True
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser for headless commands."""
+    parser = argparse.ArgumentParser(
+        prog='swwwgui',
+        description='Set swww wallpapers. Run without a command to open the GUI.'
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output')
+    parser.add_argument('--start-daemon', action='store_true',
+                        help='Start swww-daemon first if it is not running')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    apply_parser = subparsers.add_parser('apply', help='Apply an image')
+    apply_parser.add_argument('image', help='Image file')
+    apply_parser.add_argument('-o', '--outputs', default='', help='Comma-separated output names')
+    apply_parser.set_defaults(func=cmd_apply)
+
+    restore_parser = subparsers.add_parser('restore', help='Apply the last saved wallpaper again')
+    restore_parser.set_defaults(func=cmd_restore)
+
+    next_parser = subparsers.add_parser('next', help='Apply the next image in the current folder')
+    next_parser.add_argument('-p', '--previous', action='store_true', help='Go backwards')
+    next_parser.add_argument('-o', '--outputs', default='', help='Comma-separated output names')
+    next_parser.set_defaults(func=cmd_next)
+
+    random_parser = subparsers.add_parser('random', help='Apply a random image from a folder')
+    random_parser.add_argument('directory', nargs='?', help='Folder to pick from')
+    random_parser.add_argument('-o', '--outputs', default='', help='Comma-separated output names')
+    random_parser.set_defaults(func=cmd_random)
+
+    slideshow_parser = subparsers.add_parser('slideshow', help='Rotate wallpapers from a folder')
+    slideshow_parser.add_argument('directory', nargs='?', help='Folder to rotate; resumes the saved slideshow if omitted')
+    slideshow_parser.add_argument('-i', '--interval', type=float, help='Seconds between wallpapers')
+    slideshow_parser.add_argument('--shuffle', dest='shuffle', action='store_const', const=True,
+                                  help='Show images in random order')
+    slideshow_parser.add_argument('--ordered', dest='shuffle', action='store_const', const=False,
+                                  help='Show images in name order')
+    slideshow_parser.add_argument('--per-monitor', dest='per_monitor', action='store_const', const=True,
+                                  help='Show a different image on each output')
+    slideshow_parser.add_argument('--single', dest='per_monitor', action='store_const', const=False,
+                                  help='Show the same image on all outputs')
+    slideshow_parser.set_defaults(func=cmd_slideshow)
+
+    return parser
+
+
+def run_headless(argv: List[str]) -> int:
+    """Run a headless command.
+
+    Args:
+        argv: Arguments without the program name.
+
+    Returns:
+        int: Exit status.
+    """
+    args = build_parser().parse_args(argv)
+    logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+
+    config = SwwwGuiConfig()
+    manager = create_manager(config)
+
+    if not manager.is_daemon_running():
+        if not args.start_daemon:
+            logger.error("swww-daemon is not running (use --start-daemon to start it)")
+            return 1
+        if not manager.start_daemon():
+            logger.error("Failed to start swww-daemon")
+            return 1
+
+    return 0 if args.func(manager, config, args) else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point: run a headless command, or the GUI if none is given.
+
+    Args:
+        argv: Full argument list including the program name.
+              Defaults to sys.argv.
+
+    Returns:
+        int: Exit status.
+    """
+    argv = sys.argv if argv is None else argv
+    args = argv[1:]
+
+    # The first non-option argument decides between headless and GUI mode
+    positional = [arg for arg in args if not arg.startswith('-')]
+    if positional and positional[0] in COMMANDS:
+        return run_headless(args)
+    if '-h' in args or '--help' in args:
+        build_parser().print_help()
+        return 0
+
+    # Imported here so headless commands never load GTK
+    from .application import main as gui_main
+    return gui_main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
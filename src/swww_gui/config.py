@@ -9,8 +9,10 @@ from .constants import (
     DEFAULT_TRANSITION_TYPE, DEFAULT_TRANSITION_STEP, DEFAULT_TRANSITION_FPS,
     DEFAULT_TRANSITION_DURATION, DEFAULT_TRANSITION_ANGLE, DEFAULT_TRANSITION_WAVE,
     DEFAULT_TRANSITION_POS, DEFAULT_TRANSITION_BEZIER, DEFAULT_RESIZE_MODE,
-    DEFAULT_FILL_COLOR, DEFAULT_FILTER_TYPE, SUPPORTED_LANGUAGES
+    DEFAULT_FILL_COLOR, DEFAULT_FILTER_TYPE, SUPPORTED_LANGUAGES,
+    THUMBNAIL_MEMORY_CACHE_MB, IMAGE_MEMORY_CACHE_MB
 )
+from .options import FIELDS as WALLPAPER_OPTION_KEYS
 
 logger = logging.getLogger(__name__)
 
@@ -91,6 +93,14 @@ class SwwwGuiConfig:
         """
         self.config[key] = value
     
+    def get_wallpaper_options(self) -> Dict[str, Any]:
+        """Get the saved options for SwwwManager.set_wallpaper.
+        
+        Returns:
+            Dict[str, Any]: Saved transition and image options.
+        """
+        return {key: self.config[key] for key in WALLPAPER_OPTION_KEYS if self.config.get(key) is not None}
+    
     def reset_to_defaults(self) -> None:
         """Reset configuration to default values.
         
@@ -135,9 +145,20 @@ class SwwwGuiConfig:
             'filter': DEFAULT_FILTER_TYPE,
             'invert_y': False,
             'monitor': '',
+            'output_images': {},
+            'slideshow': {},
             'favorites': [],
             'recent_folders': [],
             'use_matugen': False,
+            'use_ipc': True,
+            'prescale_images': True,
+            'prescale_lossy': False,
+            'thumbnail_backend': 'thread',
+            'thumbnail_store': 'freedesktop',
+            'thumbnail_cache_mb': THUMBNAIL_MEMORY_CACHE_MB,
+            'image_cache_mb': IMAGE_MEMORY_CACHE_MB,
+            'background_indexing': False,
+            'indexer': {},
             'startup_folder': str(DEFAULT_PICTURES_DIR),
             'language': 'en'  # Default language is English
         }
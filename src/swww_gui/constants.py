@@ -3,6 +3,7 @@
 Все жестко заданные значения должны быть определены здесь.
 """
 
+import os
 from pathlib import Path
 
 # Размеры окна по умолчанию
@@ -34,10 +35,63 @@ DEFAULT_RESIZE_MODE = 'crop'
 DEFAULT_FILL_COLOR = '000000'
 DEFAULT_FILTER_TYPE = 'Lanczos3'
 
+# Допустимые значения параметров swww img
+TRANSITION_TYPES = ('none', 'simple', 'fade', 'left', 'right', 'top', 'bottom',
+                    'wipe', 'wave', 'grow', 'center', 'any', 'outer', 'random')
+TRANSITION_POSITIONS = ('center', 'top', 'left', 'right', 'bottom',
+                        'top-left', 'top-right', 'bottom-left', 'bottom-right')
+RESIZE_MODES = ('crop', 'fit', 'no')
+FILTER_TYPES = ('Nearest', 'Bilinear', 'CatmullRom', 'Mitchell', 'Lanczos3')
+
+# Время жизни кэша состояния swww-daemon (секунды)
+DAEMON_STATE_TTL = 10.0
+
 # Пути
 DEFAULT_CONFIG_DIR = Path.home() / '.config' / 'swww-gui'
 DEFAULT_CONFIG_FILE = DEFAULT_CONFIG_DIR / 'config.json'
 DEFAULT_PICTURES_DIR = Path.home() / 'Pictures'
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'swww-gui'
+
+# Кэш изображений, заранее масштабированных под разрешение мониторов
+PRESCALE_CACHE_DIR = DEFAULT_CACHE_DIR / 'prescaled'
+PRESCALE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Общий кэш миниатюр по спецификации freedesktop (его же используют файловые менеджеры)
+THUMBNAIL_CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'thumbnails'
+
+# Упакованные миниатюры: один файл с плитками RGBA на папку
+THUMBNAIL_PACK_DIR = DEFAULT_CACHE_DIR / 'packs'
+
+# Крошечные превью (несколько цветов) для мгновенных заглушек в сетке
+PREVIEW_CACHE_DIR = DEFAULT_CACHE_DIR / 'previews'
+
+# Размер миниатюры в сетке (логические пиксели); число пикселей
+# текстуры умножается на масштаб экрана
+THUMBNAIL_DISPLAY_WIDTH = 120
+THUMBNAIL_DISPLAY_HEIGHT = 90
+
+# Максимум потоков декодирования миниатюр (не больше числа ядер)
+THUMBNAIL_MAX_WORKERS = 4
+
+# Сколько миллисекунд кадра можно тратить на вывод готовых миниатюр
+THUMBNAIL_FRAME_BUDGET_MS = 4
+
+# Фоновое создание миниатюр: сколько секунд ждать после действий пользователя
+INDEXER_IDLE_DELAY = 3
+
+# Бюджеты кэшей в памяти (МБ): миниатюры сетки и полноразмерные изображения предпросмотра
+THUMBNAIL_MEMORY_CACHE_MB = 64
+IMAGE_MEMORY_CACHE_MB = 512
+
+# Кэш путей и версий внешних программ
+PROBE_CACHE_FILE = DEFAULT_CACHE_DIR / 'probe.json'
+
+# Слайдшоу: интервал по умолчанию (секунды) и сколько следующих кадров готовить заранее
+SLIDESHOW_DEFAULT_INTERVAL = 300
+SLIDESHOW_PREFETCH_COUNT = 2
+
+# Файл-блокировка владельца слайдшоу: одновременно крутит обои только один процесс
+SLIDESHOW_LOCK_FILE = Path(os.environ.get('XDG_RUNTIME_DIR') or DEFAULT_CACHE_DIR) / 'swww-gui-slideshow.pid'
 
 # Для matugen
 MATUGEN_CONFIG_PATH = Path.home() / '.config' / 'matugen' / 'config.toml'
@@ -0,0 +1,172 @@
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .monitor import Monitor
+
+logger = logging.getLogger(__name__)
+
+DAEMON_PROCESS_NAME = "swww-daemon"
+
+
+def find_daemon_pid(name: str = DAEMON_PROCESS_NAME) -> Optional[int]:
+    """Find the PID of a running daemon of the current user by scanning /proc.
+
+    Opens a file per process, so it is only a fallback for when neither the
+    socket peer credentials nor a spawned process identify the daemon.
+
+    Args:
+        name: Process name to look for.
+
+    Returns:
+        Optional[int]: PID of the first matching process, or None.
+    """
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return None
+    uid = os.getuid()
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            if os.stat(f'/proc/{entry}').st_uid != uid:
+                continue  # Another user's daemon
+            with open(f'/proc/{entry}/comm', 'r') as f:
+                # comm is truncated to 15 characters
+                if f.read().strip() == name[:15]:
+                    return int(entry)
+        except OSError:
+            continue
+    return None
+
+
+def is_pid_alive(pid: int) -> bool:
+    """Check whether a process exists without spawning anything.
+
+    Args:
+        pid: Process ID.
+
+    Returns:
+        bool: True if the process exists, False otherwise.
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class DaemonState:
+    """Cached swww-daemon liveness and last `swww query` output.
+
+    The cached values stay valid until the TTL expires, the caller reports a
+    failure via invalidate(), or the daemon identity changes. The identity is
+    built from the socket file (inode and mtime) and the daemon PID, both of
+    which can be checked with a single syscall each.
+
+    The state is shared by the apply worker, the slideshow, the supervisor
+    and the GUI thread. Every method holds `lock`; callers that read several
+    attributes, or read and then write, hold it too.
+    """
+
+    def __init__(self, ttl: float = 10.0) -> None:
+        """Initialize the daemon state.
+
+        Args:
+            ttl: Seconds after which cached values are refreshed regardless.
+        """
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        self.socket_path: Optional[Path] = None
+        self.alive: Optional[bool] = None
+        self.query_output: Optional[str] = None
+        # Parsed outputs; survive invalidate_query() since sizes rarely change
+        self.monitors: Optional[List[Monitor]] = None
+        self.pid: Optional[int] = None
+        self._checked_at = 0.0
+        self._identity: Optional[Tuple] = None
+
+    def _current_identity(self) -> Tuple:
+        """Build the identity tuple for the daemon as it is right now."""
+        socket_sig = None
+        if self.socket_path:
+            try:
+                st = os.stat(self.socket_path)
+                socket_sig = (st.st_ino, st.st_mtime_ns)
+            except OSError:
+                pass
+        pid_alive = is_pid_alive(self.pid) if self.pid else None
+        return (socket_sig, self.pid, pid_alive)
+
+    def is_fresh(self) -> bool:
+        """Check whether the cached liveness can be used.
+
+        Returns:
+            bool: True if the cache is valid, False if it must be refreshed.
+        """
+        with self.lock:
+            if self.alive is None:
+                return False
+            if time.monotonic() - self._checked_at > self.ttl:
+                return False
+            return self._current_identity() == self._identity
+
+    def update(self, alive: bool, query_output: Optional[str] = None,
+               pid: Optional[int] = None) -> None:
+        """Store freshly observed daemon state.
+
+        Args:
+            alive: Whether the daemon is running.
+            query_output: Raw query output, if one was fetched.
+            pid: Daemon PID if known (socket peer or spawned process);
+                 otherwise it is looked up in /proc.
+        """
+        if alive and pid is None:
+            pid = find_daemon_pid()
+        with self.lock:
+            previous_identity = self._identity
+            self.alive = alive
+            self.query_output = query_output if alive else None
+            self.pid = pid if alive else None
+            self._checked_at = time.monotonic()
+            self._identity = self._current_identity()
+            # Keep parsed monitors across TTL refreshes of the same daemon
+            if not alive or self._identity != previous_identity:
+                self.monitors = None
+
+    def set_query_output(self, query_output: str) -> None:
+        """Cache query output for the current daemon."""
+        with self.lock:
+            self.query_output = query_output
+
+    def set_monitors(self, monitors: List[Monitor]) -> None:
+        """Cache parsed monitors for the current daemon."""
+        with self.lock:
+            self.monitors = monitors
+
+    def invalidate_query(self) -> None:
+        """Drop the cached query output, keeping liveness and monitors."""
+        with self.lock:
+            self.query_output = None
+
+    def invalidate_monitors(self) -> None:
+        """Drop cached query output and monitors, keeping liveness."""
+        with self.lock:
+            self.query_output = None
+            self.monitors = None
+
+    def invalidate(self) -> None:
+        """Drop all cached state."""
+        logger.debug("Daemon state invalidated")
+        with self.lock:
+            self.alive = None
+            self.query_output = None
+            self.monitors = None
+            self.pid = None
+            self._identity = None
@@ -0,0 +1,150 @@
+import time
+import logging
+import threading
+import subprocess
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Lifecycle events reported to on_event
+EVENT_STARTING = 'starting'
+EVENT_READY = 'ready'
+EVENT_FAILED = 'failed'
+EVENT_DIED = 'died'
+EVENT_RESTARTED = 'restarted'
+
+
+class DaemonSupervisor:
+    """Starts swww-daemon, waits for readiness and watches it afterwards.
+
+    A daemon started by the supervisor that exits with a non-zero status is
+    treated as a crash: it is restarted and the last wallpaper of every output
+    is applied again. A clean exit (`swww kill`) is only reported. A daemon
+    started elsewhere is watched through the manager's cached daemon state;
+    its death is reported but it is not restarted.
+
+    Events are delivered as on_event(event, detail) through `dispatch`,
+    which is GLib.idle_add in the GUI.
+    """
+
+    def __init__(self, manager, dispatch: Optional[Callable[..., Any]] = None,
+                 on_event: Optional[Callable[[str, Any], Any]] = None,
+                 ready_timeout: float = 5.0, watch_interval: float = 2.0,
+                 max_restarts: int = 3, restart_window: float = 60.0) -> None:
+        """Initialize the supervisor.
+
+        Args:
+            manager: SwwwManager used to launch and query the daemon.
+            dispatch: Function used to deliver events, called as
+                      dispatch(on_event, event, detail). Defaults to a direct call.
+            on_event: Event callback.
+            ready_timeout: Seconds to wait for a started daemon to answer.
+            watch_interval: Seconds between liveness checks.
+            max_restarts: Restarts allowed within restart_window before giving up.
+            restart_window: Window in seconds for counting restarts.
+        """
+        self.manager = manager
+        self._dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self._on_event = on_event
+        self.ready_timeout = ready_timeout
+        self.watch_interval = watch_interval
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self._process = None
+        self._restarts: List[float] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the daemon in the background and supervise it."""
+        self._run_in_thread(self._start_and_watch)
+
+    def watch(self) -> None:
+        """Supervise a daemon that is already running."""
+        self._run_in_thread(self._watch)
+
+    def stop(self) -> None:
+        """Stop supervising. The daemon itself keeps running."""
+        self._stop.set()
+
+    def _run_in_thread(self, target: Callable[[], None]) -> None:
+        """Run target on the supervisor thread unless one is already active."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                logger.debug("Daemon supervisor already running")
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=target, name="daemon-supervisor", daemon=True)
+            self._thread.start()
+
+    def _emit(self, event: str, detail: Any = None) -> None:
+        """Report a lifecycle event."""
+        logger.debug(f"swww-daemon event: {event}")
+        if self._on_event:
+            self._dispatch(self._on_event, event, detail)
+
+    def _launch(self) -> bool:
+        """Launch the daemon and wait until it is ready."""
+        self._emit(EVENT_STARTING)
+        self._process = self.manager.launch_daemon()
+        if self._process is None:
+            return False
+        return self.manager.wait_for_daemon(self.ready_timeout, self._process)
+
+    def _start_and_watch(self) -> None:
+        """Supervisor thread: start the daemon, then watch it."""
+        if self.manager.is_daemon_running():
+            self._emit(EVENT_READY)
+        elif self._launch():
+            self._emit(EVENT_READY)
+        else:
+            self._emit(EVENT_FAILED)
+            return
+        self._watch()
+
+    def _watch(self) -> None:
+        """Supervisor thread: wait for the daemon to die and react."""
+        while not self._stop.is_set():
+            if self._process is not None:
+                try:
+                    self._process.wait(timeout=self.watch_interval)
+                except subprocess.TimeoutExpired:
+                    continue  # Still running
+                if self._stop.is_set():
+                    return
+                returncode = self._process.returncode
+                self._process = None
+                self.manager.invalidate_daemon_state()
+                self._emit(EVENT_DIED, returncode)
+                if returncode == 0:
+                    return  # Deliberate shutdown
+                if not self._restart():
+                    return
+            else:
+                if self._stop.wait(self.watch_interval):
+                    return
+                if not self.manager.is_daemon_running():
+                    self._emit(EVENT_DIED, None)
+                    return
+
+    def _restart(self) -> bool:
+        """Restart a crashed daemon and restore wallpapers.
+
+        Returns:
+            bool: True if the daemon is running again, False if giving up.
+        """
+        now = time.monotonic()
+        self._restarts = [t for t in self._restarts if now - t < self.restart_window]
+        if len(self._restarts) >= self.max_restarts:
+            logger.error("swww-daemon keeps crashing, not restarting it again")
+            self._emit(EVENT_FAILED)
+            return False
+        self._restarts.append(now)
+
+        if not self._launch():
+            self._emit(EVENT_FAILED)
+            return False
+        results = self.manager.reapply_last()
+        self._emit(EVENT_RESTARTED, results)
+        return True
@@ -0,0 +1,256 @@
+import os
+import sys
+import time
+import ctypes
+import logging
+import platform
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .constants import INDEXER_IDLE_DELAY
+from .thumbnails import ThumbnailStore
+from .previews import PreviewStore, compute_preview
+
+logger = logging.getLogger(__name__)
+
+# Same formats the file chooser shows
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff', '.tga')
+
+# ioprio_set(2) syscall numbers; glibc has no wrapper
+_IOPRIO_SET_SYSCALL = {
+    'x86_64': 251,
+    'i386': 289,
+    'i686': 289,
+    'aarch64': 30,
+    'riscv64': 30,
+    'armv7l': 314,
+    'ppc64le': 273,
+}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+
+# Minimum time between two progress reports
+_PROGRESS_INTERVAL = 0.5
+
+
+def lower_thread_priority() -> None:
+    """Run the calling thread at idle CPU and I/O priority.
+
+    On Linux both the nice value and the I/O priority are per thread, so
+    the rest of the application keeps its normal priority.
+    """
+    tid = threading.get_native_id()
+    try:
+        os.setpriority(os.PRIO_PROCESS, tid, 19)
+    except (AttributeError, OSError) as e:
+        logger.debug(f"Cannot lower CPU priority: {e}")
+
+    syscall = _IOPRIO_SET_SYSCALL.get(platform.machine())
+    if not sys.platform.startswith('linux') or syscall is None:
+        return
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        ioprio = _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT
+        if libc.syscall(syscall, _IOPRIO_WHO_PROCESS, tid, ioprio) != 0:
+            logger.debug(f"Cannot lower I/O priority: {os.strerror(ctypes.get_errno())}")
+    except (OSError, AttributeError) as e:
+        logger.debug(f"Cannot lower I/O priority: {e}")
+
+
+class ThumbnailIndexer:
+    """Creates missing thumbnails of the user's wallpaper folders in the background.
+
+    Walks the startup folder, the recent folders and the folders of
+    favorites, and stores a thumbnail for every image that has none, so the
+    first visit to a folder finds them on disk. The worker thread runs at
+    idle CPU and I/O priority and waits whenever the user interacted with
+    the application within the last `idle_delay` seconds.
+
+    Fully indexed folders are remembered under 'indexer' in the config
+    together with their modification time, so an interrupted run resumes
+    with the folders it had not finished. Progress callbacks and config
+    writes go through `dispatch`, which is GLib.idle_add in the GUI.
+    """
+
+    def __init__(self, config, store: Optional[ThumbnailStore] = None,
+                 previews: Optional[PreviewStore] = None,
+                 dispatch: Optional[Callable[..., Any]] = None,
+                 on_progress: Optional[Callable[[int, int], Any]] = None,
+                 idle_delay: float = INDEXER_IDLE_DELAY) -> None:
+        """Initialize the indexer.
+
+        Args:
+            config: SwwwGuiConfig with the folders and the indexer state.
+            store: Thumbnail store to fill; defaults to the shared one.
+            previews: Store for placeholder previews, filled as well if given.
+            dispatch: Function used to deliver callbacks, called as
+                      dispatch(callback, *args). Defaults to a direct call.
+            on_progress: Called as on_progress(done, total); done == total
+                         when the run is finished.
+            idle_delay: Seconds without user activity before indexing continues.
+        """
+        self.config = config
+        self.store = store or ThumbnailStore()
+        self.previews = previews
+        self.size = 'normal'  # Size bucket the grid currently shows
+        self._dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self._on_progress = on_progress
+        self.idle_delay = idle_delay
+        self.state: Dict[str, Any] = dict(config.get('indexer', {}) or {})
+        self._cond = threading.Condition()
+        self._last_activity = time.monotonic()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the indexer thread is active."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def folders(self) -> List[str]:
+        """Get the existing root folders to index, without duplicates."""
+        candidates = [self.config.get('startup_folder')]
+        candidates.extend(self.config.get('recent_folders', []) or [])
+        for favorite in self.config.get('favorites', []) or []:
+            # Favorites may be images or folders
+            candidates.append(favorite if os.path.isdir(favorite) else os.path.dirname(favorite))
+
+        result = []
+        for folder in candidates:
+            if folder and os.path.isdir(folder):
+                folder = os.path.realpath(folder)
+                if folder not in result:
+                    result.append(folder)
+        return result
+
+    def start(self) -> None:
+        """Start indexing in the background."""
+        with self._cond:
+            if self.running and not self._stopping:
+                return
+            previous = self._thread
+        # A stopped run may still be finishing its current image
+        if previous is not None:
+            previous.join()
+        with self._cond:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="thumbnail-indexer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """Stop indexing after the current image.
+
+        Args:
+            timeout: Seconds to wait for the thread, None to wait indefinitely.
+        """
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def notify_activity(self) -> None:
+        """Pause indexing for `idle_delay` seconds because the user is busy."""
+        self._last_activity = time.monotonic()
+
+    def _wait_for_idle(self) -> bool:
+        """Wait until the user has been idle long enough.
+
+        Returns:
+            bool: False if the indexer is stopping.
+        """
+        with self._cond:
+            while not self._stopping:
+                remaining = self._last_activity + self.idle_delay - time.monotonic()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(remaining)
+            return False
+
+    def _scan(self) -> Dict[str, List[str]]:
+        """List the images of every folder that changed since it was indexed."""
+        done = self.state.get('done', {})
+        pending: Dict[str, List[str]] = {}
+        for root in self.folders():
+            for folder, dirs, files in os.walk(root):
+                if self._stopping:
+                    return pending
+                # Skip hidden folders and the thumbnail cache itself
+                dirs[:] = sorted(
+                    d for d in dirs
+                    if not d.startswith('.') and os.path.join(folder, d) != str(self.store.cache_dir)
+                )
+                if folder in pending:
+                    continue  # Reached again from another root
+                try:
+                    mtime = os.stat(folder).st_mtime
+                except OSError:
+                    continue
+                if done.get(folder) == mtime:
+                    continue
+                pending[folder] = sorted(
+                    os.path.join(folder, name) for name in files
+                    if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+                )
+        return pending
+
+    def _run(self) -> None:
+        """Indexer thread."""
+        lower_thread_priority()
+        if not self._wait_for_idle():
+            return
+        pending = self._scan()
+        total = sum(len(images) for images in pending.values())
+        processed = 0
+        created = 0
+        last_report = 0.0
+        logger.info(f"Indexing {total} images in {len(pending)} folders")
+
+        for folder, images in pending.items():
+            for image_path in images:
+                if not self._wait_for_idle():
+                    return
+                missing = not self.store.lookup(image_path, self.size)
+                if (missing or (self.previews and not self.previews.has(image_path))) \
+                        and not self.store.has_failed(image_path):
+                    try:
+                        thumbnail = self.store.load(image_path, self.size)
+                        if thumbnail is not None:
+                            created += missing
+                            if self.previews:
+                                self.previews.put(image_path, compute_preview(thumbnail))
+                    except Exception as e:
+                        logger.debug(f"Indexing {image_path} failed: {e}")
+                processed += 1
+                if time.monotonic() - last_report >= _PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    self._report(processed, total)
+            self._mark_done(folder)
+            if self.previews:
+                self.previews.flush()
+
+        logger.info(f"Indexing finished, {created} thumbnails created")
+        self._report(total, total)
+
+    def _report(self, done: int, total: int) -> None:
+        """Deliver a progress update."""
+        if self._on_progress:
+            self._dispatch(self._on_progress, done, total)
+
+    def _mark_done(self, folder: str) -> None:
+        """Remember a fully indexed folder and save the state."""
+        try:
+            mtime = os.stat(folder).st_mtime
+        except OSError:
+            return
+        done = dict(self.state.get('done', {}))
+        done[folder] = mtime
+        self.state['done'] = done
+        self._dispatch(self._save_state, dict(self.state))
+
+    def _save_state(self, state: Dict[str, Any]) -> bool:
+        """Write a state snapshot to the config file."""
+        self.config.set('indexer', state)
+        self.config.save()
+        return False  # Remove from idle queue
@@ -0,0 +1,144 @@
+import os
+import json
+import logging
+import subprocess
+from pathlib import Path
+from typing import Any, Dict
+
+from .constants import MATUGEN_CONFIG_PATH
+from .options import TransitionOptions
+
+logger = logging.getLogger(__name__)
+
+
+def apply_with_matugen(swww_manager, image_path: str, options: Dict[str, Any],
+                       matugen_binary: str = "matugen") -> bool:
+    """Apply wallpaper using matugen.
+    
+    Falls back to plain swww if the matugen config can't be updated
+    or matugen fails.
+    
+    Args:
+        swww_manager: SwwwManager used for the fallback
+        image_path: Path to the image file
+        options: Options as described in SwwwManager.set_wallpaper
+        matugen_binary: matugen executable
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        # First, update matugen config file
+        config_updated = update_matugen_config(options)
+        if not config_updated:
+            # Fallback to standard swww if config update failed
+            logger.warning("Failed to update matugen config")
+            return swww_manager.set_wallpaper(image_path, options)
+
+        # Then run matugen command
+        logger.debug(f"Running matugen with image: {image_path}")
+        result = subprocess.run(
+            [matugen_binary, "image", image_path],
+            capture_output=True,
+            text=True
+        )
+
+        if result.returncode != 0:
+            logger.warning(f"Matugen failed with exit code {result.returncode}: {result.stderr}")
+            # Fallback to standard swww if matugen failed
+            return swww_manager.set_wallpaper(image_path, options)
+
+        return True
+    except Exception as e:
+        logger.error(f"Error applying with matugen: {e}")
+        # Fallback to standard swww
+        return swww_manager.set_wallpaper(image_path, options)
+
+
+def update_matugen_config(options: Dict[str, Any], config_path: Path = MATUGEN_CONFIG_PATH) -> bool:
+    """Update matugen config file with swww options.
+    
+    Args:
+        options: Options as described in SwwwManager.set_wallpaper
+        config_path: Path to matugen's config.toml
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    config_path = str(config_path)
+
+    try:
+        # Check if the directory exists, create if not
+        os.makedirs(os.path.dirname(config_path), exist_ok=True)
+
+        # Same flags as a direct `swww img` call; matugen appends the image path
+        args = TransitionOptions.from_dict(options).to_matugen_args()
+
+        # Прочитаем существующий конфиг или создадим новый
+        config_content = ""
+        if os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                config_content = f.read()
+
+        # Создаем новый контент на основе существующего, но с обновленной секцией wallpaper
+        new_config_content = ""
+
+        # Если конфиг пустой, создаем с нуля
+        if not config_content.strip():
+            new_config_content = f"""[config.wallpaper]
+command = "swww"
+arguments = {json.dumps(args)}
+set = true
+"""
+        else:
+            # Разбиваем конфиг на секции
+            sections = []
+            current_section = ""
+            current_section_name = ""
+            lines = config_content.split("\n")
+
+            for line in lines:
+                # Если встретили начало новой секции
+                if line.strip().startswith("[") and line.strip().endswith("]"):
+                    # Если в текущей секции есть содержимое, добавляем её
+                    if current_section:
+                        # Пропускаем секцию wallpaper, она будет обновлена позже
+                        if current_section_name != "[config.wallpaper]":
+                            sections.append((current_section_name, current_section))
+                    # Начинаем новую секцию
+                    current_section_name = line.strip()
+                    current_section = line + "\n"
+                else:
+                    # Добавляем строку в текущую секцию
+                    if current_section_name:  # Если есть имя секции
+                        current_section += line + "\n"
+
+            # Добавляем последнюю секцию, если она есть и это не wallpaper
+            if current_section and current_section_name != "[config.wallpaper]":
+                sections.append((current_section_name, current_section))
+
+            # Собираем все обратно, добавляя обновленную секцию wallpaper
+            for name, content in sections:
+                new_config_content += content
+
+            # Добавляем обновленную секцию wallpaper
+            if new_config_content and not new_config_content.endswith("\n\n"):
+                if not new_config_content.endswith("\n"):
+                    new_config_content += "\n"
+                new_config_content += "\n"
+
+            new_config_content += f"""[config.wallpaper]
+command = "swww"
+arguments = {json.dumps(args)}
+set = true
+"""
+
+        # Записываем обновленный конфиг
+        with open(config_path, "w") as f:
+            f.write(new_config_content)
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Error updating matugen config: {e}")
+        return False
@@ -0,0 +1,97 @@
+import re
+import logging
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "[namespace: ]NAME: WxH, key: value, ..., currently displaying: KIND: VALUE"
+_OUTPUT_LINE = re.compile(
+    r'^(?:[^:]*:\s+)?(?P<name>[^:\s]+):\s*(?P<width>\d+)x(?P<height>\d+)(?P<rest>.*)$'
+)
+_DISPLAYING = "currently displaying:"
+
+
+@dataclass(frozen=True)
+class Monitor:
+    """A wallpaper output as reported by `swww query`."""
+
+    name: str
+    width: int = 0
+    height: int = 0
+    scale: float = 1.0
+    format: Optional[str] = None
+    current_image: Optional[str] = None
+    current_color: Optional[str] = None
+
+    @property
+    def resolution(self) -> Tuple[int, int]:
+        """Output size in pixels as (width, height)."""
+        return (self.width, self.height)
+
+    def with_image(self, image_path: str) -> 'Monitor':
+        """Return a copy of this monitor displaying the given image."""
+        return replace(self, current_image=image_path, current_color=None)
+
+
+def parse_query_output(output: str) -> List[Monitor]:
+    """Parse `swww query` output into monitor records.
+
+    Handles both the current "NAME: WxH, scale: S, ..." layout (optionally
+    prefixed with a namespace) and the old "Output: NAME" layout.
+
+    Args:
+        output: Raw query output.
+
+    Returns:
+        List[Monitor]: One record per output line.
+    """
+    monitors = []
+    for line in output.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith("Output:"):
+            monitors.append(Monitor(name=line.split("Output:", 1)[1].strip()))
+            continue
+
+        match = _OUTPUT_LINE.match(line)
+        if not match:
+            logger.debug(f"Unrecognized swww query line: {line}")
+            continue
+
+        fields = {}
+        rest = match.group('rest')
+        displaying = None
+        if _DISPLAYING in rest:
+            rest, displaying = rest.split(_DISPLAYING, 1)
+        for part in rest.split(','):
+            if ':' in part:
+                key, value = part.split(':', 1)
+                fields[key.strip()] = value.strip()
+
+        current_image = None
+        current_color = None
+        if displaying:
+            kind, _, value = displaying.strip().partition(':')
+            if kind.strip() == 'image':
+                current_image = value.strip()
+            elif kind.strip() == 'color':
+                current_color = value.strip()
+
+        try:
+            scale = float(fields.get('scale', 1))
+        except ValueError:
+            scale = 1.0
+
+        monitors.append(Monitor(
+            name=match.group('name'),
+            width=int(match.group('width')),
+            height=int(match.group('height')),
+            scale=scale,
+            format=fields.get('format'),
+            current_image=current_image,
+            current_color=current_color,
+        ))
+    return monitors
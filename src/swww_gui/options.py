@@ -0,0 +1,234 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from .constants import (
+    DEFAULT_TRANSITION_TYPE, DEFAULT_TRANSITION_STEP, DEFAULT_TRANSITION_FPS,
+    DEFAULT_RESIZE_MODE, DEFAULT_FILL_COLOR, DEFAULT_FILTER_TYPE,
+    TRANSITION_TYPES, TRANSITION_POSITIONS, RESIZE_MODES, FILTER_TYPES
+)
+
+# Option names, in the order they appear in option dicts and the config
+FIELDS = (
+    'transition_type', 'transition_step', 'transition_fps', 'transition_duration',
+    'transition_angle', 'transition_wave', 'transition_pos', 'invert_y',
+    'transition_bezier', 'resize_mode', 'fill_color', 'filter'
+)
+
+# Transitions that take an angle, a wave size or a position
+ANGLED_TRANSITIONS = ('wipe', 'wave')
+POSITIONED_TRANSITIONS = ('grow', 'outer', 'center', 'any')
+
+# swww's own step default for transitions other than 'simple'
+DEFAULT_EFFECT_STEP = 90
+
+_NUMBER = r'-?(?:\d+(?:\.\d*)?|\.\d+)'
+_PAIR_RE = re.compile(rf'^{_NUMBER},{_NUMBER}$')
+_BEZIER_RE = re.compile(rf'^{_NUMBER},{_NUMBER},{_NUMBER},{_NUMBER}$')
+_COLOR_RE = re.compile(r'^[0-9a-fA-F]{6}(?:[0-9a-fA-F]{2})?$')
+
+
+def _number(name: str, value: Any, cast, minimum=None, maximum=None):
+    """Convert and range-check a numeric option."""
+    try:
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {value!r}")
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise ValueError(f"{name} must be between {minimum} and {maximum}, got {value!r}")
+    return number
+
+
+def _choice(name: str, value: Any, choices: Tuple[str, ...]) -> str:
+    """Check that an option is one of the allowed values."""
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+    return value
+
+
+def _pattern(name: str, value: Any, pattern: re.Pattern) -> str:
+    """Check a text option against a pattern, ignoring spaces."""
+    text = str(value).replace(' ', '')
+    if not pattern.match(text):
+        raise ValueError(f"Invalid {name}: {value!r}")
+    return text
+
+
+def _format_number(value: Union[int, float]) -> str:
+    """Format a number for the command line without a useless '.0'."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+@lru_cache(maxsize=64)
+def _build_flags(values: Tuple) -> Tuple[str, ...]:
+    """Build the `swww img` flags for a tuple of option values in FIELDS order.
+
+    Shared by the swww and matugen serializations, so both always agree.
+    """
+    o = dict(zip(FIELDS, values))
+    transition_type = o['transition_type']
+    flags: List[str] = []
+
+    if o['resize_mode'] == 'no':
+        flags.append("--no-resize")
+    else:
+        flags.extend(["--resize", o['resize_mode']])
+    flags.extend(["--fill-color", o['fill_color']])
+    # The fastest filter for instant previews
+    flags.extend(["--filter", "Nearest" if transition_type == 'none' else o['filter']])
+
+    flags.extend(["--transition-type", transition_type])
+    step = o['transition_step']
+    if step is None:
+        step = DEFAULT_TRANSITION_STEP if transition_type == 'simple' else DEFAULT_EFFECT_STEP
+    flags.extend(["--transition-step", str(step)])
+    if o['transition_duration'] is not None:
+        flags.extend(["--transition-duration", _format_number(o['transition_duration'])])
+    flags.extend(["--transition-fps", str(o['transition_fps'])])
+
+    if transition_type in ANGLED_TRANSITIONS and o['transition_angle'] is not None:
+        flags.extend(["--transition-angle", _format_number(o['transition_angle'])])
+    if transition_type == 'wave' and o['transition_wave']:
+        flags.extend(["--transition-wave", o['transition_wave']])
+    if transition_type in POSITIONED_TRANSITIONS:
+        if o['transition_pos']:
+            flags.extend(["--transition-pos", o['transition_pos']])
+        if o['invert_y']:
+            flags.append("--invert-y")
+    if transition_type == 'fade' and o['transition_bezier']:
+        flags.extend(["--transition-bezier", o['transition_bezier']])
+
+    return tuple(flags)
+
+
+class TransitionOptions:
+    """Validated, immutable set of `swww img` options.
+
+    Values are checked once on construction. The command-line flags are
+    built once per distinct set of values and shared by to_swww_args()
+    and to_matugen_args(), so swww and the matugen config never disagree.
+    Type-specific options left as None fall back to swww's defaults.
+    """
+
+    __slots__ = FIELDS + ('_flags',)
+
+    def __init__(self, transition_type: str = DEFAULT_TRANSITION_TYPE,
+                 transition_step: Optional[int] = None,
+                 transition_fps: int = DEFAULT_TRANSITION_FPS,
+                 transition_duration: Optional[float] = None,
+                 transition_angle: Optional[float] = None,
+                 transition_wave: Optional[str] = None,
+                 transition_pos: Optional[str] = None,
+                 invert_y: bool = False,
+                 transition_bezier: Optional[str] = None,
+                 resize_mode: str = DEFAULT_RESIZE_MODE,
+                 fill_color: str = DEFAULT_FILL_COLOR,
+                 filter: str = DEFAULT_FILTER_TYPE) -> None:
+        """Initialize and validate the options.
+
+        Raises:
+            ValueError: If any value is out of range or malformed.
+        """
+        init = object.__setattr__
+        init(self, 'transition_type', _choice('transition_type', transition_type, TRANSITION_TYPES))
+        init(self, 'transition_step', None if transition_step is None
+             else _number('transition_step', transition_step, int, 1, 255))
+        init(self, 'transition_fps', _number('transition_fps', transition_fps, int, 1, 1000))
+        init(self, 'transition_duration', None if transition_duration is None
+             else _number('transition_duration', transition_duration, float, 0, 3600))
+        init(self, 'transition_angle', None if transition_angle is None
+             else _number('transition_angle', transition_angle, float, -360, 360))
+        init(self, 'transition_wave', None if not transition_wave
+             else _pattern('transition_wave', transition_wave, _PAIR_RE))
+        if transition_pos and transition_pos not in TRANSITION_POSITIONS:
+            transition_pos = _pattern('transition_pos', transition_pos, _PAIR_RE)
+        init(self, 'transition_pos', transition_pos or None)
+        init(self, 'invert_y', bool(invert_y))
+        init(self, 'transition_bezier', None if not transition_bezier
+             else _pattern('transition_bezier', transition_bezier, _BEZIER_RE))
+        init(self, 'resize_mode', _choice('resize_mode', resize_mode, RESIZE_MODES))
+        init(self, 'fill_color', _pattern('fill_color', str(fill_color).lstrip('#'), _COLOR_RE))
+        init(self, 'filter', _choice('filter', filter, FILTER_TYPES))
+        init(self, '_flags', None)
+
+    @classmethod
+    def from_dict(cls, options: Optional[Mapping[str, Any]]) -> 'TransitionOptions':
+        """Build options from a dict, ignoring unrelated keys such as 'monitor'.
+
+        Args:
+            options: Option dict as used by SwwwManager.set_wallpaper, or
+                     an existing TransitionOptions which is returned as is.
+
+        Returns:
+            TransitionOptions: Validated options.
+
+        Raises:
+            ValueError: If any value is out of range or malformed.
+        """
+        if isinstance(options, cls):
+            return options
+        options = options or {}
+        return cls(**{key: options[key] for key in FIELDS if options.get(key) is not None})
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("TransitionOptions is immutable, use replace()")
+
+    def _values(self) -> Tuple:
+        """Get the option values in FIELDS order."""
+        return tuple(getattr(self, key) for key in FIELDS)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TransitionOptions):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{key}={getattr(self, key)!r}" for key in FIELDS)
+        return f"TransitionOptions({values})"
+
+    def replace(self, **changes: Any) -> 'TransitionOptions':
+        """Get a copy with some options changed."""
+        return TransitionOptions(**dict(self.to_dict(), **changes))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the options as a dict, leaving out unset ones."""
+        return {key: getattr(self, key) for key in FIELDS if getattr(self, key) is not None}
+
+    @property
+    def scale_filter(self) -> str:
+        """The filter swww actually scales with."""
+        return "Nearest" if self.transition_type == 'none' else self.filter
+
+    def flags(self) -> Tuple[str, ...]:
+        """Get the `swww img` flags for these options (memoized)."""
+        if self._flags is None:
+            object.__setattr__(self, '_flags', _build_flags(self._values()))
+        return self._flags
+
+    def to_swww_args(self, image_path: str, outputs: str = '') -> List[str]:
+        """Get the arguments of a `swww img` call.
+
+        Args:
+            image_path: Image to show.
+            outputs: Comma-separated output names, empty for all outputs.
+
+        Returns:
+            List[str]: Arguments, without the swww executable itself.
+        """
+        args = ["img", image_path]
+        if outputs:
+            args.extend(["--outputs", outputs])
+        args.extend(self.flags())
+        return args
+
+    def to_matugen_args(self) -> List[str]:
+        """Get the swww arguments for matugen's [config.wallpaper] section.
+
+        matugen appends the image path itself.
+        """
+        return ["img"] + list(self.flags())
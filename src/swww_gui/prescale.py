@@ -0,0 +1,240 @@
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .constants import PRESCALE_CACHE_DIR, PRESCALE_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# swww filter -> closest GdkPixbuf interpolation
+_FILTER_INTERP = {
+    'Nearest': 'NEAREST',
+    'Bilinear': 'BILINEAR',
+    'CatmullRom': 'HYPER',
+    'Mitchell': 'HYPER',
+    'Lanczos3': 'HYPER',
+}
+
+# Formats swww plays as animations; a scaled copy would keep one frame
+_ANIMATED_EXTENSIONS = ('.gif',)
+
+
+def is_animated(image_path: str) -> bool:
+    """Check whether swww may play an image as an animation.
+
+    Args:
+        image_path: Source image.
+
+    Returns:
+        bool: True if the image must be sent to swww as it is.
+    """
+    return image_path.lower().endswith(_ANIMATED_EXTENSIONS)
+
+
+class PrescaleCache:
+    """On-disk cache of images already scaled to an output's resolution.
+
+    swww decodes and rescales the source image on every `swww img` call.
+    Handing it an image that already matches the output size lets it skip
+    the resize (`--no-resize`) and decode a much smaller file. Entries are
+    keyed by source path, mtime, size, target resolution, resize mode,
+    filter and fill color, so any change produces a new entry.
+
+    Scaled images are stored as PNG with light compression, so the
+    wallpaper is exactly the scaled source. Lossy mode keeps JPEG sources
+    as quality 95 JPEG instead: a much smaller cache at the price of a
+    second encoding generation.
+    """
+
+    def __init__(self, cache_dir: Path = PRESCALE_CACHE_DIR,
+                 max_bytes: int = PRESCALE_CACHE_MAX_BYTES,
+                 lossy: bool = False) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding the scaled images.
+            max_bytes: Size budget; oldest entries are removed beyond it.
+            lossy: Re-encode JPEG sources as JPEG instead of lossless PNG.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.lossy = lossy
+        self._lock = threading.Lock()
+
+    def cache_path(self, image_path: str, resolution: Tuple[int, int], resize_mode: str,
+                   filter_type: str, fill_color: str) -> Optional[Path]:
+        """Get the cache location for a scaled image.
+
+        Args:
+            image_path: Source image.
+            resolution: Target (width, height).
+            resize_mode: 'crop' or 'fit'.
+            filter_type: swww filter name.
+            fill_color: Padding color used by 'fit'.
+
+        Returns:
+            Optional[Path]: Cache path, or None if the source is unreadable.
+        """
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        key = "|".join(str(part) for part in (
+            os.path.abspath(image_path), st.st_mtime_ns, st.st_size,
+            resolution[0], resolution[1], resize_mode, filter_type, fill_color.lstrip('#').lower()
+        ))
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        is_jpeg = image_path.lower().endswith(('.jpg', '.jpeg'))
+        ext = '.jpg' if self.lossy and is_jpeg else '.png'
+        return self.cache_dir / f"{digest}{ext}"
+
+    def get(self, image_path: str, resolution: Tuple[int, int], resize_mode: str,
+            filter_type: str, fill_color: str) -> Optional[str]:
+        """Get a cached scaled image without creating it.
+
+        Returns:
+            Optional[str]: Path to the scaled image, or None on a miss.
+        """
+        path = self.cache_path(image_path, resolution, resize_mode, filter_type, fill_color)
+        if path and path.exists():
+            try:
+                os.utime(path)  # Keep recently used entries when pruning
+            except OSError:
+                pass
+            return str(path)
+        return None
+
+    def prescale(self, image_path: str, resolution: Tuple[int, int], resize_mode: str,
+                 filter_type: str, fill_color: str) -> Optional[str]:
+        """Get a scaled copy of an image, creating it if needed.
+
+        Args:
+            image_path: Source image.
+            resolution: Target (width, height).
+            resize_mode: 'crop' or 'fit'; anything else is not pre-scaled.
+            filter_type: swww filter name.
+            fill_color: Padding color used by 'fit', hex RRGGBB.
+
+        Returns:
+            Optional[str]: Path to the scaled image, or None if it could not
+                           be produced or is animated, and the original
+                           should be used.
+        """
+        if resize_mode not in ('crop', 'fit') or resolution[0] <= 0 or resolution[1] <= 0:
+            return None
+        if is_animated(image_path):
+            return None
+
+        cached = self.get(image_path, resolution, resize_mode, filter_type, fill_color)
+        if cached:
+            return cached
+
+        path = self.cache_path(image_path, resolution, resize_mode, filter_type, fill_color)
+        if path is None:
+            return None
+
+        try:
+            pixbuf = self._render(image_path, resolution, resize_mode, filter_type, fill_color)
+            if pixbuf is None:
+                return None
+            self._save(pixbuf, path)
+        except Exception as e:
+            logger.warning(f"Failed to pre-scale {image_path}: {e}")
+            return None
+
+        logger.debug(f"Pre-scaled {image_path} to {resolution[0]}x{resolution[1]}")
+        self.prune()
+        return str(path)
+
+    def prune(self) -> None:
+        """Remove the least recently used entries beyond the size budget."""
+        with self._lock:
+            try:
+                entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_file()]
+            except OSError:
+                return
+            stats = [(entry.path, entry.stat()) for entry in entries]
+            total = sum(st.st_size for _, st in stats)
+            for path, st in sorted(stats, key=lambda item: item[1].st_mtime):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= st.st_size
+                except OSError:
+                    pass
+
+    def _render(self, image_path, resolution, resize_mode, filter_type, fill_color):
+        """Scale an image to the target resolution with GdkPixbuf."""
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf
+
+        info = GdkPixbuf.Pixbuf.get_file_info(image_path)
+        if info is None or info[0] is None:
+            return None
+        _, src_width, src_height = info
+        target_width, target_height = resolution
+
+        if resize_mode == 'crop':
+            scale = max(target_width / src_width, target_height / src_height)
+        else:
+            scale = min(target_width / src_width, target_height / src_height)
+        scaled_width = max(1, round(src_width * scale))
+        scaled_height = max(1, round(src_height * scale))
+        if resize_mode == 'crop':
+            # Rounding must never leave the cover smaller than the output
+            scaled_width = max(scaled_width, target_width)
+            scaled_height = max(scaled_height, target_height)
+
+        # Let the loader shrink huge sources (DCT scaling for JPEG) down to
+        # twice the target, then apply the requested filter for the final step
+        load_width = min(src_width, scaled_width * 2)
+        load_height = min(src_height, scaled_height * 2)
+        if load_width < src_width:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(image_path, load_width, load_height, True)
+        else:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(image_path)
+
+        interp = getattr(GdkPixbuf.InterpType, _FILTER_INTERP.get(filter_type, 'HYPER'))
+        if (pixbuf.get_width(), pixbuf.get_height()) != (scaled_width, scaled_height):
+            pixbuf = pixbuf.scale_simple(scaled_width, scaled_height, interp)
+
+        if resize_mode == 'crop':
+            x = (scaled_width - target_width) // 2
+            y = (scaled_height - target_height) // 2
+            return pixbuf.new_subpixbuf(x, y, target_width, target_height).copy()
+
+        # 'fit': center on a canvas filled with the fill color
+        canvas = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, False, 8, target_width, target_height)
+        color = fill_color.lstrip('#')[:6].ljust(6, '0')
+        canvas.fill((int(color, 16) << 8) | 0xFF)
+        x = (target_width - scaled_width) // 2
+        y = (target_height - scaled_height) // 2
+        pixbuf.composite(canvas, x, y, scaled_width, scaled_height, x, y, 1.0, 1.0,
+                         GdkPixbuf.InterpType.NEAREST, 255)
+        return canvas
+
+    def _save(self, pixbuf, path: Path) -> None:
+        """Write a pixbuf to the cache atomically."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if path.suffix == '.jpg':
+            # Only in lossy mode, see cache_path()
+            file_type, keys, values = "jpeg", ["quality"], ["95"]
+        else:
+            file_type, keys, values = "png", ["compression"], ["1"]
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=path.suffix)
+        os.close(fd)
+        try:
+            pixbuf.savev(tmp_path, file_type, keys, values)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
@@ -0,0 +1,170 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from .constants import PREVIEW_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# Size of a preview: a few colors laid out like the image, scaled up
+# smoothly they look like a blurred version of it
+PREVIEW_WIDTH = 4
+PREVIEW_HEIGHT = 3
+PREVIEW_BYTES = PREVIEW_WIDTH * PREVIEW_HEIGHT * 3
+
+# Write a folder's previews after this many new ones
+_FLUSH_EVERY = 32
+
+
+def compute_preview(image) -> Optional[bytes]:
+    """Reduce a thumbnail to a PREVIEW_WIDTH x PREVIEW_HEIGHT RGB image.
+
+    Args:
+        image: GdkPixbuf.Pixbuf, or an object with to_pixbuf() such as
+               DecodedThumbnail.
+
+    Returns:
+        Optional[bytes]: Tightly packed RGB pixels, or None on failure.
+    """
+    import gi
+    gi.require_version('GdkPixbuf', '2.0')
+    from gi.repository import GdkPixbuf
+
+    pixbuf = image.to_pixbuf() if hasattr(image, 'to_pixbuf') else image
+    small = pixbuf.scale_simple(PREVIEW_WIDTH, PREVIEW_HEIGHT, GdkPixbuf.InterpType.TILES)
+    if small is None:
+        return None
+    channels = small.get_n_channels()
+    rowstride = small.get_rowstride()
+    pixels = small.read_pixel_bytes().get_data()
+    return bytes(
+        pixels[y * rowstride + x * channels + c]
+        for y in range(PREVIEW_HEIGHT) for x in range(PREVIEW_WIDTH) for c in range(3)
+    )
+
+
+def preview_texture(preview: bytes):
+    """Wrap a preview into a Gdk.MemoryTexture."""
+    import gi
+    gi.require_version('Gdk', '4.0')
+    from gi.repository import Gdk, GLib
+
+    return Gdk.MemoryTexture.new(PREVIEW_WIDTH, PREVIEW_HEIGHT, Gdk.MemoryFormat.R8G8B8,
+                                 GLib.Bytes.new(preview), PREVIEW_WIDTH * 3)
+
+
+class PreviewStore:
+    """Tiny previews of images, one small JSON file per folder.
+
+    A preview is computed once, when a thumbnail is decoded or indexed, and
+    read for the whole folder with a single file read when the folder is
+    opened. The grid paints it as the tile placeholder at once, so a folder
+    with a cold thumbnail cache looks populated in the first frame.
+    """
+
+    def __init__(self, cache_dir: Path = PREVIEW_CACHE_DIR) -> None:
+        """Initialize the store.
+
+        Args:
+            cache_dir: Directory holding the per-folder files.
+        """
+        self.cache_dir = Path(cache_dir)
+        self._folders: Dict[str, Dict[str, str]] = {}
+        self._unsaved: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def folder_path(self, folder: str) -> Path:
+        """Get the preview file of a folder."""
+        digest = hashlib.md5(os.fsencode(os.path.abspath(folder))).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _folder(self, folder: str) -> Dict[str, str]:
+        """Get the previews of a folder, reading them on first use (lock held)."""
+        previews = self._folders.get(folder)
+        if previews is None:
+            try:
+                with open(self.folder_path(folder)) as f:
+                    previews = json.load(f)
+                if not isinstance(previews, dict):
+                    previews = {}
+            except (OSError, ValueError):
+                previews = {}
+            self._folders[folder] = previews
+        return previews
+
+    def load_folder(self, folder: str, names: Optional[Iterable[str]] = None) -> Dict[str, bytes]:
+        """Get all known previews of a folder.
+
+        Args:
+            folder: Folder path.
+            names: File names currently in the folder; when given, previews
+                   of other files are forgotten.
+
+        Returns:
+            Dict[str, bytes]: File name -> RGB preview.
+        """
+        folder = os.path.abspath(folder)
+        with self._lock:
+            stored = self._folder(folder)
+            if names is not None:
+                names = set(names)
+                removed = [name for name in stored if name not in names]
+                for name in removed:
+                    del stored[name]
+                if removed:
+                    self._unsaved[folder] = self._unsaved.get(folder, 0) + len(removed)
+            previews = dict(stored)
+        result = {}
+        for name, value in previews.items():
+            try:
+                data = bytes.fromhex(value)
+            except (TypeError, ValueError):
+                continue
+            if len(data) == PREVIEW_BYTES:
+                result[name] = data
+        return result
+
+    def has(self, file_path: str) -> bool:
+        """Check whether an image has a preview."""
+        folder, name = os.path.split(os.path.abspath(file_path))
+        with self._lock:
+            return name in self._folder(folder)
+
+    def put(self, file_path: str, preview: Optional[bytes]) -> None:
+        """Store the preview of an image."""
+        if not preview or len(preview) != PREVIEW_BYTES:
+            return
+        folder, name = os.path.split(os.path.abspath(file_path))
+        with self._lock:
+            self._folder(folder)[name] = preview.hex()
+            self._unsaved[folder] = self._unsaved.get(folder, 0) + 1
+            if self._unsaved[folder] < _FLUSH_EVERY:
+                return
+            previews = dict(self._folders[folder])
+            del self._unsaved[folder]
+        self._write(folder, previews)
+
+    def flush(self) -> None:
+        """Write every folder with unsaved previews."""
+        with self._lock:
+            pending = [(folder, dict(self._folders[folder])) for folder in self._unsaved]
+            self._unsaved.clear()
+        for folder, previews in pending:
+            self._write(folder, previews)
+
+    def _write(self, folder: str, previews: Dict[str, str]) -> None:
+        """Write a folder's previews atomically."""
+        path = self.folder_path(folder)
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.json')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(previews, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Cannot write previews {path}: {e}")
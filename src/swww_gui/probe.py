@@ -0,0 +1,152 @@
+import os
+import json
+import shutil
+import logging
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .constants import PROBE_CACHE_FILE
+
+logger = logging.getLogger(__name__)
+
+# External programs the application uses
+PROBED_TOOLS = ('swww', 'swww-daemon', 'matugen', 'xdg-open')
+
+# Tools whose version is recorded, with the arguments that print it
+VERSION_ARGS = {
+    'swww': ['--version'],
+    'swww-daemon': ['--version'],
+    'matugen': ['--version'],
+}
+
+
+class EnvironmentProbe:
+    """Resolves external programs once and caches the result on disk.
+
+    Lookups happen in-process with shutil.which, concurrently for all tools.
+    Absolute paths and versions are stored in a JSON cache that stays valid
+    while PATH, the mtimes of the PATH directories and the mtimes of the
+    resolved binaries are unchanged, so a warm start does no lookups and
+    spawns nothing.
+    """
+
+    def __init__(self, cache_file: Path = PROBE_CACHE_FILE,
+                 tools: Iterable[str] = PROBED_TOOLS) -> None:
+        """Initialize the probe.
+
+        Args:
+            cache_file: Location of the JSON cache.
+            tools: Program names to resolve.
+        """
+        self.cache_file = Path(cache_file)
+        self.tools = tuple(tools)
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def probe(self, force: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Resolve all tools, using the cache when it is still valid.
+
+        Args:
+            force: Ignore the cache and probe again.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per tool: 'path' and 'version' (either may be None).
+        """
+        fingerprint = self._path_fingerprint()
+        if not force:
+            cached = self._load_cache(fingerprint)
+            if cached is not None:
+                self.results = cached
+                return self.results
+
+        with ThreadPoolExecutor(max_workers=len(self.tools) or 1) as executor:
+            resolved = dict(zip(self.tools, executor.map(self._resolve, self.tools)))
+        self.results = resolved
+        self._save_cache(fingerprint)
+        return self.results
+
+    def path(self, name: str) -> Optional[str]:
+        """Get the absolute path of a tool, or None if it is not installed."""
+        if not self.results:
+            self.probe()
+        return self.results.get(name, {}).get('path')
+
+    def version(self, name: str) -> Optional[str]:
+        """Get the version string of a tool, or None if unknown."""
+        if not self.results:
+            self.probe()
+        return self.results.get(name, {}).get('version')
+
+    def is_available(self, name: str) -> bool:
+        """Check whether a tool is installed."""
+        return self.path(name) is not None
+
+    def _path_fingerprint(self) -> Dict[str, Any]:
+        """Describe the current PATH so stale caches can be detected."""
+        path_env = os.environ.get('PATH', '')
+        dirs = {}
+        for directory in path_env.split(os.pathsep):
+            if not directory:
+                continue
+            try:
+                dirs[directory] = os.stat(directory).st_mtime_ns
+            except OSError:
+                dirs[directory] = None
+        return {'PATH': path_env, 'dirs': dirs}
+
+    def _resolve(self, name: str) -> Dict[str, Any]:
+        """Find one tool and read its version."""
+        path = shutil.which(name)
+        if path is None:
+            return {'path': None, 'version': None, 'mtime': None}
+        path = os.path.abspath(path)
+        try:
+            # stat() follows symlinks, so upgrades behind a link are noticed too
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        version = None
+        if name in VERSION_ARGS:
+            try:
+                result = subprocess.run([path] + VERSION_ARGS[name], capture_output=True,
+                                        text=True, timeout=2, check=False)
+                output = (result.stdout or result.stderr).strip()
+                version = output.splitlines()[0] if output else None
+            except Exception as e:
+                logger.debug(f"Could not read version of {name}: {e}")
+        return {'path': path, 'version': version, 'mtime': mtime}
+
+    def _load_cache(self, fingerprint: Dict[str, Any]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Load cached results if they still match the environment."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+        if data.get('fingerprint') != fingerprint:
+            return None
+        tools = data.get('tools', {})
+        if set(tools) != set(self.tools):
+            return None
+        for info in tools.values():
+            if info.get('path'):
+                try:
+                    if os.stat(info['path']).st_mtime_ns != info.get('mtime'):
+                        return None
+                except OSError:
+                    return None
+        return tools
+
+    def _save_cache(self, fingerprint: Dict[str, Any]) -> None:
+        """Write results to the cache file."""
+        try:
+            os.makedirs(self.cache_file.parent, exist_ok=True)
+            tmp_path = self.cache_file.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump({'fingerprint': fingerprint, 'tools': self.results}, f, indent=2)
+            os.replace(tmp_path, self.cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to save probe cache to {self.cache_file}: {e}")
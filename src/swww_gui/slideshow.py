@@ -0,0 +1,447 @@
+import os
+import time
+import fcntl
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .constants import SLIDESHOW_DEFAULT_INTERVAL, SLIDESHOW_PREFETCH_COUNT, SLIDESHOW_LOCK_FILE
+from .utils import get_image_files_in_directory
+
+logger = logging.getLogger(__name__)
+
+# A shown frame: one image for all outputs, or output name -> image
+Frame = Union[str, Dict[str, str]]
+
+
+class SlideshowLock:
+    """Marks the one process that runs the slideshow.
+
+    The GUI and `swwwgui slideshow` share the saved slideshow, so without
+    an owner both would resume it and fight over the wallpaper. The owner
+    holds an flock on a pidfile in the runtime directory; the kernel drops
+    it when the process exits, so a crash never leaves a stale lock.
+    """
+
+    def __init__(self, path: Union[str, os.PathLike] = SLIDESHOW_LOCK_FILE) -> None:
+        """Initialize the lock.
+
+        Args:
+            path: Pidfile to lock.
+        """
+        self.path = os.fspath(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        """Whether this process owns the slideshow."""
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Take ownership without blocking.
+
+        Returns:
+            bool: True if this process owns the slideshow now, False if
+                  another process holds the lock.
+        """
+        if self._fd is not None:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        except OSError as e:
+            # Not worth refusing the slideshow over an unwritable runtime dir
+            logger.warning(f"Cannot create slideshow lock {self.path}: {e}")
+            return True
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Give up ownership."""
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        try:
+            os.ftruncate(fd, 0)
+        except OSError:
+            pass
+        os.close(fd)  # Closing the last descriptor releases the flock
+
+    def owner(self) -> Optional[int]:
+        """Get the PID of the process owning the slideshow.
+
+        Returns:
+            Optional[int]: PID of the owner, None if nobody holds the lock.
+        """
+        if self._fd is not None:
+            return os.getpid()
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+            except OSError:
+                content = os.read(fd, 32).decode(errors='replace').strip()
+                return int(content) if content.isdigit() else None
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return None
+        finally:
+            os.close(fd)
+
+
+class Slideshow:
+    """Rotates wallpapers from a folder or a saved list of images.
+
+    The images are shown in order or shuffled, either one image on all
+    outputs or a different image on each output (per-monitor mode). While
+    an image is on screen the next frames are pre-scaled through the
+    manager's prescale cache, so every switch starts without decoding.
+
+    The playlist, position and the time of the next switch are stored under
+    'slideshow' in the config, so a slideshow resumes where it stopped after
+    the application or the headless process is restarted. Callbacks and
+    config writes go through `dispatch`, which is GLib.idle_add in the GUI.
+
+    Only one process runs the slideshow at a time: start() and resume()
+    take a SlideshowLock and fail while another process holds it.
+    """
+
+    def __init__(self, manager, config, dispatch: Optional[Callable[..., Any]] = None,
+                 on_change: Optional[Callable[[Frame, bool], Any]] = None,
+                 prefetch_count: int = SLIDESHOW_PREFETCH_COUNT,
+                 ownership: Optional[SlideshowLock] = None) -> None:
+        """Initialize the slideshow.
+
+        Args:
+            manager: SwwwManager used to apply and pre-scale images.
+            config: SwwwGuiConfig holding the slideshow state.
+            dispatch: Function used to deliver callbacks, called as
+                      dispatch(callback, *args). Defaults to a direct call.
+            on_change: Called as on_change(frame, success) after every switch.
+            prefetch_count: Number of upcoming frames to pre-scale.
+            ownership: Lock shared with other processes; defaults to the
+                       pidfile in the runtime directory.
+        """
+        self.manager = manager
+        self.config = config
+        self._dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self._on_change = on_change
+        self.prefetch_count = prefetch_count
+        self.options: Dict[str, Any] = {}
+        self.state: Dict[str, Any] = dict(config.get('slideshow', {}) or {})
+        self._wake = threading.Event()
+        self._skip = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.ownership = ownership or SlideshowLock()
+
+    @property
+    def running(self) -> bool:
+        """Whether the rotation thread is active."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a slideshow was left running and should be resumed."""
+        return bool(self.state.get('enabled'))
+
+    def claim(self) -> bool:
+        """Take ownership of the slideshow for this process.
+
+        Returns:
+            bool: False if another process runs the slideshow.
+        """
+        if self.ownership.acquire():
+            return True
+        logger.info(f"Slideshow is owned by process {self.ownership.owner()}")
+        return False
+
+    @property
+    def owned_elsewhere(self) -> bool:
+        """Whether another process runs the slideshow."""
+        return not self.ownership.held and self.ownership.owner() is not None
+
+    def configure(self, interval: Optional[float] = None, shuffle: Optional[bool] = None,
+                  per_monitor: Optional[bool] = None) -> bool:
+        """Change slideshow settings; a running slideshow picks them up at the next switch.
+
+        Args:
+            interval: Seconds between switches.
+            shuffle: Show images in random order.
+            per_monitor: Show a different image on each output.
+
+        Returns:
+            bool: False if another process runs the slideshow. Its state
+                  in the shared config is left alone then, since this
+                  process only has a stale copy of it.
+        """
+        if self.owned_elsewhere:
+            logger.info("Slideshow settings not changed, another process runs the slideshow")
+            return False
+        with self._lock:
+            if interval is not None:
+                self.state['interval'] = max(1.0, float(interval))
+            if shuffle is not None and shuffle != self.state.get('shuffle', False):
+                # Start a new round in the new order
+                self.state['shuffle'] = shuffle
+                self.state['order'] = []
+                self.state['position'] = 0
+                self._build_order(self._source_images())
+            if per_monitor is not None:
+                self.state['per_monitor'] = per_monitor
+        self._persist()
+        return True
+
+    def start(self, folder: Optional[str] = None, images: Optional[List[str]] = None,
+              options: Optional[Dict[str, Any]] = None) -> bool:
+        """Start a new slideshow and show its first image at once.
+
+        Args:
+            folder: Folder to take images from.
+            images: Explicit list of images, used instead of a folder.
+            options: Options for SwwwManager.set_wallpaper.
+
+        Returns:
+            bool: False if there are no images to show or another process
+                  runs the slideshow.
+        """
+        if not self.claim():
+            return False
+        with self._lock:
+            self.state['folder'] = folder or ''
+            self.state['images'] = list(images or [])
+            self.state['position'] = 0
+            self.state['next_change_at'] = 0
+            self.state['enabled'] = True
+            self.state['order'] = []
+            if not self._build_order(self._source_images()):
+                self.state['enabled'] = False
+                if not self.running:
+                    self.ownership.release()
+                return False
+        return self.resume(options)
+
+    def resume(self, options: Optional[Dict[str, Any]] = None) -> bool:
+        """Continue a saved slideshow.
+
+        The next switch happens when it was due before the restart,
+        immediately if that time has already passed.
+
+        Args:
+            options: Options for SwwwManager.set_wallpaper.
+
+        Returns:
+            bool: False if there is no enabled slideshow to resume or
+                  another process runs it.
+        """
+        if options is not None:
+            self.options = dict(options)
+        if not self.enabled:
+            return False
+        with self._lock:
+            # Claimed under the lock, so an exiting thread cannot release
+            # the ownership right after
+            if not self.claim():
+                return False
+            # A thread still finishing a switch after stop() keeps going
+            self._stopping = False
+            self._wake.clear()
+            if not self.running:
+                self._thread = threading.Thread(target=self._loop, name="slideshow", daemon=True)
+                self._thread.start()
+        self._persist()
+        return True
+
+    def skip(self) -> None:
+        """Switch to the next image now."""
+        self._skip = True
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Stop the slideshow; it will not be resumed on the next start."""
+        self.state['enabled'] = False
+        self.shutdown()
+        self._persist()
+
+    def shutdown(self) -> None:
+        """Stop the rotation thread but keep the slideshow enabled for resuming."""
+        self._stopping = True
+        self._wake.set()
+
+    def run(self, options: Optional[Dict[str, Any]] = None) -> None:
+        """Run the slideshow in the calling thread until shutdown() or stop().
+
+        Args:
+            options: Options for SwwwManager.set_wallpaper.
+        """
+        if not self.resume(options):
+            return
+        try:
+            while True:
+                thread = self._thread
+                if thread is None or not thread.is_alive():
+                    break
+                thread.join(0.5)
+        except KeyboardInterrupt:
+            self.shutdown()
+
+    def _source_images(self) -> List[str]:
+        """List the images the slideshow takes from."""
+        images = self.state.get('images') or []
+        if images:
+            return [path for path in images if os.path.isfile(path)]
+        return get_image_files_in_directory(self.state.get('folder', ''))
+
+    def _build_order(self, images: List[str]) -> List[str]:
+        """Update the play order to the current images.
+
+        Known images keep their place; new ones are appended, shuffled in
+        shuffle mode. Must be called with the lock held.
+        """
+        available = set(images)
+        order = [path for path in self.state.get('order', []) if path in available]
+        known = set(order)
+        new_images = [path for path in images if path not in known]
+        if self.state.get('shuffle', False):
+            random.shuffle(new_images)
+            if order:
+                # New images go to random places in the not yet shown part,
+                # the already prefetched upcoming images keep their order
+                position = min(self.state.get('position', 0), len(order))
+                for path in new_images:
+                    order.insert(random.randint(position, len(order)), path)
+                new_images = []
+        self.state['order'] = order + new_images
+        self.state['position'] = min(self.state.get('position', 0), len(self.state['order']))
+        return self.state['order']
+
+    def _frame_at(self, order: List[str], position: int, outputs: List[str]) -> Frame:
+        """Get the frame shown at a playlist position."""
+        if outputs:
+            return {name: order[(position + i) % len(order)] for i, name in enumerate(outputs)}
+        return order[position % len(order)]
+
+    def _outputs(self) -> List[str]:
+        """Get the outputs that each get their own image, empty in single mode."""
+        if not self.state.get('per_monitor', False):
+            return []
+        return self.manager.get_monitors()
+
+    def _loop(self) -> None:
+        """Rotation thread: runs the slideshow, then gives up ownership."""
+        try:
+            while True:
+                self._rotate()
+                with self._lock:
+                    # Decided under the lock: a resume() during the last
+                    # switch cleared _stopping and relies on this thread
+                    if self._stopping or not self.enabled:
+                        self._retire()
+                        return
+        except Exception:
+            logger.exception("Slideshow thread failed")
+            with self._lock:
+                self._retire()
+
+    def _retire(self) -> None:
+        """Forget the rotation thread and release ownership. Must be called with the lock held."""
+        self._thread = None
+        self.ownership.release()
+
+    def _rotate(self) -> None:
+        """Wait for the next switch, apply, prefetch until stopped."""
+        while not self._stopping:
+            delay = self.state.get('next_change_at', 0) - time.time()
+            if delay > 0 and not self._skip:
+                self._wake.wait(delay)
+                self._wake.clear()
+                continue  # Re-check stop, skip and the due time
+            self._skip = False
+
+            frame, success = self._advance()
+            if frame is None:
+                logger.warning("Slideshow has no images left, stopping")
+                self.state['enabled'] = False
+                self._persist()
+                return
+            if self._on_change:
+                self._dispatch(self._on_change, frame, success)
+            self._prefetch()
+
+    def _advance(self):
+        """Show the next frame and move the position forward.
+
+        Returns:
+            Tuple: (frame, success), frame is None if there is nothing to show.
+        """
+        outputs = self._outputs()
+        with self._lock:
+            order = self._build_order(self._source_images())
+            if not order:
+                return None, False
+            frame = self._frame_at(order, self.state.get('position', 0), outputs)
+            step = len(outputs) or 1
+
+        if isinstance(frame, dict):
+            results = self.manager.set_wallpapers(frame, self.options)
+            success = bool(results) and all(results.values())
+        else:
+            success = self.manager.set_wallpaper(frame, self.options)
+
+        with self._lock:
+            position = self.state.get('position', 0) + step
+            if position >= len(self.state['order']):
+                position %= len(self.state['order'])
+                if self.state.get('shuffle', False):
+                    # New round in a new order
+                    self.state['order'] = []
+                    self.state['position'] = 0
+                    self._build_order(order)
+            self.state['position'] = position
+            self.state['next_change_at'] = time.time() + self.state.get('interval', SLIDESHOW_DEFAULT_INTERVAL)
+        self._persist()
+        return frame, success
+
+    def _prefetch(self) -> None:
+        """Pre-scale the next frames while the current one is on screen."""
+        if not self.manager.prescale_cache or self.prefetch_count <= 0:
+            return
+        with self._lock:
+            order = list(self.state.get('order', []))
+            position = self.state.get('position', 0)
+        if not order:
+            return
+        outputs = self._outputs()
+        step = len(outputs) or 1
+        for i in range(self.prefetch_count):
+            if self._stopping or self._skip:
+                return
+            frame = self._frame_at(order, position + i * step, outputs)
+            if isinstance(frame, dict):
+                for name, image_path in frame.items():
+                    self.manager.prefetch(image_path, dict(self.options, monitor=name))
+            else:
+                self.manager.prefetch(frame, self.options)
+
+    def _persist(self) -> None:
+        """Save the state to the config."""
+        with self._lock:
+            state = dict(self.state, order=list(self.state.get('order', [])))
+        self._dispatch(self._save_state, state)
+
+    def _save_state(self, state: Dict[str, Any]) -> bool:
+        """Write a state snapshot to the config file."""
+        self.config.set('slideshow', state)
+        self.config.save()
+        return False  # Remove from idle queue
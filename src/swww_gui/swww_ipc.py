@@ -0,0 +1,111 @@
+"""
+Клиент Unix-сокета swww-daemon.
+Позволяет проверять, что демон жив, без запуска процесса `swww` на каждый вызов.
+"""
+
+import os
+import socket
+import struct
+import logging
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SwwwSocketClient:
+    """Liveness checks against the swww-daemon Unix socket.
+
+    Only a plain connect() is used, which works for every swww version:
+    the daemon's request protocol passes payloads through shared memory and
+    changes between releases, so queries, clear, kill and image uploads stay
+    with the swww CLI.
+    """
+
+    def __init__(self, socket_path: Optional[Path] = None, timeout: float = 1.0) -> None:
+        """Initialize the client.
+
+        Args:
+            socket_path: Path to the daemon socket. If None, the default
+                         location for the current Wayland display is used.
+            timeout: Socket timeout in seconds for a connection attempt.
+        """
+        self._explicit_path = Path(socket_path) if socket_path else None
+        self.timeout = timeout
+
+    @staticmethod
+    def candidate_socket_paths() -> List[Path]:
+        """Get the socket locations used by known swww versions.
+
+        Returns:
+            List[Path]: Candidate paths, most recent layout first.
+        """
+        runtime_dir = Path(os.environ.get('XDG_RUNTIME_DIR') or '/tmp')
+        wayland_display = os.environ.get('WAYLAND_DISPLAY') or 'wayland-0'
+        return [
+            runtime_dir / f"swww-{wayland_display}.socket",
+            runtime_dir / "swww.socket",
+        ]
+
+    @property
+    def socket_path(self) -> Path:
+        """Path of the socket this client talks to."""
+        if self._explicit_path:
+            return self._explicit_path
+        candidates = self.candidate_socket_paths()
+        for path in candidates:
+            if path.exists():
+                return path
+        return candidates[0]
+
+    def socket_exists(self) -> bool:
+        """Check whether the daemon socket file exists.
+
+        Returns:
+            bool: True if the socket file exists, False otherwise.
+        """
+        return self.socket_path.exists()
+
+    def is_alive(self) -> bool:
+        """Check whether a daemon is accepting connections on the socket.
+
+        Returns:
+            bool: True if the connection succeeded, False otherwise.
+        """
+        try:
+            with self._connect():
+                return True
+        except OSError:
+            return False
+
+    def peer_pid(self) -> Optional[int]:
+        """Get the PID of the process listening on the socket.
+
+        Uses the SO_PEERCRED credentials of a connection, so it identifies
+        exactly the daemon behind this socket.
+
+        Returns:
+            Optional[int]: The daemon PID, or None if nothing accepts
+                           connections or credentials are unavailable.
+        """
+        if not hasattr(socket, 'SO_PEERCRED'):
+            return None
+        try:
+            with self._connect() as sock:
+                creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                                        struct.calcsize('3i'))
+        except OSError:
+            return None
+        pid, _, _ = struct.unpack('3i', creds)
+        return pid or None
+
+    def _connect(self) -> socket.socket:
+        """Open a connection to the daemon socket."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        return sock
@@ -2,13 +2,19 @@ import logging
 from typing import List, Dict, Any, Optional, Union
 import time
 import os
+import json
+import subprocess
 from pathlib import Path
 
-from .utils import run_command, is_executable_available
+from .utils import run_command, run_commands_concurrently, is_executable_available
+from .swww_ipc import SwwwSocketClient
+from .daemon_state import DaemonState
+from .monitor import Monitor, parse_query_output
+from .prescale import PrescaleCache, is_animated
+from .probe import EnvironmentProbe
+from .options import TransitionOptions
 from .constants import (
-    DEFAULT_TRANSITION_TYPE, DEFAULT_TRANSITION_STEP, DEFAULT_TRANSITION_FPS,
-    DEFAULT_TRANSITION_DURATION, DEFAULT_RESIZE_MODE, DEFAULT_FILL_COLOR,
-    DEFAULT_FILTER_TYPE
+    TRANSITION_TYPES, RESIZE_MODES, FILTER_TYPES, DAEMON_STATE_TTL
 )
 
 logger = logging.getLogger(__name__)
@@ -18,12 +24,34 @@ class SwwwManager:
     
     Provides methods to interact with swww for setting wallpapers,
     managing daemon, and querying available options.
+    
+    When the IPC backend is enabled, liveness is checked by connecting to the
+    daemon socket instead of running `swww query`; everything else, and the
+    liveness check when the socket is missing, goes through the swww CLI.
     """
     
-    def __init__(self) -> None:
-        """Initialize the swww manager."""
-        self.swww_binary = "swww"
-        self.daemon_binary = "swww-daemon"
+    def __init__(self, use_ipc: bool = True, prescale_cache: Optional[PrescaleCache] = None,
+                 probe: Optional[EnvironmentProbe] = None) -> None:
+        """Initialize the swww manager.
+        
+        Args:
+            use_ipc: Check daemon liveness over its socket.
+            prescale_cache: If set, images are scaled to each output's
+                            resolution before being handed to swww.
+            probe: Environment probe providing absolute binary paths. If None,
+                   binaries are looked up through PATH.
+        """
+        self.probe = probe
+        self.swww_binary = (probe and probe.path("swww")) or "swww"
+        self.daemon_binary = (probe and probe.path("swww-daemon")) or "swww-daemon"
+        self.ipc: Optional[SwwwSocketClient] = SwwwSocketClient() if use_ipc else None
+        # Cached liveness and query output, so hot paths don't re-query the daemon
+        self.daemon_state = DaemonState(ttl=DAEMON_STATE_TTL)
+        # Daemon started by launch_daemon(), its PID identifies the daemon
+        self._daemon_process: Optional[subprocess.Popen] = None
+        self.prescale_cache = prescale_cache
+        # Last successful apply per output ('' means all outputs): (image, options)
+        self.last_applied: Dict[str, Any] = {}
         
     def is_swww_installed(self) -> bool:
         """Check if swww is installed.
@@ -31,65 +59,182 @@ class SwwwManager:
         Returns:
             bool: True if both swww and swww-daemon are available, False otherwise.
         """
+        if self.probe:
+            return self.probe.is_available("swww") and self.probe.is_available("swww-daemon")
         return (is_executable_available(self.swww_binary) and 
                 is_executable_available(self.daemon_binary))
         
     def is_daemon_running(self) -> bool:
         """Check if swww-daemon is running.
         
+        Uses the cached daemon state when it is still valid.
+        
         Returns:
             bool: True if daemon is running, False otherwise.
         """
-        success, _, _ = run_command([self.swww_binary, "query"], check=False)
-        return success
+        state = self.daemon_state
+        if self.ipc:
+            state.socket_path = self.ipc.socket_path
+        if state.is_fresh():
+            return state.alive
             
-    def start_daemon(self) -> bool:
-        """Start the swww-daemon.
+        if self.ipc and self.ipc.socket_exists():
+            pid = self.ipc.peer_pid()
+            # Without peer credentials fall back to a plain connect
+            alive = pid is not None or self.ipc.is_alive()
+            state.update(alive, pid=pid or self._spawned_daemon_pid())
+        else:
+            output = self._cli_query()
+            state.update(output is not None, output, pid=self._spawned_daemon_pid())
+        return state.alive
+    
+    def _spawned_daemon_pid(self) -> Optional[int]:
+        """PID of the daemon started by launch_daemon(), if it still runs."""
+        process = self._daemon_process
+        if process is not None and process.poll() is None:
+            return process.pid
+        return None
+    
+    def _cli_query(self) -> Optional[str]:
+        """Run `swww query`.
         
         Returns:
-            bool: True if daemon started successfully, False otherwise.
+            Optional[str]: Query output, or None if swww failed (e.g. no daemon).
+        """
+        try:
+            result = subprocess.run([self.swww_binary, "query"], capture_output=True, text=True)
+        except OSError as e:
+            logger.debug(f"Cannot run swww query: {e}")
+            return None
+        return result.stdout if result.returncode == 0 else None
+    
+    def invalidate_daemon_state(self) -> None:
+        """Forget cached daemon state, forcing a fresh check on next use."""
+        self.daemon_state.invalidate()
+    
+    def query(self) -> Optional[str]:
+        """Get raw `swww query` output.
+        
+        The output is cached together with the daemon state.
+        
+        Returns:
+            Optional[str]: Query output, or None if the daemon is unreachable.
+        """
+        if not self.is_daemon_running():
+            return None
+        cached = self.daemon_state.query_output
+        if cached is not None:
+            return cached
+            
+        output = self._cli_query()
+        if output is None:
+            self.daemon_state.invalidate()
+        else:
+            self.daemon_state.set_query_output(output)
+        return output
+            
+    def launch_daemon(self) -> Optional[subprocess.Popen]:
+        """Launch swww-daemon in the background without waiting for it.
+        
+        Returns:
+            Optional[subprocess.Popen]: The daemon process, or None if it could not be started.
         """
-        if not is_executable_available(self.daemon_binary):
+        available = (self.probe.is_available("swww-daemon") if self.probe
+                     else is_executable_available(self.daemon_binary))
+        if not available:
             logger.error("swww-daemon binary not found")
-            return False
+            return None
             
+        self.daemon_state.invalidate()
         try:
             # Run daemon in background using Popen
-            import subprocess
-            subprocess.Popen(
+            self._daemon_process = subprocess.Popen(
                 [self.daemon_binary],
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
                 start_new_session=True
             )
-            
-            # Check if daemon started successfully after a short delay
-            time.sleep(1)  # Give daemon time to start
-            return self.is_daemon_running()
+            return self._daemon_process
         except Exception as e:
             logger.error(f"Failed to start swww-daemon: {e}")
+            return None
+            
+    def wait_for_daemon(self, timeout: float = 5.0,
+                        process: Optional[subprocess.Popen] = None) -> bool:
+        """Poll until swww-daemon accepts requests, backing off between checks.
+        
+        Args:
+            timeout: Maximum time to wait in seconds.
+            process: Daemon process to watch; waiting stops early if it exits.
+            
+        Returns:
+            bool: True if the daemon became ready, False otherwise.
+        """
+        deadline = time.monotonic() + timeout
+        delay = 0.01
+        while True:
+            self.daemon_state.invalidate()
+            if self.is_daemon_running():
+                return True
+            if process is not None and process.poll() is not None:
+                logger.error(f"swww-daemon exited with code {process.returncode} during startup")
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.5)
+            
+    def start_daemon(self, timeout: float = 5.0) -> bool:
+        """Start the swww-daemon and wait until it is ready.
+        
+        Args:
+            timeout: Maximum time to wait for readiness in seconds.
+            
+        Returns:
+            bool: True if daemon started successfully, False otherwise.
+        """
+        process = self.launch_daemon()
+        if process is None:
             return False
+        return self.wait_for_daemon(timeout, process)
+            
+    def get_monitor_info(self, refresh: bool = False) -> List[Monitor]:
+        """Get detailed information about available monitors.
+        
+        The parsed result is cached until the daemon state is invalidated,
+        so callers can ask for output sizes without re-querying swww.
+        
+        Args:
+            refresh: Re-query the daemon even if a cached result exists.
+            
+        Returns:
+            List[Monitor]: Available monitors, or empty list if failed.
+        """
+        state = self.daemon_state
+        if refresh:
+            state.invalidate_monitors()
+        elif self.is_daemon_running():
+            # Snapshot: another thread may invalidate the state meanwhile
+            monitors = state.monitors
+            if monitors is not None:
+                return list(monitors)
+            
+        stdout = self.query()
+        if stdout is None:
+            return []
             
+        monitors = parse_query_output(stdout)
+        state.set_monitors(monitors)
+        return list(monitors)
+    
     def get_monitors(self) -> List[str]:
         """Get list of available monitors.
         
         Returns:
             List[str]: Names of available monitors, or empty list if failed.
         """
-        if not self.is_daemon_running():
-            return []
-            
-        success, stdout, _ = run_command([self.swww_binary, "query"], check=False)
-        if not success:
-            return []
-                
-        # Parse monitor names from output
-        monitors = []
-        for line in stdout.splitlines():
-            if "Output:" in line:
-                name = line.split("Output:")[1].strip()
-                monitors.append(name)
-        return monitors
+        return [monitor.name for monitor in self.get_monitor_info()]
             
     def get_transitions(self) -> List[str]:
         """Get list of available transition types.
@@ -97,22 +242,7 @@ class SwwwManager:
         Returns:
             List[str]: Available transition types.
         """
-        return [
-            "none",
-            "simple",
-            "fade",
-            "left",
-            "right",
-            "top",
-            "bottom",
-            "wipe",
-            "wave", 
-            "grow",
-            "center",
-            "any",
-            "outer",
-            "random"
-        ]
+        return list(TRANSITION_TYPES)
         
     def get_resize_modes(self) -> List[str]:
         """Get list of available resize modes.
@@ -120,11 +250,7 @@ class SwwwManager:
         Returns:
             List[str]: Available resize modes.
         """
-        return [
-            "crop",
-            "fit",
-            "no"
-        ]
+        return list(RESIZE_MODES)
         
     def get_filters(self) -> List[str]:
         """Get list of available filters for scaling.
@@ -132,13 +258,7 @@ class SwwwManager:
         Returns:
             List[str]: Available scaling filters.
         """
-        return [
-            "Nearest", 
-            "Bilinear", 
-            "CatmullRom", 
-            "Mitchell", 
-            "Lanczos3"
-        ]
+        return list(FILTER_TYPES)
         
     def set_wallpaper(self, image_path: str, options: Optional[Dict[str, Any]] = None) -> bool:
         """Set wallpaper using swww with all available options.
@@ -170,88 +290,229 @@ class SwwwManager:
         # Default options
         if options is None:
             options = {}
+        try:
+            transition = TransitionOptions.from_dict(options)
+        except ValueError as e:
+            logger.error(f"Cannot set wallpaper: {e}")
+            return False
             
-        # Base command
-        cmd = [self.swww_binary, "img", image_path]
-        
-        # Add monitor if specified
-        if options.get('monitor'):
-            cmd.extend(["--outputs", options['monitor']])
-        
-        # Add resize mode
-        resize_mode = options.get('resize_mode', DEFAULT_RESIZE_MODE)
-        if resize_mode == 'no':
-            cmd.append("--no-resize")
-        else:
-            cmd.extend(["--resize", resize_mode])
+        # Hand swww an image already at the output resolution when possible
+        send_path, send_transition = image_path, transition
+        if self.prescale_cache and transition.resize_mode != 'no':
+            targets = self._target_monitors(options.get('monitor', ''))
+            scaled = {monitor.name: self._prescale(image_path, transition, monitor) for monitor in targets}
+            if targets and all(scaled.values()):
+                if len(set(scaled.values())) > 1:
+                    # Outputs differ in size, send each its own scaled image
+                    results = self.set_wallpapers({name: image_path for name in scaled}, options)
+                    return all(results.values())
+                send_path = next(iter(scaled.values()))
+                send_transition = transition.replace(resize_mode='no')
             
-        # Add fill color
-        fill_color = options.get('fill_color', DEFAULT_FILL_COLOR)
-        cmd.extend(["--fill-color", fill_color])
-        
-        # Add filter - only if not doing a fast preview
-        # Lanczos3 is high quality but slower
-        if options.get('transition_type') == 'none':
-            # For fast preview, use Nearest filter (fastest)
-            cmd.extend(["--filter", "Nearest"])
-        else:
-            # For normal mode, use specified filter or default
-            filter_type = options.get('filter', DEFAULT_FILTER_TYPE)
-            cmd.extend(["--filter", filter_type])
-        
-        # Add transition type
-        transition_type = options.get('transition_type', DEFAULT_TRANSITION_TYPE)
-        cmd.extend(["--transition-type", transition_type])
-        
-        # Add transition step (defaults differ by transition type)
-        default_step = DEFAULT_TRANSITION_STEP if transition_type == 'simple' else 90
-        transition_step = options.get('transition_step', default_step)
-        cmd.extend(["--transition-step", str(transition_step)])
-        
-        # Add transition duration
-        if 'transition_duration' in options:
-            cmd.extend(["--transition-duration", str(options['transition_duration'])])
-        
-        # Add transition fps
-        transition_fps = options.get('transition_fps', DEFAULT_TRANSITION_FPS)
-        cmd.extend(["--transition-fps", str(transition_fps)])
-        
-        # Add transition-specific options
-        if transition_type == 'wipe':
-            # Add transition angle for wipe
-            if 'transition_angle' in options:
-                cmd.extend(["--transition-angle", str(options['transition_angle'])])
-                
-        elif transition_type == 'wave':
-            # Add transition angle for wave
-            if 'transition_angle' in options:
-                cmd.extend(["--transition-angle", str(options['transition_angle'])])
-                
-            # Add transition wave
-            if 'transition_wave' in options:
-                cmd.extend(["--transition-wave", str(options['transition_wave'])])
-                
-        elif transition_type in ['grow', 'outer', 'center', 'any']:
-            # Add transition position
-            if 'transition_pos' in options:
-                cmd.extend(["--transition-pos", str(options['transition_pos'])])
-                
-            # Add invert_y if specified
-            if options.get('invert_y'):
-                cmd.append("--invert-y")
-                
-        elif transition_type == 'fade':
-            # Add transition bezier
-            if 'transition_bezier' in options:
-                cmd.extend(["--transition-bezier", str(options['transition_bezier'])])
+        cmd = self._build_img_command(send_path, send_transition, options.get('monitor', ''))
         
         # Run command
         success, _, stderr = run_command(cmd)
-        if not success:
+        if success:
+            # Displayed image changed; sizes are still valid
+            self._record_displayed_image(image_path, options.get('monitor', ''))
+            self._remember_applied(image_path, options, options.get('monitor', ''))
+        else:
             logger.error(f"Failed to set wallpaper: {stderr}")
+            self.daemon_state.invalidate()
             
         return success
         
+    def _build_img_command(self, image_path: str, options: Union[Dict[str, Any], TransitionOptions],
+                           outputs: str = '') -> List[str]:
+        """Build a `swww img` command line.
+        
+        Args:
+            image_path: Path to the image file
+            options: Options as described in set_wallpaper, or TransitionOptions
+            outputs: Output name(s) to target (comma-separated), empty for all
+            
+        Returns:
+            List[str]: Command and arguments
+            
+        Raises:
+            ValueError: If the options are invalid
+        """
+        return [self.swww_binary] + TransitionOptions.from_dict(options).to_swww_args(image_path, outputs)
+        
+    def set_wallpapers(self, assignments: Dict[str, str],
+                       options: Optional[Dict[str, Any]] = None) -> Dict[str, bool]:
+        """Set a different wallpaper on each output at the same time.
+        
+        All `swww img --outputs` processes are started before waiting on any
+        of them, so the transitions begin together.
+        
+        Args:
+            assignments: Mapping of output name to image path
+            options: Options as described in set_wallpaper; 'monitor' is ignored
+            
+        Returns:
+            Dict[str, bool]: Success flag for each output
+        """
+        results = {output: False for output in assignments}
+        if not assignments:
+            return results
+        if not self.is_daemon_running():
+            logger.error("Cannot set wallpapers: daemon not running")
+            return results
+            
+        if options is None:
+            options = {}
+        try:
+            transition = TransitionOptions.from_dict(options)
+        except ValueError as e:
+            logger.error(f"Cannot set wallpapers: {e}")
+            return results
+        unscaled = transition.replace(resize_mode='no')
+            
+        monitors = {monitor.name: monitor for monitor in self.get_monitor_info()} if self.prescale_cache else {}
+        
+        commands = {}
+        for output, image_path in assignments.items():
+            if not os.path.exists(image_path):
+                logger.error(f"Cannot set wallpaper on {output}: image not found - {image_path}")
+                continue
+            scaled = self._prescale(image_path, transition, monitors[output]) if output in monitors else None
+            if scaled:
+                commands[output] = self._build_img_command(scaled, unscaled, output)
+            else:
+                commands[output] = self._build_img_command(image_path, transition, output)
+            
+        outputs = list(commands)
+        for output, (success, _, stderr) in zip(outputs, run_commands_concurrently(list(commands.values()))):
+            results[output] = success
+            if success:
+                self._record_displayed_image(assignments[output], output)
+                self._remember_applied(assignments[output], options, output)
+            else:
+                logger.error(f"Failed to set wallpaper on {output}: {stderr}")
+                
+        if not all(results.values()):
+            self.daemon_state.invalidate()
+        return results
+        
+    def prefetch(self, image_path: str, options: Optional[Dict[str, Any]] = None) -> bool:
+        """Pre-scale an image for its target outputs without displaying it.
+
+        A later set_wallpaper with the same image and options then finds the
+        scaled copies in the cache and starts the transition at once.
+
+        Args:
+            image_path: Path to the image file
+            options: Options as described in set_wallpaper
+
+        Returns:
+            bool: True if a scaled copy exists for every target output
+        """
+        options = options or {}
+        if not self.prescale_cache or not os.path.exists(image_path):
+            return False
+        try:
+            transition = TransitionOptions.from_dict(options)
+        except ValueError as e:
+            logger.warning(f"Cannot prefetch {image_path}: {e}")
+            return False
+        targets = self._target_monitors(options.get('monitor', ''))
+        return bool(targets) and all(
+            self._prescale(image_path, transition, monitor) for monitor in targets
+        )
+
+    def _target_monitors(self, outputs: str) -> List[Monitor]:
+        """Get the monitors addressed by an --outputs value.
+        
+        Args:
+            outputs: Comma-separated output names, empty for all outputs.
+            
+        Returns:
+            List[Monitor]: Matching monitors from the cached query.
+        """
+        names = {name.strip() for name in outputs.split(',') if name.strip()}
+        return [monitor for monitor in self.get_monitor_info() if not names or monitor.name in names]
+        
+    def _prescale(self, image_path: str, transition: TransitionOptions, monitor: Monitor) -> Optional[str]:
+        """Get a copy of the image scaled for a monitor.
+        
+        Args:
+            image_path: Source image
+            transition: Validated options
+            monitor: Target monitor
+            
+        Returns:
+            Optional[str]: Path of the scaled image, or None to send the original
+        """
+        # Animated images go to swww untouched, or only one frame would be shown
+        if (not self.prescale_cache or transition.resize_mode == 'no'
+                or not monitor.width or not monitor.height or is_animated(image_path)):
+            return None
+        return self.prescale_cache.prescale(
+            image_path, monitor.resolution, transition.resize_mode,
+            transition.scale_filter, transition.fill_color
+        )
+        
+    def _remember_applied(self, image_path: str, options: Dict[str, Any], outputs: str) -> None:
+        """Remember what was applied so it can be restored after a daemon restart.
+        
+        Args:
+            image_path: Applied image.
+            options: Options used for the apply.
+            outputs: Comma-separated output names, empty for all outputs.
+        """
+        names = [name.strip() for name in outputs.split(',') if name.strip()]
+        options = {key: value for key, value in options.items() if key != 'monitor'}
+        if not names:
+            # Applied everywhere, replaces any per-output entries
+            self.last_applied = {'': (image_path, options)}
+            return
+        for name in names:
+            self.last_applied[name] = (image_path, options)
+        
+    def reapply_last(self) -> Dict[str, bool]:
+        """Apply the last wallpaper of every output again.
+        
+        Returns:
+            Dict[str, bool]: Success flag per output ('' for all outputs).
+        """
+        entries = dict(self.last_applied)
+        results: Dict[str, bool] = {}
+        if '' in entries:
+            image_path, options = entries.pop('')
+            results[''] = self.set_wallpaper(image_path, options)
+            
+        # Per-output entries sharing the same options are dispatched together
+        groups: Dict[str, Dict[str, Any]] = {}
+        for output, (image_path, options) in entries.items():
+            key = json.dumps(options, sort_keys=True, default=str)
+            group = groups.setdefault(key, {'options': options, 'assignments': {}})
+            group['assignments'][output] = image_path
+        for group in groups.values():
+            results.update(self.set_wallpapers(group['assignments'], group['options']))
+        return results
+        
+    def _record_displayed_image(self, image_path: str, outputs: str) -> None:
+        """Update cached monitors after a successful set.
+        
+        Args:
+            image_path: Image that is now displayed.
+            outputs: Comma-separated output names, empty for all outputs.
+        """
+        state = self.daemon_state
+        targets = {name.strip() for name in outputs.split(',') if name.strip()}
+        # Read and replace the monitors atomically, so a concurrent
+        # invalidate() is not undone and never seen half-way
+        with state.lock:
+            state.invalidate_query()
+            if state.monitors is None:
+                return
+            state.set_monitors([
+                monitor.with_image(image_path) if not targets or monitor.name in targets else monitor
+                for monitor in state.monitors
+            ])
+        
     def clear_wallpaper(self, color: str = "#000000") -> bool:
         """Clear wallpaper and set a solid color.
         
@@ -266,6 +527,10 @@ class SwwwManager:
             
         cmd = [self.swww_binary, "clear", color]
         success, _, _ = run_command(cmd)
+        if success:
+            self.daemon_state.invalidate_monitors()
+        else:
+            self.daemon_state.invalidate()
         return success
         
     def kill_daemon(self) -> bool:
@@ -277,6 +542,7 @@ class SwwwManager:
         if not self.is_daemon_running():
             return True  # Already not running
             
+        self.daemon_state.invalidate()
         cmd = [self.swww_binary, "kill"]
         success, _, _ = run_command(cmd)
         return success
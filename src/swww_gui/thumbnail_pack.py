@@ -0,0 +1,391 @@
+import os
+import json
+import mmap
+import struct
+import hashlib
+import contextlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from .constants import THUMBNAIL_PACK_DIR
+from .thumbnails import THUMBNAIL_SIZES, create_thumbnail
+from .thumbnail_pool import DecodedThumbnail
+
+logger = logging.getLogger(__name__)
+
+# magic, format version, tile edge, number of slots, index offset (0 while being written)
+_HEADER = struct.Struct('<4sHHIQ12x')
+_MAGIC = b'SWTP'
+_VERSION = 1
+
+# Write the index after this many new tiles, so a crash loses little work
+_FLUSH_EVERY = 64
+# Compact when this many slots, and at least a quarter of all, are dead
+_COMPACT_MIN_DEAD = 16
+
+
+def pixbuf_to_rgba(pixbuf) -> DecodedThumbnail:
+    """Get the pixels of a pixbuf as tightly packed RGBA rows."""
+    if not pixbuf.get_has_alpha():
+        pixbuf = pixbuf.add_alpha(False, 0, 0, 0)
+    width, height = pixbuf.get_width(), pixbuf.get_height()
+    rowstride = pixbuf.get_rowstride()
+    pixels = pixbuf.read_pixel_bytes().get_data()
+    row_bytes = width * 4
+    if rowstride == row_bytes:
+        data = bytes(pixels[:row_bytes * height])
+    else:
+        data = b''.join(pixels[y * rowstride:y * rowstride + row_bytes] for y in range(height))
+    return DecodedThumbnail(data, width, height, row_bytes, True)
+
+
+class ThumbnailPack:
+    """Thumbnails of one folder in a single memory-mapped file.
+
+    The file holds a header, fixed-size RGBA tiles of edge x edge pixels
+    and a JSON index mapping file names to slot, mtime, size and thumbnail
+    dimensions. Reading a thumbnail is a slice of the mapping, without any
+    per-file open, stat or read calls.
+
+    New tiles are appended in place; the index is rewritten after every
+    _FLUSH_EVERY tiles and on flush(). While tiles are being added the
+    header marks the index as invalid, so a pack left behind by a crash is
+    discarded rather than misread. Tiles of replaced or removed files stay
+    in the file as dead slots until compact() rewrites it.
+    """
+
+    def __init__(self, path: Path, edge: int) -> None:
+        """Open or create a pack.
+
+        Args:
+            path: Pack file.
+            edge: Tile edge in pixels; a pack with another edge is replaced.
+        """
+        self.path = Path(path)
+        self.edge = edge
+        self.tile_bytes = edge * edge * 4
+        self._lock = threading.Lock()
+        self._entries = {}  # name -> [slot, mtime_ns, size, width, height], slot -1 = failed
+        self._slots = 0
+        self._dirty = False
+        self._unflushed = 0
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+
+    @property
+    def dead_slots(self) -> int:
+        """Number of tiles no entry refers to."""
+        with self._lock:
+            return self._slots - sum(1 for entry in self._entries.values() if entry[0] >= 0)
+
+    def get(self, name: str, st: os.stat_result) -> Tuple[bool, Optional[DecodedThumbnail]]:
+        """Look up the thumbnail of a file in the folder.
+
+        Args:
+            name: File name.
+            st: Current stat of the file; entries of other versions don't match.
+
+        Returns:
+            Tuple[bool, Optional[DecodedThumbnail]]: (found, thumbnail); the
+            thumbnail is None for files that could not be thumbnailed.
+        """
+        with self._lock:
+            self._ensure_open()
+            entry = self._entries.get(name)
+            if entry is None or entry[1] != st.st_mtime_ns or entry[2] != st.st_size:
+                return False, None
+            slot, _, _, width, height = entry
+            if slot < 0:
+                return True, None
+            offset = _HEADER.size + slot * self.tile_bytes
+            length = width * height * 4
+            if self._map is None or len(self._map) < offset + length:
+                self._remap()
+            data = self._map[offset:offset + length]
+        return True, DecodedThumbnail(data, width, height, width * 4, True)
+
+    def put(self, name: str, st: os.stat_result, thumbnail: Optional[DecodedThumbnail]) -> None:
+        """Add or replace the thumbnail of a file.
+
+        Args:
+            name: File name.
+            st: Stat of the file taken before decoding.
+            thumbnail: Tightly packed RGBA thumbnail of at most edge x edge
+                       pixels, or None to record a failure.
+        """
+        with self._lock:
+            self._ensure_open()
+            if not self._dirty:
+                # Invalidate the index before tiles overwrite it
+                self._write_header(0)
+                self._dirty = True
+            if thumbnail is None:
+                self._entries[name] = [-1, st.st_mtime_ns, st.st_size, 0, 0]
+            else:
+                slot = self._slots
+                self._file.seek(_HEADER.size + slot * self.tile_bytes)
+                self._file.write(thumbnail.data[:self.tile_bytes].ljust(self.tile_bytes, b'\0'))
+                self._slots += 1
+                self._entries[name] = [slot, st.st_mtime_ns, st.st_size,
+                                       thumbnail.width, thumbnail.height]
+            self._unflushed += 1
+            if self._unflushed >= _FLUSH_EVERY:
+                self._flush()
+
+    def prune(self, names: Iterable[str]) -> int:
+        """Forget files that are no longer in the folder.
+
+        Args:
+            names: File names currently in the folder.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        names = set(names)
+        with self._lock:
+            self._ensure_open()
+            removed = [name for name in self._entries if name not in names]
+            for name in removed:
+                del self._entries[name]
+            if removed and not self._dirty:
+                self._write_header(0)
+                self._dirty = True
+            return len(removed)
+
+    def needs_compaction(self) -> bool:
+        """Whether enough tiles are dead to make compacting worthwhile."""
+        dead = self.dead_slots
+        return dead >= _COMPACT_MIN_DEAD and dead * 4 >= self._slots
+
+    def compact(self) -> None:
+        """Rewrite the pack without dead tiles."""
+        with self._lock:
+            self._ensure_open()
+            self._remap()
+            live = sorted((entry[0], name) for name, entry in self._entries.items() if entry[0] >= 0)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix='.pack')
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    out.write(_HEADER.pack(_MAGIC, _VERSION, self.edge, 0, 0))
+                    for new_slot, (old_slot, name) in enumerate(live):
+                        offset = _HEADER.size + old_slot * self.tile_bytes
+                        out.write(self._map[offset:offset + self.tile_bytes])
+                        self._entries[name][0] = new_slot
+                    index_offset = _HEADER.size + len(live) * self.tile_bytes
+                    out.write(json.dumps(self._entries).encode('utf-8'))
+                    out.seek(0)
+                    out.write(_HEADER.pack(_MAGIC, _VERSION, self.edge, len(live), index_offset))
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Cannot compact {self.path}: {e}")
+                # The temporary file may already be gone; keep the error above
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(tmp_path)
+                self._close()
+                return
+            logger.debug(f"Compacted {self.path}: {self._slots - len(live)} dead tiles removed")
+            self._close()
+            self._ensure_open()
+
+    def flush(self) -> None:
+        """Write the index."""
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+
+    def close(self) -> None:
+        """Write the index and release the file."""
+        with self._lock:
+            if self._file is not None:
+                self._flush()
+            self._close()
+
+    def _ensure_open(self) -> None:
+        """Open the file and read the index if needed."""
+        if self._file is not None:
+            return
+        os.makedirs(self.path.parent, mode=0o700, exist_ok=True)
+        try:
+            self._file = open(self.path, 'r+b')
+        except FileNotFoundError:
+            self._file = open(self.path, 'w+b')
+
+        self._entries, self._slots = {}, 0
+        self._dirty, self._unflushed = False, 0
+        try:
+            magic, version, edge, slots, index_offset = _HEADER.unpack(self._file.read(_HEADER.size))
+            if (magic, version, edge) == (_MAGIC, _VERSION, self.edge) and index_offset:
+                self._file.seek(index_offset)
+                self._entries = json.loads(self._file.read().decode('utf-8'))
+                self._slots = slots
+        except (struct.error, ValueError):
+            pass  # New, foreign or interrupted pack: start over
+        if not self._slots and not self._entries:
+            self._file.truncate(0)
+            self._write_header(0)
+        self._remap()
+
+    def _remap(self) -> None:
+        """Map the tile area as it is now."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        length = _HEADER.size + self._slots * self.tile_bytes
+        if self._slots:
+            self._file.flush()
+            self._map = mmap.mmap(self._file.fileno(), length, access=mmap.ACCESS_READ)
+
+    def _write_header(self, index_offset: int) -> None:
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, self.edge, self._slots, index_offset))
+
+    def _flush(self) -> None:
+        if not self._dirty:
+            return
+        index_offset = _HEADER.size + self._slots * self.tile_bytes
+        self._file.seek(index_offset)
+        self._file.write(json.dumps(self._entries).encode('utf-8'))
+        self._file.truncate()
+        self._write_header(index_offset)
+        self._file.flush()
+        self._dirty = False
+        self._unflushed = 0
+
+    def _close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PackedThumbnailStore:
+    """Thumbnail store keeping one ThumbnailPack per folder.
+
+    An alternative to the per-file freedesktop layout for very large
+    folders. It has the same load() interface but returns raw RGBA
+    thumbnails, and it does not share its thumbnails with other
+    applications.
+    """
+
+    def __init__(self, pack_dir: Path = THUMBNAIL_PACK_DIR, size: str = 'normal',
+                 max_open: int = 4) -> None:
+        """Initialize the store.
+
+        Args:
+            pack_dir: Directory holding the packs.
+            size: Default size bucket of the thumbnails.
+            max_open: Number of packs whose file stays open.
+        """
+        self.cache_dir = Path(pack_dir)
+        self.size = size
+        self.max_open = max_open
+        # One pack object per folder and size bucket, so there is never a second
+        # writer; the least recently used ones release their file and reopen on demand
+        self._packs: "OrderedDict[Tuple[str, str], ThumbnailPack]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def pack_path(self, folder: str, size: Optional[str] = None) -> Path:
+        """Get the pack file of a folder for a size bucket."""
+        digest = hashlib.md5(os.fsencode(os.path.abspath(folder))).hexdigest()
+        return self.cache_dir / f"{digest}-{size or self.size}.pack"
+
+    def open_folder(self, folder: str, names: Optional[Iterable[str]] = None,
+                    size: Optional[str] = None) -> ThumbnailPack:
+        """Get the pack of a folder, optionally dropping entries of deleted files.
+
+        Args:
+            folder: Folder path.
+            names: File names currently in the folder; when given, entries of
+                   other files are removed and the pack is compacted if needed.
+            size: Size bucket name; defaults to the one given at creation.
+
+        Returns:
+            ThumbnailPack: The pack.
+        """
+        key = (os.path.abspath(folder), size or self.size)
+        with self._lock:
+            pack = self._packs.get(key)
+            if pack is None:
+                pack = ThumbnailPack(self.pack_path(*key), THUMBNAIL_SIZES[key[1]])
+                self._packs[key] = pack
+            self._packs.move_to_end(key)
+            idle = list(self._packs.values())[:-self.max_open]
+        for oldest in idle:
+            oldest.close()
+        if names is not None and pack.prune(names):
+            if pack.needs_compaction():
+                pack.compact()
+            else:
+                pack.flush()
+        return pack
+
+    def _find(self, file_path: str, size: Optional[str] = None):
+        """Get the pack entry of a file: (pack, name, stat, found, thumbnail)."""
+        folder, name = os.path.split(os.path.abspath(file_path))
+        st = os.stat(file_path)
+        pack = self.open_folder(folder, size=size)
+        found, thumbnail = pack.get(name, st)
+        return pack, name, st, found, thumbnail
+
+    def lookup(self, file_path: str, size: Optional[str] = None) -> bool:
+        """Check whether a file has an up-to-date entry (thumbnail or failure)."""
+        try:
+            return self._find(file_path, size)[3]
+        except OSError:
+            return False
+
+    def has_failed(self, file_path: str, size: Optional[str] = None) -> bool:
+        """Check whether thumbnailing this file version already failed."""
+        try:
+            _, _, _, found, thumbnail = self._find(file_path, size)
+        except OSError:
+            return False
+        return found and thumbnail is None
+
+    def load(self, file_path: str, size: Optional[str] = None) -> Optional[DecodedThumbnail]:
+        """Load a thumbnail, creating and storing it if needed.
+
+        Args:
+            file_path: Source image.
+            size: Size bucket name; defaults to the one given at creation.
+
+        Returns:
+            Optional[DecodedThumbnail]: RGBA thumbnail, or None if the file
+                                        cannot be thumbnailed.
+        """
+        from gi.repository import GLib
+
+        try:
+            pack, name, st, found, thumbnail = self._find(file_path, size)
+        except OSError:
+            return None
+        if found:
+            return thumbnail
+        try:
+            thumbnail = pixbuf_to_rgba(create_thumbnail(file_path, pack.edge))
+        except (OSError, GLib.Error) as e:
+            logger.debug(f"Cannot thumbnail {file_path}: {e}")
+            thumbnail = None
+        pack.put(name, st, thumbnail)
+        return thumbnail
+
+    def flush(self) -> None:
+        """Write the index of every open pack."""
+        with self._lock:
+            packs = list(self._packs.values())
+        for pack in packs:
+            pack.flush()
+
+    def close(self) -> None:
+        """Close every open pack."""
+        with self._lock:
+            packs = list(self._packs.values())
+            self._packs.clear()
+        for pack in packs:
+            pack.close()
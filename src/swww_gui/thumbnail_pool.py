@@ -0,0 +1,160 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Optional, Tuple
+
+from .constants import THUMBNAIL_CACHE_DIR
+from .thumbnails import ThumbnailStore
+
+logger = logging.getLogger(__name__)
+
+# One store per worker process, created on first use
+_STORES = {}
+
+
+class DecodedThumbnail:
+    """Raw thumbnail pixels decoded in a worker process.
+
+    Holds 8-bit RGB or non-premultiplied RGBA rows, as GdkPixbuf produces
+    them. Turning them into a texture needs GTK, so it is left to the
+    main thread.
+    """
+
+    __slots__ = ('data', 'width', 'height', 'rowstride', 'has_alpha')
+
+    def __init__(self, data: bytes, width: int, height: int, rowstride: int,
+                 has_alpha: bool) -> None:
+        self.data = data
+        self.width = width
+        self.height = height
+        self.rowstride = rowstride
+        self.has_alpha = has_alpha
+
+    def to_texture(self):
+        """Wrap the pixels into a Gdk.MemoryTexture."""
+        import gi
+        gi.require_version('Gdk', '4.0')
+        from gi.repository import Gdk, GLib
+
+        memory_format = (Gdk.MemoryFormat.R8G8B8A8 if self.has_alpha
+                         else Gdk.MemoryFormat.R8G8B8)
+        return Gdk.MemoryTexture.new(self.width, self.height, memory_format,
+                                     GLib.Bytes.new(self.data), self.rowstride)
+
+    def to_pixbuf(self):
+        """Wrap the pixels into a GdkPixbuf.Pixbuf."""
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf, GLib
+
+        return GdkPixbuf.Pixbuf.new_from_bytes(
+            GLib.Bytes.new(self.data), GdkPixbuf.Colorspace.RGB, self.has_alpha, 8,
+            self.width, self.height, self.rowstride
+        )
+
+
+def _decode_in_process(file_path: str, size: str, cache_dir: str) -> Optional[Tuple]:
+    """Create or load a thumbnail inside a worker process.
+
+    The pixels are left in a new shared memory block, which the caller
+    must unlink.
+
+    Returns:
+        Optional[Tuple]: (block name, byte length, width, height, rowstride,
+                         has_alpha), or None if the file cannot be thumbnailed.
+    """
+    store = _STORES.get(cache_dir)
+    if store is None:
+        store = _STORES[cache_dir] = ThumbnailStore(Path(cache_dir))
+    pixbuf = store.load(file_path, size)
+    if pixbuf is None:
+        return None
+
+    pixels = pixbuf.read_pixel_bytes().get_data()
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(pixels)))
+    try:
+        block.buf[:len(pixels)] = pixels
+    finally:
+        block.close()
+    return (block.name, len(pixels), pixbuf.get_width(), pixbuf.get_height(),
+            pixbuf.get_rowstride(), pixbuf.get_has_alpha())
+
+
+class ProcessThumbnailDecoder:
+    """Thumbnail decoding on a pool of worker processes.
+
+    Decoding large images through GdkPixbuf in threads is serialized by the
+    GIL and by the loaders themselves; separate processes scale with the
+    number of cores. Workers read and write the same on-disk store as the
+    threaded path and return raw pixels through shared memory.
+
+    load() blocks until the thumbnail is ready, so it is meant to be called
+    from ThumbnailScheduler workers, which keep the priorities.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache_dir: Path = THUMBNAIL_CACHE_DIR,
+                 size: str = 'normal') -> None:
+        """Initialize the decoder.
+
+        Args:
+            workers: Number of processes; defaults to the number of cores.
+            cache_dir: Root of the on-disk thumbnail store.
+            size: Default size bucket of the thumbnails.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = str(cache_dir)
+        self.size = size
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # Forking a process that runs GTK threads is unsafe, start fresh interpreters
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context('spawn'))
+
+    def load(self, file_path: str, size: Optional[str] = None) -> Optional[DecodedThumbnail]:
+        """Load a thumbnail, creating and storing it if needed.
+
+        Args:
+            file_path: Source image.
+            size: Size bucket name; defaults to the one given at creation.
+
+        Returns:
+            Optional[DecodedThumbnail]: The pixels, or None if the file cannot
+                                        be thumbnailed.
+        """
+        with self._lock:
+            executor = self._executor
+        try:
+            result = executor.submit(_decode_in_process, file_path, size or self.size,
+                                     self.cache_dir).result()
+        except BrokenProcessPool:
+            # A loader crashed a worker; replace the pool and skip this file
+            logger.warning(f"Thumbnail worker died while decoding {file_path}")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = self._create_executor()
+            return None
+        except RuntimeError:
+            return None  # Shut down
+        if result is None:
+            return None
+
+        name, length, width, height, rowstride, has_alpha = result
+        block = shared_memory.SharedMemory(name=name)
+        try:
+            data = bytes(block.buf[:length])
+        finally:
+            block.close()
+            block.unlink()
+        return DecodedThumbnail(data, width, height, rowstride, has_alpha)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            self._executor.shutdown(wait=False)
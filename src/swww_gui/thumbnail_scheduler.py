@@ -0,0 +1,171 @@
+import os
+import heapq
+import logging
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .constants import THUMBNAIL_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+# Request priorities, lower runs first
+PRIORITY_VISIBLE = 0
+PRIORITY_NEAR = 1
+PRIORITY_BACKGROUND = 2
+
+
+def default_worker_count() -> int:
+    """Number of decode threads: never more than the CPU cores."""
+    return max(1, min(os.cpu_count() or 1, THUMBNAIL_MAX_WORKERS))
+
+
+class _Request:
+    """A queued thumbnail request."""
+
+    __slots__ = ('key', 'callback', 'priority', 'generation', 'cancelled')
+
+    def __init__(self, key: str, callback: Callable[[str, Any], Any], priority: int,
+                 generation: int) -> None:
+        self.key = key
+        self.callback = callback
+        self.priority = priority
+        self.generation = generation
+        self.cancelled = False
+
+
+class ThumbnailScheduler:
+    """Shared, bounded pool of thumbnail workers with a priority queue.
+
+    A fixed number of threads take requests in priority order, so visible
+    thumbnails are decoded before the ones just off screen. Requests can be
+    re-prioritized or cancelled while they wait; starting a new generation
+    (a folder change) cancels everything still queued and drops results of
+    requests already running. Results are delivered through `dispatch`,
+    which is GLib.idle_add in the GUI.
+    """
+
+    def __init__(self, load: Callable[[str], Any], dispatch: Optional[Callable[..., Any]] = None,
+                 workers: Optional[int] = None) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            load: Worker function, load(key) -> result (e.g. a pixbuf or None).
+            dispatch: Function used to deliver results, called as
+                      dispatch(callback, key, result). Defaults to a direct call.
+            workers: Number of worker threads; defaults to default_worker_count().
+        """
+        self._load = load
+        self._dispatch = dispatch or (lambda callback, *args: callback(*args))
+        self.workers = workers or default_worker_count()
+        self._heap: List = []
+        self._pending: Dict[str, _Request] = {}
+        self._running: Set[str] = set()
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"thumbnail-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def generation(self) -> int:
+        """Current request generation."""
+        return self._generation
+
+    def new_generation(self) -> int:
+        """Cancel all queued requests and ignore results still in flight.
+
+        Returns:
+            int: The new generation.
+        """
+        with self._cond:
+            self._generation += 1
+            for request in self._pending.values():
+                request.cancelled = True
+            self._pending.clear()
+            self._running.clear()
+            self._heap.clear()
+            return self._generation
+
+    def request(self, key: str, callback: Callable[[str, Any], Any],
+                priority: int = PRIORITY_NEAR) -> None:
+        """Queue a request, or update the priority and callback of a queued one.
+
+        Requests for a key that is already being loaded are ignored.
+
+        Args:
+            key: What to load, usually the image path.
+            callback: Called as callback(key, result) when loaded.
+            priority: PRIORITY_VISIBLE, PRIORITY_NEAR or PRIORITY_BACKGROUND.
+        """
+        with self._cond:
+            if self._stopped or key in self._running:
+                return
+            queued = self._pending.get(key)
+            if queued is not None:
+                if queued.priority == priority:
+                    queued.callback = callback
+                    return
+                queued.cancelled = True
+            request = _Request(key, callback, priority, self._generation)
+            self._pending[key] = request
+            heapq.heappush(self._heap, (priority, next(self._counter), request))
+            self._cond.notify()
+
+    def cancel(self, key: str) -> None:
+        """Drop a queued request; a request already running still completes."""
+        with self._cond:
+            request = self._pending.pop(key, None)
+            if request is not None:
+                request.cancelled = True
+
+    def is_pending(self, key: str) -> bool:
+        """Check whether a request is queued."""
+        with self._cond:
+            return key in self._pending
+
+    def stop(self) -> None:
+        """Stop the workers after their current request."""
+        with self._cond:
+            self._stopped = True
+            self._heap.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+
+    def _next_request(self) -> Optional[_Request]:
+        """Wait for the most urgent live request."""
+        with self._cond:
+            while True:
+                if self._stopped:
+                    return None
+                while self._heap:
+                    _, _, request = heapq.heappop(self._heap)
+                    if not request.cancelled:
+                        self._pending.pop(request.key, None)
+                        self._running.add(request.key)
+                        return request
+                self._cond.wait()
+
+    def _worker(self) -> None:
+        """Worker thread: load requests until stopped."""
+        while True:
+            request = self._next_request()
+            if request is None:
+                return
+            try:
+                result = self._load(request.key)
+            except Exception as e:
+                logger.debug(f"Thumbnail request for {request.key} failed: {e}")
+                result = None
+            with self._cond:
+                # The folder may have changed while loading
+                current = request.generation == self._generation and not self._stopped
+                if current:
+                    self._running.discard(request.key)
+            if current:
+                self._dispatch(request.callback, request.key, result)
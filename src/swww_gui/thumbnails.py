@@ -0,0 +1,478 @@
+import os
+import zlib
+import struct
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import quote
+
+from .constants import THUMBNAIL_CACHE_DIR, THUMBNAIL_DISPLAY_WIDTH, APP_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Size buckets of the freedesktop thumbnail spec: directory name -> max edge in pixels
+THUMBNAIL_SIZES = {
+    'normal': 128,
+    'large': 256,
+    'x-large': 512,
+    'xx-large': 1024,
+}
+
+# Characters GLib leaves unescaped in file URIs; matching them keeps our
+# hashes identical to the ones file managers compute
+_URI_SAFE = "/!$&'()*+,:=@~"
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_CHUNK_HEADER = struct.Struct('>I4s')
+
+_JPEG_SIGNATURE = b'\xff\xd8'
+# Start-of-frame markers carrying the image size (all but DHT, JPG and DAC)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_JPEG_SOS = 0xDA
+_EXIF_HEADER = b'Exif\0\0'
+_EXIF_TAG_THUMBNAIL_OFFSET = 0x0201
+_EXIF_TAG_THUMBNAIL_LENGTH = 0x0202
+
+# Bytes fed to the image loader at a time
+_LOADER_CHUNK_SIZE = 64 * 1024
+
+
+class JpegInfo(NamedTuple):
+    """Header data of a JPEG file."""
+
+    width: int
+    height: int
+    exif_thumbnail: Optional[bytes]
+
+
+def file_uri(file_path: str) -> str:
+    """Get the canonical file:// URI of a local file.
+
+    Args:
+        file_path: Path to the file.
+
+    Returns:
+        str: URI as used for thumbnail hashing.
+    """
+    return "file://" + quote(os.path.abspath(file_path).encode('utf-8', 'surrogateescape'),
+                             safe=_URI_SAFE)
+
+
+def read_png_text(path: str) -> Dict[str, str]:
+    """Read the text chunks of a PNG file without decoding the image.
+
+    Args:
+        path: Path to the PNG file.
+
+    Returns:
+        Dict[str, str]: Keyword -> text for tEXt, zTXt and iTXt chunks.
+                        Empty if the file is not a readable PNG.
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return {}
+    if not data.startswith(_PNG_SIGNATURE):
+        return {}
+
+    texts = {}
+    offset = len(_PNG_SIGNATURE)
+    while offset + _CHUNK_HEADER.size <= len(data):
+        length, tag = _CHUNK_HEADER.unpack_from(data, offset)
+        body = data[offset + _CHUNK_HEADER.size:offset + _CHUNK_HEADER.size + length]
+        offset += _CHUNK_HEADER.size + length + 4  # Skip CRC
+        try:
+            if tag == b'tEXt':
+                keyword, _, text = body.partition(b'\0')
+                texts[keyword.decode('latin-1')] = text.decode('latin-1')
+            elif tag == b'zTXt':
+                keyword, _, rest = body.partition(b'\0')
+                texts[keyword.decode('latin-1')] = zlib.decompress(rest[1:]).decode('latin-1')
+            elif tag == b'iTXt':
+                keyword, _, rest = body.partition(b'\0')
+                compressed = rest[0]
+                _, _, rest = rest[2:].partition(b'\0')  # Language tag
+                _, _, text = rest.partition(b'\0')  # Translated keyword
+                if compressed:
+                    text = zlib.decompress(text)
+                texts[keyword.decode('latin-1')] = text.decode('utf-8')
+            elif tag == b'IEND':
+                break
+        except (IndexError, ValueError, zlib.error):
+            continue  # Malformed chunk, ignore it
+    return texts
+
+
+def _read_exif_thumbnail(tiff: bytes) -> Optional[bytes]:
+    """Extract the JPEG thumbnail from the TIFF structure of an Exif block."""
+    if tiff[:2] == b'II':
+        order = '<'
+    elif tiff[:2] == b'MM':
+        order = '>'
+    else:
+        return None
+    try:
+        ifd0, = struct.unpack_from(order + 'I', tiff, 4)
+        count, = struct.unpack_from(order + 'H', tiff, ifd0)
+        # The thumbnail is described by IFD1, linked from the end of IFD0
+        ifd1, = struct.unpack_from(order + 'I', tiff, ifd0 + 2 + count * 12)
+        if not ifd1:
+            return None
+        count, = struct.unpack_from(order + 'H', tiff, ifd1)
+        offset = length = None
+        for i in range(count):
+            tag, _, _, value = struct.unpack_from(order + 'HHII', tiff, ifd1 + 2 + i * 12)
+            if tag == _EXIF_TAG_THUMBNAIL_OFFSET:
+                offset = value
+            elif tag == _EXIF_TAG_THUMBNAIL_LENGTH:
+                length = value
+    except struct.error:
+        return None
+    if offset is None or not length:
+        return None
+    data = tiff[offset:offset + length]
+    if len(data) != length or not data.startswith(_JPEG_SIGNATURE):
+        return None
+    return data
+
+
+def read_jpeg_info(path: str) -> Optional[JpegInfo]:
+    """Read the size and embedded Exif thumbnail of a JPEG without decoding it.
+
+    Only the headers up to the start-of-frame marker are read.
+
+    Args:
+        path: Path to the JPEG file.
+
+    Returns:
+        Optional[JpegInfo]: Header data, or None if the file is not a readable JPEG.
+    """
+    thumbnail = None
+    try:
+        with open(path, 'rb') as f:
+            if f.read(2) != _JPEG_SIGNATURE:
+                return None
+            while True:
+                header = f.read(4)
+                if len(header) < 4 or header[0] != 0xFF:
+                    return None
+                marker = header[1]
+                if marker == 0xFF:  # Fill byte
+                    f.seek(-3, os.SEEK_CUR)
+                    continue
+                length = struct.unpack('>H', header[2:])[0] - 2
+                if marker in _JPEG_SOF_MARKERS:
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return JpegInfo(width, height, thumbnail)
+                if marker == _JPEG_SOS:
+                    return None
+                if marker == 0xE1 and thumbnail is None:
+                    segment = f.read(length)
+                    if segment.startswith(_EXIF_HEADER):
+                        thumbnail = _read_exif_thumbnail(segment[len(_EXIF_HEADER):])
+                else:
+                    f.seek(length, os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+
+def size_for_scale(scale: int, display_edge: int = THUMBNAIL_DISPLAY_WIDTH) -> str:
+    """Choose the size bucket for thumbnails shown on a scaled display.
+
+    Args:
+        scale: Widget scale factor (2 on a HiDPI monitor).
+        display_edge: Longer edge of the thumbnail in logical pixels.
+
+    Returns:
+        str: The smallest of 'normal', 'large' and 'x-large' holding
+             display_edge * scale device pixels, 'x-large' beyond that.
+    """
+    needed = display_edge * max(1, scale)
+    for bucket in ('normal', 'large'):
+        if THUMBNAIL_SIZES[bucket] >= needed:
+            return bucket
+    return 'x-large'
+
+
+def _fit(width: int, height: int, edge: int):
+    """Scale a size to fit in an edge x edge box, keeping the aspect ratio."""
+    if width <= edge and height <= edge:
+        return width, height
+    scale = edge / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def decode_scaled(source, edge: int):
+    """Decode an image straight to thumbnail size.
+
+    The target size is set while the loader reads the header, which lets the
+    JPEG loader decode at 1/2, 1/4 or 1/8 resolution in the DCT domain
+    instead of decoding every pixel and scaling afterwards.
+
+    Args:
+        source: Path of the image, or its encoded bytes.
+        edge: Maximum size of the longer edge.
+
+    Returns:
+        GdkPixbuf.Pixbuf: The decoded image.
+
+    Raises:
+        GLib.Error, OSError: If the image cannot be decoded.
+    """
+    import gi
+    gi.require_version('GdkPixbuf', '2.0')
+    from gi.repository import GdkPixbuf
+
+    loader = GdkPixbuf.PixbufLoader()
+    loader.connect('size-prepared',
+                   lambda loader, width, height: loader.set_size(*_fit(width, height, edge)))
+    try:
+        if isinstance(source, bytes):
+            loader.write(source)
+        else:
+            with open(source, 'rb') as f:
+                for chunk in iter(lambda: f.read(_LOADER_CHUNK_SIZE), b''):
+                    loader.write(chunk)
+    finally:
+        loader.close()
+    return loader.get_pixbuf()
+
+
+def create_thumbnail(file_path: str, edge: int):
+    """Create a thumbnail image, trying the cheapest way first.
+
+    1. The thumbnail embedded in the Exif data of camera JPEGs, when it is
+       at least `edge` pixels and has the aspect ratio of the image.
+    2. A reduced-resolution decode of the file.
+    3. A full-resolution decode scaled down, for files the loader
+       cannot size while reading them.
+
+    Args:
+        file_path: Source image.
+        edge: Maximum size of the longer edge.
+
+    Returns:
+        GdkPixbuf.Pixbuf: The thumbnail.
+
+    Raises:
+        GLib.Error, OSError: If the image cannot be decoded.
+    """
+    import gi
+    gi.require_version('GdkPixbuf', '2.0')
+    from gi.repository import GdkPixbuf, GLib
+
+    info = read_jpeg_info(file_path)
+    if info and info.exif_thumbnail and info.width and info.height:
+        try:
+            pixbuf = decode_scaled(info.exif_thumbnail, edge)
+            width, height = pixbuf.get_width(), pixbuf.get_height()
+            aspect = info.width / info.height
+            if (max(width, height) >= min(edge, max(info.width, info.height))
+                    and abs(width / height - aspect) <= aspect * 0.02):
+                return pixbuf
+        except GLib.Error:
+            pass  # Broken embedded thumbnail, decode the image
+
+    try:
+        return decode_scaled(file_path, edge)
+    except GLib.Error as e:
+        logger.debug(f"Scaled decode of {file_path} failed, decoding at full size: {e}")
+    pixbuf = GdkPixbuf.Pixbuf.new_from_file(file_path)
+    width, height = _fit(pixbuf.get_width(), pixbuf.get_height(), edge)
+    return pixbuf.scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
+
+
+class ThumbnailStore:
+    """Thumbnails on disk, shared with other applications.
+
+    Follows the freedesktop.org thumbnail specification: a thumbnail is a
+    PNG named after the MD5 of the file's URI, in a directory per size
+    bucket, and is valid while its Thumb::URI and Thumb::MTime match the
+    source file. Thumbnails created by file managers are therefore reused,
+    and the ones created here are reused by them. Files that cannot be
+    thumbnailed are recorded under fail/ so they are not decoded again.
+    """
+
+    def __init__(self, cache_dir: Path = THUMBNAIL_CACHE_DIR,
+                 app_name: str = f"swww-gui-{APP_VERSION}") -> None:
+        """Initialize the store.
+
+        Args:
+            cache_dir: Root thumbnail directory, normally ~/.cache/thumbnails.
+            app_name: Name of the directory under fail/ for failed files.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.fail_dir = self.cache_dir / 'fail' / app_name
+
+    def thumbnail_path(self, uri: str, size: str = 'normal') -> Path:
+        """Get the location of a thumbnail.
+
+        Args:
+            uri: URI of the source file.
+            size: Size bucket name.
+
+        Returns:
+            Path: Thumbnail path (it may not exist).
+        """
+        digest = hashlib.md5(uri.encode('utf-8')).hexdigest()
+        return self.cache_dir / size / f"{digest}.png"
+
+    @staticmethod
+    def _is_valid(thumb_path: Path, uri: str, st: os.stat_result) -> bool:
+        """Check a thumbnail against the source file as the spec requires."""
+        texts = read_png_text(str(thumb_path))
+        if texts.get('Thumb::URI') != uri:
+            return False
+        try:
+            if int(float(texts.get('Thumb::MTime', ''))) != int(st.st_mtime):
+                return False
+            if 'Thumb::Size' in texts and int(texts['Thumb::Size']) != st.st_size:
+                return False
+        except ValueError:
+            return False
+        return True
+
+    def lookup(self, file_path: str, size: str = 'normal') -> Optional[str]:
+        """Find a valid existing thumbnail, in the given bucket or a larger one.
+
+        Args:
+            file_path: Source image.
+            size: Smallest acceptable size bucket.
+
+        Returns:
+            Optional[str]: Path of a valid thumbnail, or None.
+        """
+        # Never thumbnail thumbnails
+        if os.path.abspath(file_path).startswith(str(self.cache_dir) + os.sep):
+            return None
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        uri = file_uri(file_path)
+        minimum = THUMBNAIL_SIZES[size]
+        for bucket, edge in THUMBNAIL_SIZES.items():
+            if edge < minimum:
+                continue
+            thumb_path = self.thumbnail_path(uri, bucket)
+            if thumb_path.exists() and self._is_valid(thumb_path, uri, st):
+                return str(thumb_path)
+        return None
+
+    def has_failed(self, file_path: str) -> bool:
+        """Check whether thumbnailing this file version already failed."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return False
+        uri = file_uri(file_path)
+        digest = hashlib.md5(uri.encode('utf-8')).hexdigest()
+        fail_path = self.fail_dir / f"{digest}.png"
+        return fail_path.exists() and self._is_valid(fail_path, uri, st)
+
+    def load(self, file_path: str, size: str = 'normal'):
+        """Load a thumbnail, creating and storing it if needed.
+
+        Args:
+            file_path: Source image.
+            size: Size bucket name.
+
+        Returns:
+            Optional[GdkPixbuf.Pixbuf]: The thumbnail, or None if the file
+                                        cannot be thumbnailed.
+        """
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf, GLib
+
+        thumb_path = self.lookup(file_path, size)
+        if thumb_path:
+            try:
+                edge = THUMBNAIL_SIZES[size]
+                return GdkPixbuf.Pixbuf.new_from_file_at_scale(thumb_path, edge, edge, True)
+            except GLib.Error as e:
+                logger.debug(f"Unreadable thumbnail {thumb_path}: {e}")
+
+        if self.has_failed(file_path):
+            return None
+        try:
+            st = os.stat(file_path)
+            pixbuf = create_thumbnail(file_path, THUMBNAIL_SIZES[size])
+        except (OSError, GLib.Error) as e:
+            logger.debug(f"Cannot thumbnail {file_path}: {e}")
+            self.mark_failed(file_path)
+            return None
+        self.save(file_path, pixbuf, size, st)
+        return pixbuf
+
+    def save(self, file_path: str, pixbuf, size: str = 'normal',
+             st: Optional[os.stat_result] = None) -> Optional[str]:
+        """Store a thumbnail for a file.
+
+        Args:
+            file_path: Source image.
+            pixbuf: Thumbnail, at most the bucket size on its longer edge.
+            size: Size bucket name.
+            st: Source file stat taken before decoding, so a file modified
+                meanwhile gets a thumbnail that is already stale.
+
+        Returns:
+            Optional[str]: Path of the stored thumbnail, or None on failure.
+        """
+        try:
+            st = st or os.stat(file_path)
+        except OSError:
+            return None
+        uri = file_uri(file_path)
+        thumb_path = self.thumbnail_path(uri, size)
+        keys = ["tEXt::Thumb::URI", "tEXt::Thumb::MTime", "tEXt::Thumb::Size", "tEXt::Software"]
+        values = [uri, str(int(st.st_mtime)), str(st.st_size), "SwwwGUI"]
+        if self._write_png(thumb_path, lambda tmp: pixbuf.savev(tmp, "png", keys, values)):
+            return str(thumb_path)
+        return None
+
+    def mark_failed(self, file_path: str) -> None:
+        """Remember that a file version cannot be thumbnailed."""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
+        import gi
+        gi.require_version('GdkPixbuf', '2.0')
+        from gi.repository import GdkPixbuf
+
+        uri = file_uri(file_path)
+        digest = hashlib.md5(uri.encode('utf-8')).hexdigest()
+        # The spec asks for an empty PNG carrying the usual metadata
+        pixbuf = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, True, 8, 1, 1)
+        pixbuf.fill(0)
+        keys = ["tEXt::Thumb::URI", "tEXt::Thumb::MTime"]
+        values = [uri, str(int(st.st_mtime))]
+        self._write_png(self.fail_dir / f"{digest}.png",
+                        lambda tmp: pixbuf.savev(tmp, "png", keys, values))
+
+    @staticmethod
+    def _write_png(path: Path, write) -> bool:
+        """Write a thumbnail atomically with the permissions the spec asks for."""
+        try:
+            os.makedirs(path.parent, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.png')
+            os.close(fd)
+        except OSError as e:
+            logger.debug(f"Cannot write thumbnail {path}: {e}")
+            return False
+        try:
+            write(tmp_path)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.debug(f"Cannot write thumbnail {path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
@@ -114,8 +114,34 @@ class Translator:
             "daemon_start_question": "swww-daemon is not running. Do you want to start it now?",
             "start_daemon": "Start daemon",
             "daemon_start_failed": "Failed to start swww-daemon.",
+            "daemon_started": "swww-daemon started",
+            "daemon_stopped": "swww-daemon stopped",
+            "daemon_restarted": "swww-daemon restarted and wallpapers restored",
+            "slideshow": "Slideshow",
+            "slideshow_interval": "Interval (minutes)",
+            "slideshow_shuffle": "Shuffle",
+            "slideshow_per_monitor": "Different image on each monitor",
+            "slideshow_started": "Slideshow started",
+            "slideshow_stopped": "Slideshow stopped",
+            "slideshow_no_images": "No images in the current folder",
+            "slideshow_running_elsewhere": "A slideshow is already running in another process",
+            "monitor_settings": "Monitor Settings",
+            "refresh_monitors": "Refresh Monitors",
+            "monitors_refreshed": "Monitor list refreshed",
+            "target_monitor": "Target Monitor",
+            "target_monitor_description": "Select a specific monitor or leave empty for all",
+            "all_monitors": "All Monitors",
+            "per_monitor_wallpapers": "Per-Monitor Wallpapers",
+            "per_monitor_wallpapers_description": "Assign a different image to each monitor",
+            "use_selected_image": "Use Selected Image",
+            "clear_assignment": "Clear Assignment",
+            "selected_image": "Selected image",
+            "thumbnails": "Thumbnails",
+            "background_indexing": "Prepare thumbnails in background",
+            "background_indexing_description": "Creates missing thumbnails of your wallpaper folders while the app is idle",
             "wallpaper_applied": "Wallpaper applied successfully!",
             "wallpaper_set_failed": "Failed to set wallpaper.",
+            "invalid_options": "Invalid effect settings: {}",
             "preview_applied": "Preview applied",
             "preview_failed": "Failed to apply preview",
             "search_placeholder": "Search wallpapers...",
@@ -243,8 +269,34 @@ class Translator:
             "daemon_start_question": "swww-daemon не запущен. Запустить его сейчас?",
             "start_daemon": "Запустить демон",
             "daemon_start_failed": "Не удалось запустить swww-daemon.",
+            "daemon_started": "swww-daemon запущен",
+            "daemon_stopped": "swww-daemon остановлен",
+            "daemon_restarted": "swww-daemon перезапущен, обои восстановлены",
+            "slideshow": "Слайдшоу",
+            "slideshow_interval": "Интервал (минуты)",
+            "slideshow_shuffle": "Случайный порядок",
+            "slideshow_per_monitor": "Разные обои на каждом мониторе",
+            "slideshow_started": "Слайдшоу запущено",
+            "slideshow_stopped": "Слайдшоу остановлено",
+            "slideshow_no_images": "В текущей папке нет изображений",
+            "slideshow_running_elsewhere": "Слайдшоу уже запущено в другом процессе",
+            "monitor_settings": "Настройки мониторов",
+            "refresh_monitors": "Обновить список мониторов",
+            "monitors_refreshed": "Список мониторов обновлён",
+            "target_monitor": "Монитор",
+            "target_monitor_description": "Выберите монитор или оставьте пустым для всех",
+            "all_monitors": "Все мониторы",
+            "per_monitor_wallpapers": "Обои для каждого монитора",
+            "per_monitor_wallpapers_description": "Назначьте каждому монитору своё изображение",
+            "use_selected_image": "Использовать выбранное изображение",
+            "clear_assignment": "Сбросить назначение",
+            "selected_image": "Выбранное изображение",
+            "thumbnails": "Миниатюры",
+            "background_indexing": "Готовить миниатюры в фоне",
+            "background_indexing_description": "Создаёт недостающие миниатюры папок с обоями, пока приложение простаивает",
             "wallpaper_applied": "Обои успешно применены!",
             "wallpaper_set_failed": "Не удалось установить обои.",
+            "invalid_options": "Неверные параметры эффектов: {}",
             "preview_applied": "Предпросмотр применен",
             "preview_failed": "Не удалось применить предпросмотр",
             "search_placeholder": "Поиск обоев...",
@@ -5,6 +5,8 @@ gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw
 
+from ..options import TransitionOptions
+
 logger = logging.getLogger(__name__)
 
 
@@ -362,41 +364,33 @@ class EffectsPanel(Gtk.Box):
             # For other transitions, 90 is swww's default
             self.transition_step_row.set_value(90)
     
+    def get_transition_options(self):
+        """Get the current settings as validated TransitionOptions.
+        
+        Raises ValueError if a text entry holds an invalid value.
+        """
+        return TransitionOptions(
+            transition_type=self.get_transition_type(),
+            transition_step=self.get_transition_step(),
+            transition_fps=self.get_transition_fps(),
+            transition_duration=self.get_transition_duration(),
+            transition_angle=self.get_transition_angle(),
+            transition_wave=self.get_transition_wave(),
+            transition_pos=self.get_transition_position(),
+            invert_y=self.get_invert_y(),
+            transition_bezier=self.get_transition_bezier(),
+            resize_mode=self.get_resize_mode(),
+            fill_color=self.get_fill_color(),
+            filter=self.get_filter()
+        )
+    
     def get_all_options(self):
-        """Get all options as a dictionary to pass to SwwwManager."""
-        options = {}
-        
-        # Basic transition options
-        options['transition_type'] = self.get_transition_type()
-        options['transition_step'] = self.get_transition_step()
-        options['transition_fps'] = self.get_transition_fps()
-        options['transition_duration'] = self.get_transition_duration()
-        
-        # Image options
-        options['resize_mode'] = self.get_resize_mode()
-        options['fill_color'] = self.get_fill_color()
-        options['filter'] = self.get_filter()
-        
-        # Advanced options based on transition type
-        transition_type = options['transition_type']
-        
-        # Add wipe/wave specific options
-        if transition_type in ['wipe', 'wave']:
-            options['transition_angle'] = self.get_transition_angle()
-            
-            if transition_type == 'wave':
-                options['transition_wave'] = self.get_transition_wave()
-        
-        # Add grow/outer specific options
-        if transition_type in ['grow', 'outer', 'center', 'any']:
-            options['transition_pos'] = self.get_transition_position()
-            options['invert_y'] = self.get_invert_y()
-        
-        # Add fade specific options
-        if transition_type == 'fade':
-            options['transition_bezier'] = self.get_transition_bezier()
+        """Get all options as a dictionary to pass to SwwwManager.
         
-        return options
+        Only the options relevant to the transition type end up on the
+        swww command line. Raises ValueError for invalid values.
+        """
+        return self.get_transition_options().to_dict()
     
     # Basic transition getters and setters
     def get_transition_type(self):
@@ -2,135 +2,159 @@ import gi
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw, Gio, GLib, GdkPixbuf, Gdk
+from gi.repository import Gtk, Adw, Gio, GLib, GObject, GdkPixbuf, Gdk
 
 import os
+import math
 import threading
-import time
+from functools import partial
 from pathlib import Path
 
+from ..cache import LRUCache
+from ..constants import (
+    THUMBNAIL_MEMORY_CACHE_MB, THUMBNAIL_DISPLAY_WIDTH, THUMBNAIL_DISPLAY_HEIGHT
+)
+from ..thumbnails import ThumbnailStore, THUMBNAIL_SIZES, size_for_scale
+from ..thumbnail_pool import ProcessThumbnailDecoder, DecodedThumbnail
+from ..thumbnail_pack import PackedThumbnailStore
+from ..previews import compute_preview, preview_texture
+from .frame_dispatcher import FrameDispatcher
+from ..thumbnail_scheduler import ThumbnailScheduler, PRIORITY_VISIBLE, PRIORITY_NEAR
 
-# Global thumbnail cache
-class ThumbnailCache:
-    """Cache for thumbnails to avoid reloading."""
-    
-    def __init__(self, max_size=100):
-        self.cache = {}
-        self.max_size = max_size
-        self.access_times = {}
-    
-    def get(self, file_path):
-        """Get a thumbnail from the cache."""
-        if file_path in self.cache:
-            self.access_times[file_path] = time.time()
-            return self.cache[file_path]
+
+# Thumbnail textures shared by every folder, bounded in bytes
+_THUMBNAIL_CACHE = LRUCache(THUMBNAIL_MEMORY_CACHE_MB * 1024 * 1024, name="thumbnail")
+
+# Thumbnails on disk, shared with file managers (~/.cache/thumbnails)
+_THUMBNAIL_STORE = ThumbnailStore()
+
+
+def _load_thumbnail(key, load=_THUMBNAIL_STORE.load, previews=None):
+    """Load a thumbnail texture in a scheduler worker.
+
+    The key is (file path, size bucket), so every display scale has its
+    own cache entries and decodes only the pixels it shows.
+    """
+    file_path, size = key
+    # A valid thumbnail on disk avoids decoding the full image;
+    # otherwise one is created and stored for the next time
+    image = load(file_path, size)
+    if image is None:
         return None
-    
-    def put(self, file_path, pixbuf):
-        """Add a thumbnail to the cache."""
-        # Purge oldest items if cache is full
-        if len(self.cache) >= self.max_size:
-            oldest_path = min(self.access_times.items(), key=lambda x: x[1])[0]
-            del self.cache[oldest_path]
-            del self.access_times[oldest_path]
-        
-        self.cache[file_path] = pixbuf
-        self.access_times[file_path] = time.time()
 
+    # Placeholder shown instantly the next time the folder is opened
+    if previews is not None and not previews.has(file_path):
+        previews.put(file_path, compute_preview(image))
+
+    # Textures are immutable, so they are built once here and a cache
+    # hit only costs a set_paintable, without copying pixels again
+    if isinstance(image, DecodedThumbnail):
+        # Pixels decoded by a worker process
+        texture = image.to_texture()
+    else:
+        # В GTK4 для Gtk.Picture нужно использовать GdkTexture вместо GdkPixbuf
+        texture = Gdk.Texture.new_for_pixbuf(image)
+    _THUMBNAIL_CACHE.put(key, texture)
+    return texture
 
-# Create a single global cache instance
-_THUMBNAIL_CACHE = ThumbnailCache(max_size=200)
 
+class ScaledTexture(GObject.Object, Gdk.Paintable):
+    """A texture whose intrinsic size is divided by a scale.
 
-class ImageItem(Gtk.FlowBoxChild):
-    """A thumbnail item for the image grid."""
+    Large thumbnails for HiDPI displays then take the same room in the
+    grid as normal ones while being drawn with all their pixels.
+    """
 
-    def __init__(self, file_path, parent):
+    def __init__(self, texture, scale):
         super().__init__()
-        self.file_path = file_path
-        self.parent = parent
-        self.setup_ui()
+        self.texture = texture
+        self.scale = scale
+
+    def do_snapshot(self, snapshot, width, height):
+        self.texture.snapshot(snapshot, width, height)
+
+    def do_get_intrinsic_width(self):
+        return max(1, round(self.texture.get_width() / self.scale))
+
+    def do_get_intrinsic_height(self):
+        return max(1, round(self.texture.get_height() / self.scale))
+
+    def do_get_flags(self):
+        return Gdk.PaintableFlags.STATIC_SIZE | Gdk.PaintableFlags.STATIC_CONTENTS
+
+
+class FileEntry(GObject.Object):
+    """A folder or image of the grid model."""
+
+    def __init__(self, path, is_dir=False, preview=None):
+        super().__init__()
+        self.path = path
+        self.name = os.path.basename(path)
+        self.is_dir = is_dir
+        self.preview = preview  # Placeholder colors, see previews.py
+        self.loaded = False  # Thumbnail (or failure) delivered
+        self.failed = False
+        self.cell = None  # FileCell showing the entry while bound
 
-    def setup_ui(self):
-        """Set up the UI components."""
-        self.set_size_request(150, 120)
 
-        # Create box for thumbnail and label
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
-        box.set_margin_top(6)
-        box.set_margin_bottom(6)
-        box.set_margin_start(6)
-        box.set_margin_end(6)
+class FileCell(Gtk.Box):
+    """A grid cell, recycled by the factory for whichever entry is on screen."""
 
-        # Create thumbnail image
+    def __init__(self):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.set_size_request(150, 120)
+        self.set_margin_top(6)
+        self.set_margin_bottom(6)
+        self.set_margin_start(6)
+        self.set_margin_end(6)
+
+        # Thumbnail image
         self.image = Gtk.Picture()
-        self.image.set_size_request(120, 90)
+        self.image.set_size_request(THUMBNAIL_DISPLAY_WIDTH, THUMBNAIL_DISPLAY_HEIGHT)
         self.image.set_content_fit(Gtk.ContentFit.COVER)
         self.image.add_css_class("card")
-        box.append(self.image)
-
-        # Create label for filename
-        filename = os.path.basename(self.file_path)
-        if len(filename) > 15:
-            filename = filename[:12] + "..."
-        label = Gtk.Label(label=filename)
-        label.set_ellipsize(True)
-        label.set_tooltip_text(os.path.basename(self.file_path))
-        box.append(label)
-
-        self.set_child(box)
-        self.load_thumbnail()
-
-    def load_thumbnail(self):
-        """Load the thumbnail image."""
-        # Check cache first
-        cached_thumb = _THUMBNAIL_CACHE.get(self.file_path)
-        if cached_thumb:
-            self._set_thumbnail(cached_thumb)
-            return
-            
-        # Start a thread to load the thumbnail
-        threading.Thread(target=self._load_thumbnail_thread, daemon=True).start()
-
-    def _load_thumbnail_thread(self):
-        """Thread function to load thumbnail."""
-        try:
-            # Try to use more efficient loading method first
-            try:
-                # Create image by loading only required size
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                    self.file_path, 120, 90, True)
-            except:
-                # If failed, load entire image
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file(self.file_path)
-                # And scale manually if needed
-                orig_width = pixbuf.get_width()
-                orig_height = pixbuf.get_height()
-                scale = min(120 / orig_width, 90 / orig_height)
-                new_width = int(orig_width * scale)
-                new_height = int(orig_height * scale)
-                pixbuf = pixbuf.scale_simple(new_width, new_height, GdkPixbuf.InterpType.BILINEAR)
-            
-            # Cache the thumbnail
-            _THUMBNAIL_CACHE.put(self.file_path, pixbuf)
-            
-            # Update UI in the main thread
-            GLib.idle_add(lambda: self._set_thumbnail(pixbuf))
-        except Exception:
-            # If loading fails, show a placeholder
-            GLib.idle_add(lambda: self._set_placeholder())
+        self.append(self.image)
 
-    def _set_thumbnail(self, pixbuf):
+        # Directory icon
+        self.folder_icon = Gtk.Image.new_from_icon_name("folder-symbolic")
+        self.folder_icon.set_pixel_size(48)
+        self.folder_icon.add_css_class("dim-label")
+        self.folder_icon.set_margin_top(12)
+        self.folder_icon.set_margin_bottom(12)
+        self.append(self.folder_icon)
+
+        # Label for the file name
+        self.label = Gtk.Label()
+        self.label.set_ellipsize(True)
+        self.append(self.label)
+
+    def bind(self, entry):
+        """Show an entry."""
+        name = entry.name
+        if len(name) > 15:
+            name = name[:12] + "..."
+        self.label.set_label(name)
+        self.label.set_tooltip_text(entry.name)
+        self.image.set_visible(not entry.is_dir)
+        self.folder_icon.set_visible(entry.is_dir)
+        if entry.preview:
+            # A few colors of the image, scaled up, until the thumbnail arrives
+            self.image.set_paintable(preview_texture(entry.preview))
+
+    def unbind(self):
+        """Forget the entry before the cell is reused."""
+        self.image.set_paintable(None)
+        self.image.remove_css_class("dim-label")
+
+    def set_thumbnail(self, texture, size):
         """Set the thumbnail image."""
-        # В GTK4 для Gtk.Picture нужно использовать GdkTexture вместо GdkPixbuf
-        texture = Gdk.Texture.new_for_pixbuf(pixbuf)
-        self.image.set_paintable(texture)
-        return False  # Remove this idle callback
+        # Lay out every bucket like a normal thumbnail
+        scale = THUMBNAIL_SIZES[size] / THUMBNAIL_SIZES['normal']
+        self.image.set_paintable(ScaledTexture(texture, scale))
 
-    def _set_placeholder(self):
+    def set_placeholder(self):
         """Set a placeholder image."""
         self.image.add_css_class("dim-label")
-        return False  # Remove this idle callback
 
 
 class FileChooser(Gtk.Box):
@@ -148,11 +172,45 @@ class FileChooser(Gtk.Box):
             self.current_folder = str(Path.home() / "Pictures")
             
         self.current_files = []
-        self.selected_item = None  # Track currently selected item
-        
-        # For batch loading of thumbnails
-        self.batch_size = 20  # Number of thumbnails to load in each batch
-        self.loading_batch = False
+        self.selected_entry = None  # Last activated entry
+        self._filter_text = ""
+        self._bound_entries = set()  # Entries shown by a cell right now
+        self._prefetched = {}  # Key -> entry requested ahead of scrolling
+        self._prefetch_queued = False
+        self._last_scroll_value = 0.0
+        
+        self.thumbnail_cache = _THUMBNAIL_CACHE
+        _THUMBNAIL_CACHE.set_budget(
+            parent_window.config.get('thumbnail_cache_mb', THUMBNAIL_MEMORY_CACHE_MB) * 1024 * 1024
+        )
+
+        # Finished thumbnails are shown in batches, once per frame
+        self.thumbnail_dispatcher = FrameDispatcher(self)
+
+        # Fixed pool of decode threads shared by all cells, visible ones first.
+        # With the process backend the threads only wait for worker processes.
+        self.thumbnail_decoder = None
+        self.thumbnail_packs = None
+        load = _THUMBNAIL_STORE.load
+        workers = None
+        if parent_window.config.get('thumbnail_store', 'freedesktop') == 'pack':
+            # One memory-mapped file per folder instead of a PNG per image
+            self.thumbnail_packs = PackedThumbnailStore()
+            load = self.thumbnail_packs.load
+        elif parent_window.config.get('thumbnail_backend', 'thread') == 'process':
+            self.thumbnail_decoder = ProcessThumbnailDecoder()
+            load = self.thumbnail_decoder.load
+            workers = self.thumbnail_decoder.workers
+        self.thumbnail_scheduler = ThumbnailScheduler(
+            partial(_load_thumbnail, load=load, previews=parent_window.preview_store),
+            dispatch=self.thumbnail_dispatcher,
+            workers=workers
+        )
+
+        # Thumbnails are decoded for the scale of the display showing the grid
+        self.thumbnail_size = size_for_scale(self.get_scale_factor())
+        parent_window.indexer.size = self.thumbnail_size
+        self.connect("notify::scale-factor", self._on_scale_factor_changed)
         
         self.setup_ui()
         self.load_folder(self.current_folder)
@@ -182,6 +240,13 @@ class FileChooser(Gtk.Box):
         self.path_label.add_css_class("heading")
         header_box.append(self.path_label)
         
+        # Background thumbnail indexing progress
+        self.indexing_label = Gtk.Label()
+        self.indexing_label.add_css_class("dim-label")
+        self.indexing_label.add_css_class("caption")
+        self.indexing_label.set_visible(False)
+        header_box.append(self.indexing_label)
+        
         # Open folder button
         open_button = Gtk.Button()
         open_button.set_icon_name("folder-open-symbolic")
@@ -196,20 +261,31 @@ class FileChooser(Gtk.Box):
         scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scrolled.set_vexpand(True)
         
-        # Create flow box for file grid
-        self.flow_box = Gtk.FlowBox()
-        self.flow_box.set_valign(Gtk.Align.START)
-        self.flow_box.set_max_children_per_line(5)
-        self.flow_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.flow_box.set_activate_on_single_click(True)  # Single click activation
-        self.flow_box.connect("child-activated", self.on_item_activated)
+        # Folders and images of the current folder; the grid view only
+        # creates cells for what is on screen and recycles them on scroll
+        self.store = Gio.ListStore(item_type=FileEntry)
+        self.name_filter = Gtk.CustomFilter.new(self._filter_entry)
+        self.filter_model = Gtk.FilterListModel(model=self.store, filter=self.name_filter)
+        self.selection = Gtk.SingleSelection(model=self.filter_model)
+        self.selection.set_autoselect(False)
+        self.selection.set_can_unselect(True)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_factory_setup)
+        factory.connect("bind", self._on_factory_bind)
+        factory.connect("unbind", self._on_factory_unbind)
+
+        self.grid_view = Gtk.GridView(model=self.selection, factory=factory)
+        self.grid_view.set_max_columns(5)
+        self.grid_view.set_single_click_activate(True)  # Single click activation
+        self.grid_view.connect("activate", self.on_item_activated)
         
         # Connect signals for keyboard navigation
-        self.flow_box.set_can_focus(True)
-        self.flow_box.connect("keynav-failed", self.on_keynav_failed)
+        self.grid_view.connect("keynav-failed", self.on_keynav_failed)
         
-        scrolled.set_child(self.flow_box)
+        scrolled.set_child(self.grid_view)
         self.append(scrolled)
+        self.scrolled = scrolled
         
         # Message for empty folders
         self.empty_label = Gtk.Label(label="No images found in this folder")
@@ -219,12 +295,130 @@ class FileChooser(Gtk.Box):
         self.empty_label.set_visible(False)
         self.append(self.empty_label)
         
-        # Connect to scrolled window adjustment for lazy loading
-        vadj = scrolled.get_vadjustment()
-        vadj.connect("value-changed", self.on_scroll_value_changed)
+        # Scrolling counts as activity for the background indexer and
+        # moves the prefetched page along
+        scrolled.get_vadjustment().connect("value-changed", self._on_scrolled)
+
+    def _on_factory_setup(self, factory, list_item):
+        """Create a cell; it is reused for many entries."""
+        list_item.set_child(FileCell())
+
+    def _on_factory_bind(self, factory, list_item):
+        """Show an entry in a cell and request its thumbnail."""
+        entry = list_item.get_item()
+        cell = list_item.get_child()
+        cell.bind(entry)
+        entry.cell = cell
+        self._bound_entries.add(entry)
+        if not entry.is_dir:
+            self._load_entry_thumbnail(entry)
+
+    def _on_factory_unbind(self, factory, list_item):
+        """Release a cell scrolled out of view."""
+        entry = list_item.get_item()
+        entry.cell = None
+        self._bound_entries.discard(entry)
+        if not entry.is_dir:
+            # Off screen: not worth decoding any more
+            self.thumbnail_scheduler.cancel((entry.path, self.thumbnail_size))
+        list_item.get_child().unbind()
+
+    def _load_entry_thumbnail(self, entry):
+        """Show the thumbnail of a bound entry, requesting it if needed."""
+        key = (entry.path, self.thumbnail_size)
+
+        # Check cache first
+        cached_thumb = _THUMBNAIL_CACHE.get(key)
+        if cached_thumb:
+            entry.loaded = True
+            entry.cell.set_thumbnail(cached_thumb, key[1])
+            return
+        if entry.failed:
+            entry.cell.set_placeholder()
+            return
+
+        # Queue it on the shared worker pool ahead of the prefetched page
+        self.thumbnail_scheduler.request(
+            key, partial(self._on_thumbnail_loaded, entry), PRIORITY_VISIBLE
+        )
+
+    def _on_scrolled(self, adjustment):
+        """Note activity and prefetch the page the grid scrolls towards."""
+        self.parent_window.indexer.notify_activity()
+        self._schedule_prefetch()
+
+    def _schedule_prefetch(self):
+        """Prefetch once the current scroll step or model change is handled."""
+        if not self._prefetch_queued:
+            self._prefetch_queued = True
+            GLib.idle_add(self._prefetch_near_page)
+
+    def _prefetch_near_page(self):
+        """Request the thumbnails one page ahead in the scroll direction.
+
+        They are queued at PRIORITY_NEAR, behind everything on screen, so
+        the next page is usually decoded before it scrolls into view. Rows
+        have the same height, so the scroll position maps to positions.
+        """
+        self._prefetch_queued = False
+        adjustment = self.scrolled.get_vadjustment()
+        count = self.filter_model.get_n_items()
+        upper = adjustment.get_upper()
+        if not count or upper <= 0:
+            return False  # Remove from idle queue
+        value = adjustment.get_value()
+        per_page = max(1, math.ceil(count * adjustment.get_page_size() / upper))
+        if value < self._last_scroll_value:
+            # Scrolling up: the page above the view
+            end = int(count * value / upper)
+            start = max(0, end - per_page)
+        else:
+            start = min(count, math.ceil(count * (value + adjustment.get_page_size()) / upper))
+            end = min(count, start + per_page)
+        self._last_scroll_value = value
+
+        prefetched = {}
+        for position in range(start, end):
+            entry = self.filter_model.get_item(position)
+            # Bound entries are already requested at PRIORITY_VISIBLE
+            if entry.is_dir or entry.loaded or entry.failed or entry.cell is not None:
+                continue
+            key = (entry.path, self.thumbnail_size)
+            if key in _THUMBNAIL_CACHE:
+                continue
+            prefetched[key] = entry
+            self.thumbnail_scheduler.request(
+                key, partial(self._on_thumbnail_loaded, entry), PRIORITY_NEAR
+            )
+
+        # The page prefetched before is out of reach now
+        for key, entry in self._prefetched.items():
+            if key not in prefetched and entry.cell is None:
+                self.thumbnail_scheduler.cancel(key)
+        self._prefetched = prefetched
+        return False  # Remove from idle queue
+
+    def _on_thumbnail_loaded(self, entry, key, texture):
+        """Show the result of a thumbnail request in the entry's current cell."""
+        entry.loaded = True
+        entry.failed = texture is None
+        # The cell may show another entry or size bucket by now
+        if entry.cell is None or key != (entry.path, self.thumbnail_size):
+            return False  # Remove this idle callback
+        if texture is None:
+            # If loading fails, show a placeholder
+            entry.cell.set_placeholder()
+        else:
+            entry.cell.set_thumbnail(texture, key[1])
+        return False  # Remove this idle callback
+
+    def _filter_entry(self, entry):
+        """Match an entry against the search text."""
+        return not self._filter_text or self._filter_text in entry.name.lower()
 
     def load_folder(self, folder_path):
         """Load images from the specified folder."""
+        self.parent_window.indexer.notify_activity()
         # Update current folder
         self.current_folder = folder_path
         self.path_label.set_text(self.current_folder)
@@ -232,10 +426,16 @@ class FileChooser(Gtk.Box):
         # Save current folder to config
         self.parent_window.config.set('last_folder', folder_path)
         self.parent_window.config.save()
+
+        # Thumbnails of the previous folder are no longer needed
+        self.thumbnail_scheduler.new_generation()
+        self.thumbnail_dispatcher.clear()
+        self._prefetched = {}
+        self._last_scroll_value = 0.0
         
         # Clear current items
-        while self.flow_box.get_first_child():
-            self.flow_box.remove(self.flow_box.get_first_child())
+        self.store.remove_all()
+        self.selected_entry = None
         
         # Show loading indicator
         self.empty_label.set_text("Loading...")
@@ -267,26 +467,48 @@ class FileChooser(Gtk.Box):
             image_files.sort()
             dir_items.sort()
             
+            if self.thumbnail_packs:
+                # Write what the last folder added and drop deleted files
+                self.thumbnail_packs.flush()
+                self.thumbnail_packs.open_folder(
+                    folder_path, [os.path.basename(path) for path in image_files],
+                    size=self.thumbnail_size
+                )
+            
+            # One read for the placeholders of the whole folder
+            preview_store = self.parent_window.preview_store
+            preview_store.flush()
+            previews = preview_store.load_folder(
+                folder_path, [os.path.basename(path) for path in image_files]
+            )
+            
+            # Model records are cheap enough to create for every file
+            entries = [FileEntry(path, is_dir=True) for path in dir_items]
+            entries.extend(
+                FileEntry(path, preview=previews.get(os.path.basename(path)))
+                for path in image_files
+            )
+            
             # Update UI in the main thread
-            GLib.idle_add(self._finish_load_folder, folder_path, image_files, dir_items)
+            GLib.idle_add(self._finish_load_folder, folder_path, image_files, entries)
         except (PermissionError, FileNotFoundError):
             GLib.idle_add(self._show_folder_error, "Could not access folder")
     
-    def _finish_load_folder(self, folder_path, image_files, dir_items):
+    def _finish_load_folder(self, folder_path, image_files, entries):
         """Finish loading folder in the main thread."""
+        # A newer folder was opened while this one was scanned
+        if folder_path != self.current_folder:
+            return False  # Remove from idle queue
+
         # Store the current files
         self.current_files = image_files
         
-        # Add directory items first
-        for dir_path in dir_items:
-            dir_item = self.create_directory_item(dir_path)
-            self.flow_box.append(dir_item)
-        
-        # Load first batch of images
-        self.load_next_batch(force_first_batch=True)
+        # Directories first, then images, in a single model update
+        self.store.splice(0, self.store.get_n_items(), entries)
+        self._schedule_prefetch()
         
         # Show empty message if no images found
-        if not self.current_files and not dir_items:
+        if not entries:
             self.empty_label.set_text("No images found in this folder")
             self.empty_label.set_visible(True)
         else:
@@ -301,91 +523,20 @@ class FileChooser(Gtk.Box):
         self.empty_label.set_visible(True)
         return False  # Remove from idle queue
 
-    def load_next_batch(self, force_first_batch=False):
-        """Load the next batch of thumbnail items."""
-        if self.loading_batch and not force_first_batch:
-            return
-            
-        self.loading_batch = True
-        
-        # Get the count of already loaded image items (non-directory items)
-        loaded_count = 0
-        child = self.flow_box.get_first_child()
-        while child:
-            if hasattr(child, 'file_path'):  # Skip directory items
-                loaded_count += 1
-            child = child.get_next_sibling()
-        
-        # Check if we've loaded all files
-        if loaded_count >= len(self.current_files) and not force_first_batch:
-            self.loading_batch = False
-            return
-            
-        # Calculate the range for this batch
-        start_idx = 0 if force_first_batch else loaded_count
-        end_idx = min(start_idx + self.batch_size, len(self.current_files))
-        
-        # Add image files to grid for this batch
-        for i in range(start_idx, end_idx):
-            file_path = self.current_files[i]
-            item = ImageItem(file_path, self)
-            self.flow_box.append(item)
-        
-        self.loading_batch = False
-
-    def on_scroll_value_changed(self, adjustment):
-        """Handle scroll event for lazy loading."""
-        # Load more items when user scrolls near the bottom
-        upper = adjustment.get_upper()
-        page_size = adjustment.get_page_size()
-        value = adjustment.get_value()
-        
-        # If scrolled to 80% of the way down, load more items
-        if value > (upper - page_size) * 0.8:
-            self.load_next_batch()
-
-    def create_directory_item(self, dir_path):
-        """Create an item for a directory."""
-        child = Gtk.FlowBoxChild()
-        child.dir_path = dir_path
-        
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
-        box.set_margin_top(6)
-        box.set_margin_bottom(6)
-        box.set_margin_start(6)
-        box.set_margin_end(6)
-        
-        # Directory icon
-        image = Gtk.Image.new_from_icon_name("folder-symbolic")
-        image.set_pixel_size(48)
-        image.add_css_class("dim-label")
-        image.set_margin_top(12)
-        image.set_margin_bottom(12)
-        box.append(image)
-        
-        # Directory name
-        dirname = os.path.basename(dir_path)
-        if len(dirname) > 15:
-            dirname = dirname[:12] + "..."
-        label = Gtk.Label(label=dirname)
-        label.set_ellipsize(True)
-        label.set_tooltip_text(os.path.basename(dir_path))
-        box.append(label)
-        
-        child.set_child(box)
-        return child
-
-    def on_item_activated(self, flow_box, child):
+    def on_item_activated(self, grid_view, position):
         """Handle item activation (click)."""
-        # Store reference to the selected item for keyboard navigation
-        self.selected_item = child
+        self.parent_window.indexer.notify_activity()
+        entry = self.filter_model.get_item(position)
+        # Store reference to the selected entry for keyboard navigation
+        self.selected_entry = entry
+        self.selection.set_selected(position)
         
-        if hasattr(child, 'dir_path'):
+        if entry.is_dir:
             # If it's a directory, navigate to it
-            self.load_folder(child.dir_path)
+            self.load_folder(entry.path)
         else:
             # If it's an image, load it in the preview - use the cached image if available
-            file_path = child.file_path
+            file_path = entry.path
             
             # For better performance, directly mark the image as selected without loading
             # to provide immediate feedback while the image loads in background
@@ -394,10 +545,10 @@ class FileChooser(Gtk.Box):
             # Start loading the image asynchronously
             self.parent_window.image_view.load_image(file_path)
 
-    def on_keynav_failed(self, flowbox, direction):
+    def on_keynav_failed(self, grid_view, direction):
         """Handle keyboard navigation failures."""
         # For up navigation at the top, focus on the back button
-        if direction == Gtk.DirectionType.UP and self.selected_item:
+        if direction == Gtk.DirectionType.UP and self.selected_entry:
             self.back_button.grab_focus()
             return True
         return False
@@ -436,30 +587,56 @@ class FileChooser(Gtk.Box):
     def filter_files(self, search_text):
         """Filter files by search text."""
         search_text = search_text.lower()
-        
-        # Show all items if search text is empty
-        if not search_text:
-            child = self.flow_box.get_first_child()
-            while child:
-                child.set_visible(True)
-                child = child.get_next_sibling()
+        if search_text == self._filter_text:
             return
         
-        # Filter items by filename
-        child = self.flow_box.get_first_child()
-        while child:
-            visible = False
-            if hasattr(child, 'dir_path'):
-                # For directories, check directory name
-                dirname = os.path.basename(child.dir_path).lower()
-                visible = search_text in dirname
-            elif hasattr(child, 'file_path'):
-                # For images, check filename
-                filename = os.path.basename(child.file_path).lower()
-                visible = search_text in filename
-            
-            child.set_visible(visible)
-            child = child.get_next_sibling()
+        # A longer text can only hide more entries, so GTK only rechecks
+        # the ones still shown
+        if self._filter_text and search_text.startswith(self._filter_text):
+            change = Gtk.FilterChange.MORE_STRICT
+        elif search_text and self._filter_text.startswith(search_text):
+            change = Gtk.FilterChange.LESS_STRICT
+        else:
+            change = Gtk.FilterChange.DIFFERENT
+        self._filter_text = search_text
+        self.name_filter.changed(change)
+        self._schedule_prefetch()
+
+    def _on_scale_factor_changed(self, widget, pspec):
+        """Reload thumbnails in another size bucket after a display change."""
+        size = size_for_scale(self.get_scale_factor())
+        if size == self.thumbnail_size:
+            return
+        self.thumbnail_size = size
+        self.parent_window.indexer.size = size
+
+        # Drop requests for the old size; the current thumbnails stay
+        # on screen until their replacements arrive
+        self.thumbnail_scheduler.new_generation()
+        self.thumbnail_dispatcher.clear()
+        self._prefetched = {}
+        for entry in self.store:
+            entry.loaded = False
+        for entry in list(self._bound_entries):
+            if not entry.is_dir:
+                self._load_entry_thumbnail(entry)
+        self._schedule_prefetch()
+
+    def show_indexing_progress(self, done, total):
+        """Show how far the background indexer is."""
+        if total and done < total:
+            self.indexing_label.set_text(f"Thumbnails {done}/{total}")
+            self.indexing_label.set_visible(True)
+        else:
+            self.indexing_label.set_visible(False)
+
+    def shutdown(self):
+        """Stop the thumbnail workers."""
+        self.thumbnail_scheduler.stop()
+        if self.thumbnail_decoder:
+            self.thumbnail_decoder.shutdown()
+        if self.thumbnail_packs:
+            self.thumbnail_packs.close()
 
     def show_error(self, message):
         """Show error toast."""
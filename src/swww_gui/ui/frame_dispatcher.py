@@ -0,0 +1,77 @@
+import gi
+import logging
+import threading
+import time
+from collections import deque
+
+gi.require_version('Gtk', '4.0')
+from gi.repository import GLib
+
+from ..constants import THUMBNAIL_FRAME_BUDGET_MS
+
+logger = logging.getLogger(__name__)
+
+
+class FrameDispatcher:
+    """Delivers results from worker threads in batches, once per frame.
+
+    A drop-in replacement for GLib.idle_add as a `dispatch` function:
+    callbacks are queued from any thread and run from a tick callback of
+    `widget`, as many as fit in the time budget of each frame. Hundreds of
+    finished thumbnails then cost a few relayouts instead of one each.
+    """
+
+    def __init__(self, widget, budget_ms=THUMBNAIL_FRAME_BUDGET_MS):
+        self.widget = widget
+        self.budget = budget_ms / 1000
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._armed = False
+        self._tick_id = None
+
+    def __call__(self, callback, *args):
+        """Queue callback(*args) for the next frame. Safe from any thread."""
+        self._queue.append((callback, args))
+        with self._lock:
+            if self._armed:
+                return
+            self._armed = True
+        # Tick callbacks can only be added from the main thread
+        GLib.idle_add(self._arm)
+
+    def _arm(self):
+        """Start draining on frame ticks."""
+        if self._tick_id is None:
+            self._tick_id = self.widget.add_tick_callback(self._on_tick)
+        return False  # Remove from idle queue
+
+    def _on_tick(self, widget, frame_clock):
+        """Run queued callbacks until the frame budget is spent."""
+        deadline = time.monotonic() + self.budget
+        keep = False
+        try:
+            while self._queue:
+                callback, args = self._queue.popleft()
+                try:
+                    callback(*args)
+                except Exception:
+                    # A failing callback must not stall the ones behind it
+                    logger.exception(f"Dispatched callback {callback!r} failed")
+                if time.monotonic() >= deadline:
+                    keep = True
+                    return GLib.SOURCE_CONTINUE  # Rest on the next frame
+            return GLib.SOURCE_REMOVE
+        finally:
+            if not keep:
+                # Also reached if the loop itself raised: the tick is gone
+                # either way, so never stay armed without one
+                with self._lock:
+                    self._tick_id = None
+                    if self._queue:
+                        GLib.idle_add(self._arm)  # Queued meanwhile
+                    else:
+                        self._armed = False
+
+    def clear(self):
+        """Drop callbacks not delivered yet."""
+        self._queue.clear()
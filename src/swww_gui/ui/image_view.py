@@ -2,48 +2,23 @@ import gi
 import threading
 import os
 from pathlib import Path
-import time
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, GdkPixbuf, Gio, GLib, Gdk
 
-
-class ImageCache:
-    """Simple cache for loaded images to avoid reloading the same images."""
-    
-    def __init__(self, max_size=10):
-        self.cache = {}
-        self.max_size = max_size
-        self.access_times = {}
-    
-    def get(self, file_path):
-        """Get an image from the cache."""
-        if file_path in self.cache:
-            self.access_times[file_path] = time.time()
-            return self.cache[file_path]
-        return None
-    
-    def put(self, file_path, pixbuf):
-        """Add an image to the cache."""
-        # Purge oldest items if cache is full
-        if len(self.cache) >= self.max_size:
-            oldest_path = min(self.access_times.items(), key=lambda x: x[1])[0]
-            del self.cache[oldest_path]
-            del self.access_times[oldest_path]
-        
-        self.cache[file_path] = pixbuf
-        self.access_times[file_path] = time.time()
+from ..cache import LRUCache
+from ..constants import IMAGE_MEMORY_CACHE_MB
 
 
 class ImageView(Gtk.Picture):
     """Widget for displaying and previewing wallpaper images."""
     
-    def __init__(self):
+    def __init__(self, cache_bytes=IMAGE_MEMORY_CACHE_MB * 1024 * 1024):
         super().__init__()
         
         self.current_image_path = None
-        self.image_cache = ImageCache(max_size=20)  # Cache for loaded images
+        self.image_cache = LRUCache(cache_bytes, name="image")  # Cache for loaded images
         self.setup_ui()
         
     def setup_ui(self):
@@ -72,10 +47,10 @@ class ImageView(Gtk.Picture):
             return False
             
         # Check cache first
-        cached_pixbuf = self.image_cache.get(file_path)
-        if cached_pixbuf:
+        cached_texture = self.image_cache.get(file_path)
+        if cached_texture:
             # Use cached image
-            self._set_from_pixbuf(cached_pixbuf)
+            self._set_from_texture(cached_texture)
             self.current_image_path = file_path
             return True
             
@@ -101,11 +76,13 @@ class ImageView(Gtk.Picture):
                 GLib.idle_add(lambda: self.set_placeholder())
                 return
             
-            # Cache the pixbuf
-            self.image_cache.put(file_path, pixbuf)
+            # Convert GdkPixbuf to GdkTexture for GTK4 once; the cache keeps
+            # the texture so showing the image again copies no pixels
+            texture = Gdk.Texture.new_for_pixbuf(pixbuf)
+            self.image_cache.put(file_path, texture)
             
             # Update UI in the main thread
-            GLib.idle_add(lambda p=pixbuf, fp=file_path: self._set_from_pixbuf(p, fp))
+            GLib.idle_add(lambda t=texture, fp=file_path: self._set_from_texture(t, fp))
             
             # Preload adjacent images for faster navigation
             self._preload_adjacent_images(file_path)
@@ -113,13 +90,11 @@ class ImageView(Gtk.Picture):
             # If loading fails, show placeholder
             GLib.idle_add(lambda: self.set_placeholder())
     
-    def _set_from_pixbuf(self, pixbuf, file_path=None):
-        """Set the image from a pixbuf."""
+    def _set_from_texture(self, texture, file_path=None):
+        """Set the image from a texture."""
         if file_path:
             self.current_image_path = file_path
         
-        # Convert GdkPixbuf to GdkTexture for GTK4
-        texture = Gdk.Texture.new_for_pixbuf(pixbuf)
         self.set_paintable(texture)
         
         # Remove placeholder styling
@@ -161,10 +136,10 @@ class ImageView(Gtk.Picture):
                 # Load images at low priority
                 for idx in indices_to_load:
                     preload_path = os.path.join(directory, image_files[idx])
-                    if preload_path not in self.image_cache.cache:
+                    if preload_path not in self.image_cache:
                         try:
                             pixbuf = GdkPixbuf.Pixbuf.new_from_file(preload_path)
-                            self.image_cache.put(preload_path, pixbuf)
+                            self.image_cache.put(preload_path, Gdk.Texture.new_for_pixbuf(pixbuf))
                         except Exception:
                             pass  # Ignore errors in preloading
         except Exception:
@@ -1,8 +1,10 @@
 import gi
+import os
+import threading
 
 gi.require_version('Gtk', '4.0')
 gi.require_version('Adw', '1')
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib
 
 
 class MonitorPanel(Gtk.Box):
@@ -12,6 +14,13 @@ class MonitorPanel(Gtk.Box):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=12)
         self.parent_window = parent_window
         self.swww_manager = parent_window.swww_manager
+        self.translator = parent_window.application.translator
+        self.monitors = []  # Monitor records, in list order after "All Monitors"
+        # Per-output image assignments, output name -> image path
+        self.assignments = dict(parent_window.config.get('output_images', {}) or {})
+        self.assignment_rows = []
+        # Saved selection, restored once the first query finishes
+        self.pending_selection = parent_window.config.get('monitor', '')
         self.setup_ui()
         self.refresh_monitors()
         
@@ -22,23 +31,35 @@ class MonitorPanel(Gtk.Box):
         self.set_margin_start(12)
         self.set_margin_end(12)
         
-        # Monitor header
-        header = Gtk.Label(label="Monitor Settings")
+        # Monitor header with refresh button
+        header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        header = Gtk.Label(label=self.translator.translate("monitor_settings"))
         header.add_css_class("heading")
         header.set_xalign(0)
-        self.append(header)
+        header.set_hexpand(True)
+        header_box.append(header)
+        self.header_label = header
+        
+        refresh_button = Gtk.Button()
+        refresh_button.set_icon_name("view-refresh-symbolic")
+        refresh_button.set_tooltip_text(self.translator.translate("refresh_monitors"))
+        refresh_button.add_css_class("flat")
+        refresh_button.connect("clicked", self.on_refresh_clicked)
+        header_box.append(refresh_button)
+        self.refresh_button = refresh_button
+        self.append(header_box)
         
         # Create the preferences group
         group = Adw.PreferencesGroup()
         
         # Monitor selection
         monitor_row = Adw.ComboRow()
-        monitor_row.set_title("Target Monitor")
-        monitor_row.set_subtitle("Select a specific monitor or leave empty for all")
+        monitor_row.set_title(self.translator.translate("target_monitor"))
+        monitor_row.set_subtitle(self.translator.translate("target_monitor_description"))
         
         # Create string list for monitors
         string_list = Gtk.StringList()
-        string_list.append("All Monitors")  # First option is for all monitors
+        string_list.append(self.translator.translate("all_monitors"))  # First option is for all monitors
         self.monitor_string_list = string_list
         
         monitor_row.set_model(string_list)
@@ -51,41 +72,153 @@ class MonitorPanel(Gtk.Box):
         # Add group to panel
         self.append(group)
         
-    def refresh_monitors(self):
-        """Refresh the list of available monitors."""
+        # Per-output images, filled in once monitors are known
+        self.assignment_group = Adw.PreferencesGroup()
+        self.assignment_group.set_title(self.translator.translate("per_monitor_wallpapers"))
+        self.assignment_group.set_description(self.translator.translate("per_monitor_wallpapers_description"))
+        self.assignment_group.set_visible(False)
+        self.append(self.assignment_group)
+        
+    def update_localization(self):
+        """Update all UI elements with current language."""
+        tr = self.translator
+        self.header_label.set_label(tr.translate("monitor_settings"))
+        self.refresh_button.set_tooltip_text(tr.translate("refresh_monitors"))
+        self.monitor_row.set_title(tr.translate("target_monitor"))
+        self.monitor_row.set_subtitle(tr.translate("target_monitor_description"))
+        
+        # Replacing the first item resets the selection, so keep it
+        selected = self.monitor_row.get_selected()
+        self.monitor_string_list.splice(0, 1, [tr.translate("all_monitors")])
+        self.monitor_row.set_selected(selected)
+        
+        self.assignment_group.set_title(tr.translate("per_monitor_wallpapers"))
+        self.assignment_group.set_description(tr.translate("per_monitor_wallpapers_description"))
+        # Button tooltips and subtitles of the rows
+        self._rebuild_assignment_rows()
+        
+    def refresh_monitors(self, force=False):
+        """Refresh the list of available monitors.
+        
+        The query runs in a background thread; the list is updated
+        on the main loop once it finishes.
+        """
+        threading.Thread(
+            target=self._refresh_monitors_thread,
+            args=(force,),
+            daemon=True
+        ).start()
+    
+    def _refresh_monitors_thread(self, force):
+        """Thread function to query monitors."""
+        monitors = self.swww_manager.get_monitor_info(refresh=force)
+        GLib.idle_add(self._finish_refresh_monitors, monitors)
+    
+    def _finish_refresh_monitors(self, monitors):
+        """Update the monitor list in the main thread."""
         # Save the currently selected monitor name if any
-        selected_index = self.monitor_row.get_selected()
-        selected_monitor = ""
-        if selected_index > 0 and selected_index < self.monitor_string_list.get_n_items():
-            selected_monitor = self.monitor_string_list.get_string(selected_index)
+        if self.pending_selection is not None:
+            selected_monitor = self.pending_selection
+            self.pending_selection = None
+        else:
+            selected_monitor = self.get_selected_monitor()
         
         # Clear current monitor list except "All Monitors"
         while self.monitor_string_list.get_n_items() > 1:
             self.monitor_string_list.remove(1)
         
-        # Get available monitors
-        monitors = self.swww_manager.get_monitors()
-        
         # Add monitors to list
+        self.monitors = monitors
         for monitor in monitors:
-            self.monitor_string_list.append(monitor)
+            if monitor.width and monitor.height:
+                self.monitor_string_list.append(f"{monitor.name} ({monitor.width}x{monitor.height})")
+            else:
+                self.monitor_string_list.append(monitor.name)
         
         # Restore previously selected monitor if it still exists
-        if selected_monitor:
-            for i in range(self.monitor_string_list.get_n_items()):
-                if i > 0 and self.monitor_string_list.get_string(i) == selected_monitor:
-                    self.monitor_row.set_selected(i)
-                    return
+        self.set_selected_monitor(selected_monitor)
         
-        # If not found, select "All Monitors"
-        self.monitor_row.set_selected(0)
+        self._rebuild_assignment_rows()
+        return False  # Remove from idle queue
+    
+    def _rebuild_assignment_rows(self):
+        """Create one assignment row per monitor."""
+        for row in self.assignment_rows:
+            self.assignment_group.remove(row)
+        self.assignment_rows = []
+        
+        for monitor in self.monitors:
+            row = Adw.ActionRow()
+            row.set_title(monitor.name)
+            
+            assign_button = Gtk.Button()
+            assign_button.set_icon_name("insert-image-symbolic")
+            assign_button.set_tooltip_text(self.translator.translate("use_selected_image"))
+            assign_button.set_valign(Gtk.Align.CENTER)
+            assign_button.add_css_class("flat")
+            assign_button.connect("clicked", self.on_assign_clicked, monitor.name, row)
+            row.add_suffix(assign_button)
+            
+            clear_button = Gtk.Button()
+            clear_button.set_icon_name("edit-clear-symbolic")
+            clear_button.set_tooltip_text(self.translator.translate("clear_assignment"))
+            clear_button.set_valign(Gtk.Align.CENTER)
+            clear_button.add_css_class("flat")
+            clear_button.connect("clicked", self.on_clear_assignment_clicked, monitor.name, row)
+            row.add_suffix(clear_button)
+            
+            self._update_assignment_row(row, monitor.name)
+            self.assignment_group.add(row)
+            self.assignment_rows.append(row)
+        
+        # A single output has nothing to assign separately
+        self.assignment_group.set_visible(len(self.monitors) > 1)
+    
+    def _update_assignment_row(self, row, monitor_name):
+        """Show the image assigned to a monitor."""
+        image_path = self.assignments.get(monitor_name)
+        row.set_subtitle(os.path.basename(image_path) if image_path else self.translator.translate("selected_image"))
+    
+    def on_assign_clicked(self, button, monitor_name, row):
+        """Assign the previewed image to a monitor."""
+        image_path = self.parent_window.image_view.current_image_path
+        if not image_path:
+            return
+        self.assignments[monitor_name] = image_path
+        self._update_assignment_row(row, monitor_name)
+    
+    def on_clear_assignment_clicked(self, button, monitor_name, row):
+        """Remove the image assigned to a monitor."""
+        self.assignments.pop(monitor_name, None)
+        self._update_assignment_row(row, monitor_name)
+    
+    def get_assignments(self, default_image=None):
+        """Get the image to apply on each monitor.
+        
+        Returns an empty dict if no monitor has its own image, meaning
+        a single image should be applied to all of them.
+        
+        Args:
+            default_image: Image for monitors without an assignment.
+        """
+        names = [monitor.name for monitor in self.monitors]
+        assigned = {name: path for name, path in self.assignments.items() if name in names}
+        if not assigned:
+            return {}
+        
+        result = {}
+        for name in names:
+            image_path = assigned.get(name, default_image)
+            if image_path:
+                result[name] = image_path
+        return result
     
     def on_refresh_clicked(self, button):
         """Handle refresh button click."""
-        self.refresh_monitors()
+        self.refresh_monitors(force=True)
         
         # Show toast message
-        toast = Adw.Toast.new("Monitor list refreshed")
+        toast = Adw.Toast.new(self.translator.translate("monitors_refreshed"))
         self.parent_window.add_toast(toast)
     
     def get_selected_monitor(self):
@@ -97,23 +230,18 @@ class MonitorPanel(Gtk.Box):
             return ""
         
         # Return monitor name for specific monitor
-        if selected_index < self.monitor_string_list.get_n_items():
-            return self.monitor_string_list.get_string(selected_index)
+        if 0 < selected_index <= len(self.monitors):
+            return self.monitors[selected_index - 1].name
         
         return ""
     
     def set_selected_monitor(self, monitor):
         """Set the selected monitor."""
-        # If empty, select "All Monitors"
-        if not monitor:
-            self.monitor_row.set_selected(0)
-            return
-        
         # Look for the specified monitor
-        for i in range(self.monitor_string_list.get_n_items()):
-            if i > 0 and self.monitor_string_list.get_string(i) == monitor:
-                self.monitor_row.set_selected(i)
+        for i, info in enumerate(self.monitors):
+            if monitor and info.name == monitor:
+                self.monitor_row.set_selected(i + 1)
                 return
         
-        # If not found, select "All Monitors"
+        # If empty or not found, select "All Monitors"
         self.monitor_row.set_selected(0)
@@ -4,6 +4,7 @@
 """
 
 import os
+import shutil
 import subprocess
 import logging
 from pathlib import Path
@@ -36,6 +37,41 @@ def run_command(cmd: List[str], check: bool = True) -> Tuple[bool, str, str]:
         logger.error(f"Error running command: {' '.join(cmd)}\nError: {e}")
         return False, "", str(e)
 
+def run_commands_concurrently(cmds: List[List[str]]) -> List[Tuple[bool, str, str]]:
+    """Запускает несколько команд одновременно и ждёт завершения всех.
+    
+    Все процессы запускаются до того, как начинается ожидание любого из них.
+    
+    Args:
+        cmds: Список команд, каждая - список строк с командой и аргументами
+        
+    Returns:
+        List[Tuple[bool, str, str]]: (успех, stdout, stderr) для каждой команды
+    """
+    processes = []
+    for cmd in cmds:
+        try:
+            processes.append(subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            ))
+        except Exception as e:
+            logger.error(f"Error running command: {' '.join(cmd)}\nError: {e}")
+            processes.append(e)
+    
+    results = []
+    for cmd, process in zip(cmds, processes):
+        if isinstance(process, Exception):
+            results.append((False, "", str(process)))
+            continue
+        stdout, stderr = process.communicate()
+        if process.returncode != 0:
+            logger.error(f"Command failed: {' '.join(cmd)}\nError: {stderr}")
+        results.append((process.returncode == 0, stdout, stderr))
+    return results
+
 def is_executable_available(name: str) -> bool:
     """Проверяет, доступна ли программа в системе.
     
@@ -46,11 +82,7 @@ def is_executable_available(name: str) -> bool:
         bool: True если программа доступна, False иначе
     """
     try:
-        return subprocess.run(
-            ["which", name], 
-            capture_output=True, 
-            check=False
-        ).returncode == 0
+        return shutil.which(name) is not None
     except Exception:
         return False
 
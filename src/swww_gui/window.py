@@ -5,7 +5,7 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib, GdkPixbuf, Gdk
 
 import os
-import json
+import threading
 import subprocess
 from pathlib import Path
 import logging
@@ -13,7 +13,19 @@ import logging
 from .ui.image_view import ImageView
 from .ui.file_chooser import FileChooser
 from .ui.effects_panel import EffectsPanel
+from .ui.monitor_panel import MonitorPanel
 from .swww_manager import SwwwManager
+from .prescale import PrescaleCache
+from .constants import SLIDESHOW_DEFAULT_INTERVAL, IMAGE_MEMORY_CACHE_MB
+from .cache import watch_memory_pressure
+from .matugen import apply_with_matugen
+from .apply_engine import ApplyEngine
+from .slideshow import Slideshow
+from .indexer import ThumbnailIndexer
+from .previews import PreviewStore
+from .daemon_supervisor import (
+    DaemonSupervisor, EVENT_READY, EVENT_FAILED, EVENT_DIED, EVENT_RESTARTED
+)
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +45,44 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         self._load_css()
         
         # Initialize swww manager
-        self.swww_manager = SwwwManager()
+        self.swww_manager = SwwwManager(
+            use_ipc=self.config.get('use_ipc', True),
+            prescale_cache=(PrescaleCache(lossy=self.config.get('prescale_lossy', False))
+                            if self.config.get('prescale_images', True) else None),
+            probe=self.application.probe
+        )
+        
+        # Wallpapers are applied on a worker thread, results come back via the main loop
+        self.apply_engine = ApplyEngine(
+            dispatch=GLib.idle_add,
+            on_busy_changed=self._on_apply_busy_changed
+        )
+        
+        # Starts and watches swww-daemon, reports lifecycle events via the main loop
+        self.daemon_supervisor = DaemonSupervisor(
+            self.swww_manager,
+            dispatch=GLib.idle_add,
+            on_event=self._on_daemon_event
+        )
+        
+        # Rotates wallpapers on its own thread; state is kept in the config
+        self.slideshow = Slideshow(
+            self.swww_manager,
+            self.config,
+            dispatch=GLib.idle_add,
+            on_change=self._on_slideshow_changed
+        )
+        
+        # Tiny per-image previews painted while thumbnails load
+        self.preview_store = PreviewStore()
+        
+        # Optionally fills the thumbnail cache of known folders while idle
+        self.indexer = ThumbnailIndexer(
+            self.config,
+            previews=self.preview_store,
+            dispatch=GLib.idle_add,
+            on_progress=self._on_indexing_progress
+        )
         
         # Create UI widgets
         self.main_stack = None
@@ -42,6 +91,9 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         self.image_container = None
         self.settings_button = None
         self.apply_button = None
+        self.apply_spinner = None
+        self.slideshow_button = None
+        self._updating_slideshow_button = False
         self.maximize_button = None
         self.title_label = None
         
@@ -60,6 +112,9 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         # Load last settings if available
         self.load_settings()
         
+        if self.config.get('background_indexing', False):
+            self.indexer.start()
+        
         # Apply localization
         self.update_localization()
 
@@ -113,6 +168,17 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         self.maximize_button.set_tooltip_text(self.application.translator.translate("maximize_view"))
         button_box.append(self.maximize_button)
         
+        # Slideshow toggle
+        self.slideshow_button = Gtk.ToggleButton()
+        self.slideshow_button.set_icon_name("media-playlist-shuffle-symbolic")
+        self.slideshow_button.set_tooltip_text(self.application.translator.translate("slideshow"))
+        button_box.append(self.slideshow_button)
+        
+        # Spinner shown while a wallpaper is being applied
+        self.apply_spinner = Gtk.Spinner()
+        self.apply_spinner.set_visible(False)
+        button_box.append(self.apply_spinner)
+        
         self.apply_button = Gtk.Button(label=self.application.translator.translate("apply"))
         self.apply_button.set_tooltip_text(self.application.translator.translate("apply"))
         self.apply_button.add_css_class("suggested-action")
@@ -178,13 +244,28 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
     def setup_ui(self):
         """Set up the main UI components."""
         # Image view
-        self.image_view = ImageView()
+        self.image_view = ImageView(
+            cache_bytes=self.config.get('image_cache_mb', IMAGE_MEMORY_CACHE_MB) * 1024 * 1024
+        )
         self.image_container.append(self.image_view)
         
         # File chooser
         self.file_chooser = FileChooser(self)
         self.main_content.append(self.file_chooser)
         
+        # Index into the same store the grid reads
+        if self.file_chooser.thumbnail_packs:
+            self.indexer.store = self.file_chooser.thumbnail_packs
+
+        # Give memory back when the system runs low
+        self.memory_monitor = watch_memory_pressure(
+            self.image_view.image_cache, self.file_chooser.thumbnail_cache
+        )
+        
+        # Monitor panel (target output and per-output images)
+        self.monitor_panel = MonitorPanel(self)
+        self.main_content.append(self.monitor_panel)
+        
         # Effects panel
         self.effects_panel = EffectsPanel(self)
         self.main_content.append(self.effects_panel)
@@ -200,8 +281,10 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         """Connect UI signals to callbacks."""
         self.apply_button.connect('clicked', self.on_apply_clicked)
         self.maximize_button.connect('clicked', self.on_maximize_clicked)
+        self.slideshow_button.connect('toggled', self.on_slideshow_toggled)
         self.settings_button.connect('clicked', self.on_settings_clicked)
         self.search_entry.connect('search-changed', self.on_search_changed)
+        self.connect('close-request', self.on_close_request)
         
     def on_maximize_clicked(self, button):
         """Toggle side panel visibility to maximize image view."""
@@ -217,8 +300,23 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
             self.maximize_button.set_icon_name("view-fullscreen-symbolic")
 
     def check_swww_daemon(self):
-        """Check if swww-daemon is running and start it if needed."""
-        if not self.swww_manager.is_daemon_running():
+        """Check if swww-daemon is running and start it if needed.
+        
+        The check runs in a background thread so startup isn't blocked.
+        """
+        threading.Thread(target=self._check_swww_daemon_thread, daemon=True).start()
+    
+    def _check_swww_daemon_thread(self):
+        """Thread function to check daemon liveness."""
+        running = self.swww_manager.is_daemon_running()
+        GLib.idle_add(self._finish_check_swww_daemon, running)
+    
+    def _finish_check_swww_daemon(self, running):
+        """Watch the daemon or offer to start it, in the main thread."""
+        if running:
+            self.daemon_supervisor.watch()
+            self._resume_slideshow()
+        else:
             dialog = Adw.MessageDialog(
                 transient_for=self,
                 heading=self.application.translator.translate("daemon_not_running"),
@@ -230,49 +328,106 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
             dialog.set_response_appearance("start", Adw.ResponseAppearance.SUGGESTED)
             dialog.connect("response", self.on_daemon_dialog_response)
             dialog.present()
+        return False  # Remove from idle queue
 
     def on_daemon_dialog_response(self, dialog, response):
         """Handle response from daemon start dialog."""
         if response == "start":
-            success = self.swww_manager.start_daemon()
-            if not success:
-                error_dialog = Adw.MessageDialog(
-                    transient_for=self,
-                    heading=self.application.translator.translate("error"),
-                    body=self.application.translator.translate("daemon_start_failed"),
-                    close_response="ok"
-                )
-                error_dialog.add_response("ok", self.application.translator.translate("ok"))
-                error_dialog.present()
+            # Returns at once, readiness is reported through _on_daemon_event
+            self.daemon_supervisor.start()
+
+    def _on_daemon_event(self, event, detail):
+        """Handle swww-daemon lifecycle events from the supervisor."""
+        tr = self.application.translator
+        if event == EVENT_READY:
+            toast = Adw.Toast.new(tr.translate("daemon_started"))
+            toast.set_timeout(2)
+            self.add_toast(toast)
+            self.monitor_panel.refresh_monitors(force=True)
+            self._resume_slideshow()
+        elif event == EVENT_RESTARTED:
+            toast = Adw.Toast.new(tr.translate("daemon_restarted"))
+            toast.set_timeout(3)
+            self.add_toast(toast)
+            self.monitor_panel.refresh_monitors(force=True)
+        elif event == EVENT_DIED:
+            toast = Adw.Toast.new(tr.translate("daemon_stopped"))
+            toast.set_timeout(3)
+            self.add_toast(toast)
+        elif event == EVENT_FAILED:
+            error_dialog = Adw.MessageDialog(
+                transient_for=self,
+                heading=tr.translate("error"),
+                body=tr.translate("daemon_start_failed"),
+                close_response="ok"
+            )
+            error_dialog.add_response("ok", tr.translate("ok"))
+            error_dialog.present()
+        return False  # Remove from idle queue
+
+    def on_close_request(self, window):
+        """Stop background workers when the window closes."""
+        self.daemon_supervisor.stop()
+        self.apply_engine.stop()
+        # Keeps the slideshow enabled so it resumes on the next start
+        self.slideshow.shutdown()
+        self.indexer.stop()
+        self.file_chooser.shutdown()
+        self.preview_store.flush()
+        for cache in (self.image_view.image_cache, self.file_chooser.thumbnail_cache):
+            logger.debug(f"{cache.name} cache: {cache.stats()}")
+        return False  # Allow the window to close
 
     def on_apply_clicked(self, button):
         """Apply the selected wallpaper with chosen effects."""
-        if not self.image_view.current_image_path:
+        image_path = self.image_view.current_image_path
+        assignments = self.monitor_panel.get_assignments(image_path)
+        if not image_path and not assignments:
             return
             
         # Get all options from the effects panel
-        options = self.effects_panel.get_all_options()
-        
-        # Удалены опции монитора
-        # Monitor всегда будет пустой строкой, чтобы влиять на все мониторы
-        options['monitor'] = ''
+        try:
+            options = self.effects_panel.get_all_options()
+        except ValueError as e:
+            self._show_invalid_options_dialog(e)
+            return
+        options['monitor'] = self.monitor_panel.get_selected_monitor()
         
         # Save current settings
         self.save_settings()
         
+        # A running slideshow continues with the new effects
+        self.slideshow.options = dict(options)
+        
         # Check if matugen is enabled
         use_matugen = self.config.get('use_matugen', False)
         
-        if use_matugen:
-            # Use matugen and update its config
-            success = self._apply_with_matugen(self.image_view.current_image_path, options)
-        else:
+        def apply_job():
+            if assignments:
+                # Different image per output, dispatched concurrently
+                return self.swww_manager.set_wallpapers(assignments, options)
+            if use_matugen and not options['monitor']:
+                # Use matugen and update its config; it sets the image on
+                # every output, so a single selected monitor goes through swww
+                return self._apply_with_matugen(image_path, options)
             # Use standard swww
-            success = self.swww_manager.set_wallpaper(
-                self.image_view.current_image_path,
-                options
-            )
+            return self.swww_manager.set_wallpaper(image_path, options)
         
+        # Runs in the background; a newer click replaces a job that hasn't started yet
+        self.apply_engine.submit(apply_job, self._on_apply_finished)
+
+    def _on_apply_finished(self, result):
+        """Report the result of a finished apply job.
+        
+        The result is a bool, or a per-output success map for per-monitor applies.
+        """
+        failed_outputs = []
+        if isinstance(result, dict):
+            failed_outputs = [output for output, ok in result.items() if not ok]
+            success = bool(result) and not failed_outputs
+        else:
+            success = result
+            
         if success:
             # Show success toast
             toast = Adw.Toast.new(self.application.translator.translate("wallpaper_applied"))
@@ -280,13 +435,93 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
             self.add_toast(toast)
         else:
             # Show error dialog
+            body = self.application.translator.translate("wallpaper_set_failed")
+            if failed_outputs:
+                body = f"{body}\n{', '.join(failed_outputs)}"
             error_dialog = Adw.MessageDialog(
                 heading=self.application.translator.translate("error"),
-                body=self.application.translator.translate("wallpaper_set_failed"),
+                body=body,
                 close_response="ok"
             )
             error_dialog.add_response("ok", self.application.translator.translate("ok"))
             error_dialog.present()
+        return False  # Remove from idle queue
+
+    def _on_apply_busy_changed(self, busy):
+        """Show or hide apply progress."""
+        self.apply_spinner.set_visible(busy)
+        if busy:
+            self.apply_spinner.start()
+        else:
+            self.apply_spinner.stop()
+        return False  # Remove from idle queue
+
+    def _show_invalid_options_dialog(self, error):
+        """Tell the user that an effect setting is invalid."""
+        tr = self.application.translator
+        error_dialog = Adw.MessageDialog(
+            transient_for=self,
+            heading=tr.translate("error"),
+            body=tr.translate("invalid_options").format(error),
+            close_response="ok"
+        )
+        error_dialog.add_response("ok", tr.translate("ok"))
+        error_dialog.present()
+
+    def _slideshow_options(self):
+        """Get the wallpaper options used by the slideshow."""
+        try:
+            options = self.effects_panel.get_all_options()
+        except ValueError:
+            # Fall back to the last saved, valid settings
+            options = self.config.get_wallpaper_options()
+        options['monitor'] = self.monitor_panel.get_selected_monitor()
+        return options
+
+    def _set_slideshow_button_active(self, active):
+        """Update the slideshow toggle without starting or stopping anything."""
+        self._updating_slideshow_button = True
+        self.slideshow_button.set_active(active)
+        self._updating_slideshow_button = False
+
+    def _resume_slideshow(self):
+        """Continue a slideshow left running in a previous session."""
+        # Skipped while another process (e.g. `swwwgui slideshow`) runs it
+        if self.slideshow.enabled and self.slideshow.resume(self._slideshow_options()):
+            self._set_slideshow_button_active(True)
+
+    def on_slideshow_toggled(self, button):
+        """Start or stop the slideshow from the current folder."""
+        if self._updating_slideshow_button:
+            return
+        tr = self.application.translator
+        if button.get_active():
+            if self.slideshow.start(folder=self.file_chooser.current_folder,
+                                    options=self._slideshow_options()):
+                message = tr.translate("slideshow_started")
+            elif self.slideshow.owned_elsewhere:
+                message = tr.translate("slideshow_running_elsewhere")
+                self._set_slideshow_button_active(False)
+            else:
+                message = tr.translate("slideshow_no_images")
+                self._set_slideshow_button_active(False)
+        else:
+            self.slideshow.stop()
+            message = tr.translate("slideshow_stopped")
+        toast = Adw.Toast.new(message)
+        toast.set_timeout(2)
+        self.add_toast(toast)
+
+    def _on_slideshow_changed(self, frame, success):
+        """Report a failed slideshow switch."""
+        if not success:
+            toast = Adw.Toast.new(self.application.translator.translate("wallpaper_set_failed"))
+            toast.set_timeout(2)
+            self.add_toast(toast)
+        if not self.slideshow.enabled:
+            # Stopped itself, e.g. the folder became empty
+            self._set_slideshow_button_active(False)
+        return False  # Remove from idle queue
 
     def on_settings_clicked(self, button):
         """Open settings popover."""
@@ -300,6 +535,12 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         # Add matugen settings page
         self._add_matugen_settings_page(dialog)
         
+        # Add slideshow settings page
+        self._add_slideshow_settings_page(dialog)
+        
+        # Add thumbnail settings page
+        self._add_thumbnails_settings_page(dialog)
+        
         # Add about page
         self._add_about_page(dialog)
         
@@ -405,6 +646,95 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         group.add(matugen_row)
         dialog.add(page)
     
+    def _add_slideshow_settings_page(self, dialog):
+        """Add slideshow settings page to preferences dialog."""
+        tr = self.application.translator
+        state = self.slideshow.state
+        
+        page = Adw.PreferencesPage()
+        page.set_title(tr.translate("slideshow"))
+        page.set_icon_name("media-playlist-shuffle-symbolic")
+        
+        group = Adw.PreferencesGroup()
+        page.add(group)
+        
+        # Interval in minutes
+        interval_row = Adw.SpinRow.new_with_range(1, 1440, 1)
+        interval_row.set_title(tr.translate("slideshow_interval"))
+        interval_row.set_value(state.get('interval', SLIDESHOW_DEFAULT_INTERVAL) / 60)
+        interval_row.connect("notify::value", self._on_slideshow_interval_changed)
+        group.add(interval_row)
+        
+        shuffle_row = Adw.SwitchRow()
+        shuffle_row.set_title(tr.translate("slideshow_shuffle"))
+        shuffle_row.set_active(state.get('shuffle', False))
+        shuffle_row.connect("notify::active", lambda row, pspec: self.slideshow.configure(shuffle=row.get_active()))
+        group.add(shuffle_row)
+        
+        per_monitor_row = Adw.SwitchRow()
+        per_monitor_row.set_title(tr.translate("slideshow_per_monitor"))
+        per_monitor_row.set_active(state.get('per_monitor', False))
+        per_monitor_row.connect("notify::active", lambda row, pspec: self.slideshow.configure(per_monitor=row.get_active()))
+        group.add(per_monitor_row)
+        
+        # Settings of a slideshow run by another process can't be changed here
+        if self.slideshow.owned_elsewhere:
+            group.set_description(tr.translate("slideshow_running_elsewhere"))
+            group.set_sensitive(False)
+        
+        # Store references for localization updates
+        self.slideshow_page = page
+        self.slideshow_interval_row = interval_row
+        self.slideshow_shuffle_row = shuffle_row
+        self.slideshow_per_monitor_row = per_monitor_row
+        
+        dialog.add(page)
+    
+    def _on_slideshow_interval_changed(self, row, pspec):
+        """Handle slideshow interval change."""
+        self.slideshow.configure(interval=row.get_value() * 60)
+    
+    def _add_thumbnails_settings_page(self, dialog):
+        """Add thumbnail settings page to preferences dialog."""
+        tr = self.application.translator
+        
+        page = Adw.PreferencesPage()
+        page.set_title(tr.translate("thumbnails"))
+        page.set_icon_name("view-grid-symbolic")
+        
+        group = Adw.PreferencesGroup()
+        page.add(group)
+        
+        indexing_row = Adw.SwitchRow()
+        indexing_row.set_title(tr.translate("background_indexing"))
+        indexing_row.set_subtitle(tr.translate("background_indexing_description"))
+        indexing_row.set_active(self.config.get('background_indexing', False))
+        indexing_row.connect("notify::active", self._on_background_indexing_toggled)
+        group.add(indexing_row)
+        
+        # Store references for localization updates
+        self.thumbnails_page = page
+        self.indexing_row = indexing_row
+        
+        dialog.add(page)
+    
+    def _on_background_indexing_toggled(self, row, pspec):
+        """Start or stop the background thumbnail indexer."""
+        enabled = row.get_active()
+        self.config.set('background_indexing', enabled)
+        self.config.save()
+        if enabled:
+            self.indexer.start()
+        else:
+            # Don't block the UI; the thread ends after its current image
+            self.indexer.stop(timeout=0)
+            self.file_chooser.show_indexing_progress(0, 0)
+    
+    def _on_indexing_progress(self, done, total):
+        """Show background indexing progress."""
+        self.file_chooser.show_indexing_progress(done, total)
+        return False  # Remove from idle queue
+    
     def _add_about_page(self, dialog):
         """Add about page to preferences dialog."""
         # Create about page
@@ -549,6 +879,19 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
             self.matugen_row.set_title(tr.translate("use_matugen"))
             self.matugen_row.set_subtitle(tr.translate("matugen_description"))
         
+        # Update slideshow settings
+        if hasattr(self, 'slideshow_page'):
+            self.slideshow_page.set_title(tr.translate("slideshow"))
+            self.slideshow_interval_row.set_title(tr.translate("slideshow_interval"))
+            self.slideshow_shuffle_row.set_title(tr.translate("slideshow_shuffle"))
+            self.slideshow_per_monitor_row.set_title(tr.translate("slideshow_per_monitor"))
+        
+        # Update thumbnail settings
+        if hasattr(self, 'thumbnails_page'):
+            self.thumbnails_page.set_title(tr.translate("thumbnails"))
+            self.indexing_row.set_title(tr.translate("background_indexing"))
+            self.indexing_row.set_subtitle(tr.translate("background_indexing_description"))
+        
         # Update about page
         if hasattr(self, 'about_page'):
             self.about_page.set_title(tr.translate("about"))
@@ -605,14 +948,20 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         if self.image_view.current_image_path:
             self.config.set('last_image', self.image_view.current_image_path)
         
-        # Get all options
-        options = self.effects_panel.get_all_options()
+        # Get all options; invalid entries keep their last saved values
+        try:
+            options = self.effects_panel.get_all_options()
+        except ValueError as e:
+            logger.warning(f"Not saving effect settings: {e}")
+            options = {}
         
         # Save all settings to config
         for key, value in options.items():
             self.config.set(key, value)
         
-        # Удалены настройки монитора
+        # Monitor selection and per-output images
+        self.config.set('monitor', self.monitor_panel.get_selected_monitor())
+        self.config.set('output_images', dict(self.monitor_panel.assignments))
         
         # Save config to file
         self.config.save()
@@ -630,157 +979,27 @@ class SwwwGuiWindow(Adw.ApplicationWindow):
         # Update buttons
         self.settings_button.set_tooltip_text(self.application.translator.translate("settings"))
         self.maximize_button.set_tooltip_text(self.application.translator.translate("maximize_view"))
+        self.slideshow_button.set_tooltip_text(self.application.translator.translate("slideshow"))
         self.apply_button.set_label(self.application.translator.translate("apply"))
         self.apply_button.set_tooltip_text(self.application.translator.translate("apply"))
         
         # Update search entry
         self.search_entry.set_placeholder_text(self.application.translator.translate("search_placeholder"))
+        
+        # Update monitor panel
+        self.monitor_panel.update_localization()
 
     def _apply_with_matugen(self, image_path, options):
         """Apply wallpaper using matugen."""
-        try:
-            # First, update matugen config file
-            config_updated = self._update_matugen_config(options)
-            if not config_updated:
-                # Fallback to standard swww if config update failed
-                logger.warning("Failed to update matugen config")
-                return self.swww_manager.set_wallpaper(image_path, options)
-            
-            # Then run matugen command
-            logger.debug(f"Running matugen with image: {image_path}")
-            result = subprocess.run(
-                ["matugen", "image", image_path],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode != 0:
-                logger.warning(f"Matugen failed with exit code {result.returncode}: {result.stderr}")
-                # Fallback to standard swww if matugen failed
-                return self.swww_manager.set_wallpaper(image_path, options)
-                
-            return True
-        except Exception as e:
-            logger.error(f"Error applying with matugen: {e}")
-            # Fallback to standard swww
-            return self.swww_manager.set_wallpaper(image_path, options)
-    
-    def _update_matugen_config(self, options):
-        """Update matugen config file with swww options."""
-        config_path = os.path.expanduser("~/.config/matugen/config.toml")
-        
-        try:
-            # Check if the directory exists, create if not
-            os.makedirs(os.path.dirname(config_path), exist_ok=True)
-            
-            # Convert swww options to matugen arguments
-            args = ["img"]
-            
-            # Add transition type
-            transition_type = options.get('transition_type', 'simple')
-            args.extend(["--transition-type", transition_type])
-            
-            # Add transition fps and step
-            args.extend(["--transition-fps", str(options.get('transition_fps', 30))])
-            args.extend(["--transition-step", str(options.get('transition_step', 2))])
-            
-            # Add resize mode if specified
-            if 'resize_mode' in options and options['resize_mode'] != 'none':
-                args.extend(["--resize", options['resize_mode']])
-            
-            # Add filter if specified
-            if 'filter' in options:
-                args.extend(["--filter", options['filter']])
-                
-            # Add fill color if specified
-            if 'fill_color' in options:
-                args.extend(["--fill-color", options['fill_color']])
-                
-            # Add transition specific options based on type
-            if transition_type == 'wipe':
-                args.extend(["--transition-angle", str(options.get('transition_angle', 45))])
-            elif transition_type == 'wave':
-                args.extend(["--transition-wave", options.get('transition_wave', '20,20')])
-            elif transition_type in ['grow', 'outer', 'any']:
-                args.extend(["--transition-pos", options.get('transition_pos', 'center')])
-            
-            if options.get('invert_y', False):
-                args.append("--invert-y")
-                
-            # Прочитаем существующий конфиг или создадим новый
-            config_content = ""
-            if os.path.exists(config_path):
-                with open(config_path, "r") as f:
-                    config_content = f.read()
-            
-            # Создаем новый контент на основе существующего, но с обновленной секцией wallpaper
-            new_config_content = ""
-            
-            # Если конфиг пустой, создаем с нуля
-            if not config_content.strip():
-                new_config_content = f"""[config.wallpaper]
-command = "swww"
-arguments = {json.dumps(args)}
-set = true
-"""
-            else:
-                # Разбиваем конфиг на секции
-                sections = []
-                current_section = ""
-                current_section_name = ""
-                lines = config_content.split("\n")
-                
-                for line in lines:
-                    # Если встретили начало новой секции
-                    if line.strip().startswith("[") and line.strip().endswith("]"):
-                        # Если в текущей секции есть содержимое, добавляем её
-                        if current_section:
-                            # Пропускаем секцию wallpaper, она будет обновлена позже
-                            if current_section_name != "[config.wallpaper]":
-                                sections.append((current_section_name, current_section))
-                        # Начинаем новую секцию
-                        current_section_name = line.strip()
-                        current_section = line + "\n"
-                    else:
-                        # Добавляем строку в текущую секцию
-                        if current_section_name:  # Если есть имя секции
-                            current_section += line + "\n"
-                
-                # Добавляем последнюю секцию, если она есть и это не wallpaper
-                if current_section and current_section_name != "[config.wallpaper]":
-                    sections.append((current_section_name, current_section))
-                
-                # Собираем все обратно, добавляя обновленную секцию wallpaper
-                for name, content in sections:
-                    new_config_content += content
-                
-                # Добавляем обновленную секцию wallpaper
-                if new_config_content and not new_config_content.endswith("\n\n"):
-                    if not new_config_content.endswith("\n"):
-                        new_config_content += "\n"
-                    new_config_content += "\n"
-                
-                new_config_content += f"""[config.wallpaper]
-command = "swww"
-arguments = {json.dumps(args)}
-set = true
-"""
-            
-            # Записываем обновленный конфиг
-            with open(config_path, "w") as f:
-                f.write(new_config_content)
-            
-            return True
-        
-        except Exception as e:
-            logger.error(f"Error updating matugen config: {e}")
-            return False
+        matugen_binary = self.application.probe.path("matugen") or "matugen"
+        return apply_with_matugen(self.swww_manager, image_path, options, matugen_binary)
 
     def _on_visit_repo_clicked(self, button):
         """Open the GitHub repository in browser."""
         # Use xdg-open to open the URL
         try:
-            subprocess.Popen(["xdg-open", "https://github.com/ProcheRAR/SwwwGUI"])
+            xdg_open = self.application.probe.path("xdg-open") or "xdg-open"
+            subprocess.Popen([xdg_open, "https://github.com/ProcheRAR/SwwwGUI"])
         except Exception as e:
             logger.error(f"Failed to open URL: {e}")
             # Show error toast
@@ -2,12 +2,11 @@
 
 import sys
 import os
-import gi
 
 # Add the src directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
-from swww_gui.application import main
+from swww_gui.cli import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
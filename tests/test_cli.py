@@ -0,0 +1,23 @@
+import sys
+
+import pytest
+
+from swww_gui import cli
+
+
+@pytest.mark.parametrize('flag', ['-h', '--help'])
+def test_help_prints_usage_without_gui(flag, capsys, monkeypatch):
+    # The GUI module needs GTK; help must never import it
+    monkeypatch.setitem(sys.modules, 'swww_gui.application', None)
+    assert cli.main(['swwwgui', flag]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith('usage: swwwgui')
+    for command in cli.COMMANDS:
+        assert command in out
+
+
+def test_command_help_is_handled_by_argparse(capsys):
+    with pytest.raises(SystemExit) as exc:
+        cli.main(['swwwgui', 'apply', '--help'])
+    assert exc.value.code == 0
+    assert 'usage: swwwgui apply' in capsys.readouterr().out
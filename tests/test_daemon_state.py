@@ -0,0 +1,20 @@
+from swww_gui.daemon_state import DaemonState
+
+
+def test_update_uses_known_pid(monkeypatch):
+    def scan(*args):
+        raise AssertionError("/proc scanned")
+    monkeypatch.setattr('swww_gui.daemon_state.find_daemon_pid', scan)
+    state = DaemonState(ttl=10)
+    state.update(True, pid=1234)
+    assert state.pid == 1234
+
+
+def test_update_falls_back_to_proc_scan(monkeypatch):
+    monkeypatch.setattr('swww_gui.daemon_state.find_daemon_pid', lambda *args: 4321)
+    state = DaemonState(ttl=10)
+    state.update(True)
+    assert state.pid == 4321
+    state.update(False)
+    assert state.pid is None
+
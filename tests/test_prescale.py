@@ -0,0 +1,55 @@
+from swww_gui.monitor import Monitor
+from swww_gui.options import TransitionOptions
+from swww_gui.prescale import PrescaleCache
+from swww_gui.swww_manager import SwwwManager
+
+
+def test_jpeg_is_cached_losslessly_by_default(tmp_path):
+    source = tmp_path / 'wall.jpg'
+    source.write_bytes(b'')
+    cache = PrescaleCache(cache_dir=tmp_path / 'cache')
+    path = cache.cache_path(str(source), (1920, 1080), 'crop', 'Lanczos3', '000000')
+    assert path.suffix == '.png'
+
+
+def test_lossy_mode_keeps_jpeg(tmp_path):
+    source = tmp_path / 'wall.jpg'
+    source.write_bytes(b'')
+    cache = PrescaleCache(cache_dir=tmp_path / 'cache', lossy=True)
+    assert cache.cache_path(str(source), (1920, 1080), 'crop', 'Lanczos3', '000000').suffix == '.jpg'
+
+    png = tmp_path / 'wall.png'
+    png.write_bytes(b'')
+    assert cache.cache_path(str(png), (1920, 1080), 'crop', 'Lanczos3', '000000').suffix == '.png'
+
+
+def fake_render(cache, monkeypatch):
+    # Pretend GdkPixbuf scaled the image, so only the animation check can refuse
+    monkeypatch.setattr(cache, '_render', lambda *args: object())
+    monkeypatch.setattr(cache, '_save', lambda pixbuf, path: path.parent.mkdir(exist_ok=True) or path.touch())
+
+
+def test_static_image_is_prescaled(tmp_path, monkeypatch):
+    source = tmp_path / 'still.png'
+    source.write_bytes(b'')
+    cache = PrescaleCache(cache_dir=tmp_path / 'cache')
+    fake_render(cache, monkeypatch)
+    assert cache.prescale(str(source), (1920, 1080), 'crop', 'Lanczos3', '000000')
+
+
+def test_animated_gif_is_not_prescaled(tmp_path, monkeypatch):
+    source = tmp_path / 'anim.GIF'
+    source.write_bytes(b'')
+    cache = PrescaleCache(cache_dir=tmp_path / 'cache')
+    fake_render(cache, monkeypatch)
+    assert cache.prescale(str(source), (1920, 1080), 'crop', 'Lanczos3', '000000') is None
+
+
+def test_manager_sends_animated_gif_unscaled(tmp_path, monkeypatch):
+    source = tmp_path / 'anim.gif'
+    source.write_bytes(b'')
+    cache = PrescaleCache(cache_dir=tmp_path / 'cache')
+    fake_render(cache, monkeypatch)
+    manager = SwwwManager(use_ipc=False, prescale_cache=cache)
+    monitor = Monitor(name='DP-1', width=1920, height=1080)
+    assert manager._prescale(str(source), TransitionOptions(resize_mode='crop'), monitor) is None
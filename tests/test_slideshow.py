@@ -0,0 +1,150 @@
+import os
+import threading
+
+import pytest
+
+from swww_gui.slideshow import Slideshow, SlideshowLock
+
+
+class FakeConfig:
+    def __init__(self, slideshow=None):
+        self.data = {'slideshow': slideshow or {}}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def save(self):
+        pass
+
+
+class FakeManager:
+    prescale_cache = None
+
+    def __init__(self):
+        self.applied = []
+
+    def set_wallpaper(self, image_path, options):
+        self.applied.append(image_path)
+        return True
+
+
+@pytest.fixture
+def lock_path(tmp_path):
+    return tmp_path / 'slideshow.pid'
+
+
+@pytest.fixture
+def images(tmp_path):
+    folder = tmp_path / 'images'
+    folder.mkdir()
+    for name in ('a.png', 'b.png'):
+        (folder / name).write_bytes(b'')
+    return folder
+
+
+def test_lock_is_exclusive(lock_path):
+    first = SlideshowLock(lock_path)
+    second = SlideshowLock(lock_path)
+    assert first.acquire()
+    assert not second.acquire()
+    assert second.owner() == os.getpid()
+
+    first.release()
+    assert second.owner() is None
+    assert second.acquire()
+    second.release()
+
+
+def test_resume_skipped_while_another_owner_runs(lock_path):
+    other = SlideshowLock(lock_path)
+    assert other.acquire()
+    try:
+        slideshow = Slideshow(FakeManager(), FakeConfig({'enabled': True, 'images': ['/x.png']}),
+                              ownership=SlideshowLock(lock_path))
+        assert not slideshow.resume()
+        assert not slideshow.running
+        assert slideshow.owned_elsewhere
+    finally:
+        other.release()
+
+
+def test_start_refused_while_another_owner_runs(lock_path, images):
+    other = SlideshowLock(lock_path)
+    assert other.acquire()
+    try:
+        config = FakeConfig()
+        slideshow = Slideshow(FakeManager(), config, ownership=SlideshowLock(lock_path))
+        assert not slideshow.start(folder=str(images))
+        assert config.data['slideshow'] == {}
+    finally:
+        other.release()
+
+
+def test_ownership_released_when_stopped(lock_path, images):
+    manager = FakeManager()
+    slideshow = Slideshow(manager, FakeConfig(), ownership=SlideshowLock(lock_path))
+    assert slideshow.start(folder=str(images))
+    assert slideshow.ownership.held
+    thread = slideshow._thread
+    slideshow.stop()
+    thread.join(5)
+    assert not slideshow.ownership.held
+    assert manager.applied
+
+
+def test_start_without_images_keeps_no_ownership(lock_path, tmp_path):
+    slideshow = Slideshow(FakeManager(), FakeConfig(), ownership=SlideshowLock(lock_path))
+    assert not slideshow.start(folder=str(tmp_path / 'missing'))
+    assert not slideshow.ownership.held
+    assert not slideshow.owned_elsewhere
+
+
+class BlockingManager(FakeManager):
+    """Holds the first switch until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def set_wallpaper(self, image_path, options):
+        self.entered.set()
+        self.release.wait(5)
+        return super().set_wallpaper(image_path, options)
+
+
+def test_restart_during_a_switch_keeps_the_thread(lock_path, images):
+    manager = BlockingManager()
+    slideshow = Slideshow(manager, FakeConfig(), ownership=SlideshowLock(lock_path))
+    assert slideshow.start(folder=str(images))
+    assert manager.entered.wait(5)
+    thread = slideshow._thread
+
+    # Toggled off and on while the first switch is still running
+    slideshow.stop()
+    assert slideshow.start(folder=str(images))
+    manager.release.set()
+
+    thread.join(0.5)
+    assert thread.is_alive()
+    assert slideshow.running
+    assert slideshow.enabled
+    assert slideshow.ownership.held
+    slideshow.stop()
+    thread.join(5)
+    assert not slideshow.ownership.held
+
+
+def test_configure_leaves_another_owners_state_alone(lock_path):
+    other = SlideshowLock(lock_path)
+    assert other.acquire()
+    try:
+        config = FakeConfig({'enabled': True, 'interval': 60, 'position': 7})
+        slideshow = Slideshow(FakeManager(), config, ownership=SlideshowLock(lock_path))
+        assert not slideshow.configure(interval=600, shuffle=True)
+        assert config.data['slideshow'] == {'enabled': True, 'interval': 60, 'position': 7}
+    finally:
+        other.release()
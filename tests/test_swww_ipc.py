@@ -0,0 +1,182 @@
+import os
+import socket
+import threading
+
+import pytest
+
+from swww_gui.swww_ipc import SwwwSocketClient
+from swww_gui.swww_manager import SwwwManager
+
+QUERY_OUTPUT = ": DP-1: 1920x1080, scale: 1, currently displaying: color: 000000\n"
+
+
+class FakeDaemon:
+    """Accepts and closes connections on a Unix socket, like a live swww-daemon."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        self.server.listen(8)
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return  # Closed
+            conn.close()
+
+    def stop(self):
+        self.server.shutdown(socket.SHUT_RDWR)
+        self.server.close()
+        self.thread.join(1)
+
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    monkeypatch.setenv('WAYLAND_DISPLAY', 'wayland-test')
+    return tmp_path
+
+
+@pytest.fixture
+def daemon(runtime_dir):
+    fake = FakeDaemon(runtime_dir / 'swww-wayland-test.socket')
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def fake_cli(tmp_path):
+    """A `swww` script logging its arguments; `clear` with a bad color fails."""
+    log = tmp_path / 'swww.log'
+    script = tmp_path / 'swww'
+    query = QUERY_OUTPUT.replace('\n', '\\n')
+    script.write_text(
+        "#!/bin/sh\n"
+        f'echo "$@" >> "{log}"\n'
+        'case "$1" in\n'
+        f"    query) printf '{query}' ;;\n"
+        '    clear) [ "$2" = "#bad" ] && { echo "invalid color" >&2; exit 1; } ;;\n'
+        "esac\n"
+        "exit 0\n"
+    )
+    os.chmod(script, 0o755)
+
+    def calls():
+        return log.read_text().splitlines() if log.exists() else []
+
+    return str(script), calls
+
+
+def make_manager(fake_cli):
+    manager = SwwwManager(use_ipc=True)
+    manager.swww_binary = fake_cli[0]
+    return manager
+
+
+def test_socket_path_follows_wayland_display(runtime_dir):
+    assert SwwwSocketClient().socket_path == runtime_dir / 'swww-wayland-test.socket'
+
+
+def test_is_alive_with_listening_daemon(daemon):
+    client = SwwwSocketClient()
+    assert client.socket_exists()
+    assert client.is_alive()
+
+
+def test_is_alive_false_for_stale_socket(runtime_dir):
+    # A socket file left behind by a crashed daemon refuses connections
+    path = runtime_dir / 'swww-wayland-test.socket'
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.close()
+    client = SwwwSocketClient()
+    assert client.socket_exists()
+    assert not client.is_alive()
+
+
+def test_is_alive_false_without_socket(runtime_dir):
+    client = SwwwSocketClient()
+    assert not client.socket_exists()
+    assert not client.is_alive()
+
+
+def test_liveness_uses_socket_without_cli(daemon, fake_cli):
+    manager = make_manager(fake_cli)
+    assert manager.is_daemon_running()
+    assert fake_cli[1]() == []
+
+
+def test_liveness_falls_back_to_cli_without_socket(runtime_dir, fake_cli):
+    manager = make_manager(fake_cli)
+    assert manager.is_daemon_running()
+    assert fake_cli[1]() == ['query']
+
+
+def test_query_uses_cli_and_is_cached(daemon, fake_cli):
+    manager = make_manager(fake_cli)
+    assert manager.query() == QUERY_OUTPUT
+    assert manager.query() == QUERY_OUTPUT
+    assert fake_cli[1]() == ['query']
+
+
+def test_clear_uses_cli(daemon, fake_cli):
+    manager = make_manager(fake_cli)
+    assert manager.clear_wallpaper('#112233')
+    assert fake_cli[1]() == ['clear #112233']
+
+
+def test_clear_error_is_reported_and_state_dropped(daemon, fake_cli):
+    manager = make_manager(fake_cli)
+    assert manager.is_daemon_running()
+    assert not manager.clear_wallpaper('#bad')
+    assert not manager.daemon_state.is_fresh()
+
+    # The next call checks the daemon again and still works
+    assert manager.clear_wallpaper('#000000')
+    assert fake_cli[1]() == ['clear #bad', 'clear #000000']
+
+
+def test_kill_uses_cli(daemon, fake_cli):
+    manager = make_manager(fake_cli)
+    assert manager.kill_daemon()
+    assert fake_cli[1]() == ['kill']
+
+
+def test_daemon_restart_is_detected(runtime_dir, fake_cli):
+    manager = make_manager(fake_cli)
+    first = FakeDaemon(runtime_dir / 'swww-wayland-test.socket')
+    assert manager.is_daemon_running()
+    first.stop()
+
+    manager.invalidate_daemon_state()
+    assert not manager.is_daemon_running()  # Stale socket file, nobody listening
+
+    os.remove(runtime_dir / 'swww-wayland-test.socket')
+    second = FakeDaemon(runtime_dir / 'swww-wayland-test.socket')
+    try:
+        manager.invalidate_daemon_state()
+        assert manager.is_daemon_running()
+    finally:
+        second.stop()
+
+
+def test_peer_pid_identifies_listening_process(daemon):
+    assert SwwwSocketClient().peer_pid() == os.getpid()
+
+
+def test_peer_pid_none_without_daemon(runtime_dir):
+    assert SwwwSocketClient().peer_pid() is None
+
+
+def test_daemon_pid_comes_from_socket_without_proc_scan(daemon, fake_cli, monkeypatch):
+    def scan(*args):
+        raise AssertionError("/proc scanned")
+    monkeypatch.setattr('swww_gui.daemon_state.find_daemon_pid', scan)
+    manager = make_manager(fake_cli)
+    assert manager.is_daemon_running()
+    assert manager.daemon_state.pid == os.getpid()
@@ -0,0 +1,34 @@
+import os
+
+from swww_gui.thumbnail_pack import ThumbnailPack
+from swww_gui.thumbnail_pool import DecodedThumbnail
+
+
+def make_pack(tmp_path):
+    pack = ThumbnailPack(tmp_path / 'folder.pack', edge=4)
+    st = os.stat(tmp_path)
+    for name in ('a', 'b', 'c'):
+        pack.put(name, st, DecodedThumbnail(b'\xff' * 64, 4, 4, 16, True))
+    pack.prune(['c'])
+    return pack, st
+
+
+def test_compact_keeps_live_tiles(tmp_path):
+    pack, st = make_pack(tmp_path)
+    pack.compact()
+    assert pack.dead_slots == 0
+    assert pack.get('c', st)[0]
+    assert not pack.get('a', st)[0]
+
+
+def test_failed_compact_keeps_the_original_error(tmp_path, monkeypatch, caplog):
+    pack, st = make_pack(tmp_path)
+
+    def failing_replace(src, dst):
+        os.remove(src)  # The temporary file is gone before the cleanup
+        raise OSError("disk full")
+    monkeypatch.setattr('swww_gui.thumbnail_pack.os.replace', failing_replace)
+
+    pack.compact()
+    assert "disk full" in caplog.text
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('tmp')]